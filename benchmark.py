@@ -0,0 +1,778 @@
+# Python 3.7
+# appendix to sherdog-parser.py
+# Offline benchmarks - runs scraper against a local stub HTTP server serving pages from fixtures directory,
+# so no network access is needed.
+# Usage: python benchmark.py [parse] [crawl] [pipeline] [shards] [list] [roster] [backends] [transport] [throttle]
+#                           [cache] [columnar] [store] [memory]
+
+import collections
+import contextlib
+import csv
+import gc
+import hashlib
+import importlib.util
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, 'fixtures')
+
+
+def load_parser():
+    """
+    Imports sherdog-parser.py as a module (its filename is not a valid module name).
+    :return: module object
+    """
+    spec = importlib.util.spec_from_file_location('sherdog_parser', os.path.join(HERE, 'sherdog-parser.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['sherdog_parser'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_fixture(name):
+    """
+    Reads fixture page from fixtures directory.
+    :param name: string with fixture filename
+    :return: bytes with page content
+    """
+    with open(os.path.join(FIXTURES, name), 'rb') as page:
+        return page.read()
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silences per-fighter progress prints of the scraper while benchmark is running.
+    :return: context manager
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+class StubServer(object):
+    """Local HTTP server imitating Sherdog and UFC sites. Fighter indexes below `fighters` serve a fighter page (every
+    `long_every`-th one with a long record), except every `gap_every`-th index which is empty, like deleted profiles
+    on the real site. Fightfinder answers with a single fighter, with several fighters for names starting with
+    'Multi' (unless weight filter is used) and with no results for names starting with 'Unknown'. UFC athletes
+    listing has `roster_pages` pages for each gender. With `rate_limit` set, requests over that many per second are
+    answered with 429 and Retry-After, like a throttling site. With `redirects` set, fighter indexes redirect to
+    profile pages (e.g. '/fighter/Tony-Galindo-1'), like the real site does. Events '/events/UFC-1-Swanson-vs-Aldo-1'
+    up to `events` link previous and next event and UFC organization, whose events listing shows `events_per_page`
+    events (latest first) on each page; other event pages are served as they are in fixtures.
+    """
+
+    def __init__(self, fighters=200, gap_every=7, long_every=5, roster_pages=5, latency=0.05, error_rate=0.0,
+                 rate_limit=None, redirects=False, events=6, events_per_page=4):
+        """
+        Initializes stub server.
+        :param fighters: integer with number of indexes that may contain a fighter
+        :param gap_every: integer, every n-th index is empty
+        :param long_every: integer, every n-th fighter has a long record
+        :param roster_pages: integer with number of UFC athletes listing pages for each gender
+        :param latency: float with seconds each response is delayed by
+        :param error_rate: float with fraction of requests answered with 503 error
+        :param rate_limit: optional - integer with requests per second served before throttling, or None
+        :param redirects: boolean, if True fighter indexes redirect to profile pages
+        :param events: integer with number of numbered UFC events
+        :param events_per_page: integer with number of events on each page of UFC events listing
+        """
+        self.fighters = fighters
+        self.gap_every = gap_every
+        self.long_every = long_every
+        self.roster_pages = roster_pages
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.redirects = redirects
+        self.events = events
+        self.events_per_page = events_per_page
+        self.throttled = 0
+        self._recent = collections.deque()  # arrival times of requests within last second
+        self._lock = threading.Lock()
+        self.random = random.Random(0)
+        self.requests = 0
+        self.not_modified = 0  # requests answered with 304, because client had the page already
+        self.connections = 0
+        self.errors = 0
+        self.fighter_page = read_fixture('fighter_short.html')
+        self.long_page = read_fixture('fighter_long.html')
+        self.empty_page = read_fixture('fighter_empty.html')
+        self.search_page = read_fixture('search_single.html')
+        self.search_multiple_page = read_fixture('search_multiple.html')
+        self.search_empty_page = read_fixture('search_empty.html')
+        self.roster_page = read_fixture('ufc_athletes.html')
+        self.roster_empty_page = read_fixture('ufc_athletes_empty.html')
+        self.event_page = read_fixture('event.html')
+        self.organization_page = read_fixture('organization.html')
+        self._server = None
+
+    def route(self, path, query):
+        """
+        Picks response for requested address.
+        :param path: string with url path
+        :param query: dictionary with parsed query string
+        :return: tuple (status code, bytes with body)
+        """
+        if path == '/fighter/index':
+            fighter_index = int(query['id'][0].rstrip('.'))
+            if fighter_index >= self.fighters or fighter_index % self.gap_every == self.gap_every - 1:
+                return 200, self.empty_page
+            if self.redirects:
+                return 302, self.profile_path(fighter_index)
+            return 200, self.fighter_page_at(fighter_index)
+        profile = re.fullmatch(r'/fighter/(?:Jose-Aldo|Tony-Galindo)-(\d+)', path)
+        if profile is not None and int(profile.group(1)) < self.fighters:
+            return 200, self.fighter_page_at(int(profile.group(1)))
+        if path == '/stats/fightfinder':
+            if query['SearchTxt'][0].startswith('Unknown'):
+                return 200, self.search_empty_page
+            if query['SearchTxt'][0].startswith('Multi') and 'weight' not in query:
+                return 200, self.search_multiple_page
+            return 200, self.search_page
+        if path.startswith('/fighter/'):
+            return 200, self.long_page if 'Aldo' in path else self.fighter_page
+        numbered_event = re.fullmatch(r'/events/UFC-(\d+)-Swanson-vs-Aldo-\1', path)
+        if numbered_event is not None:
+            return self.event_page_at(int(numbered_event.group(1)))
+        if path.startswith('/events/'):
+            return 200, self.event_page
+        listing = re.fullmatch(r'/organizations/Ultimate-Fighting-Championship-UFC-2(?:/recent-events/(\d+))?', path)
+        if listing is not None:
+            return self.organization_page_at(int(listing.group(1) or 1))
+        if path.startswith('/fixtures/'):
+            return 200, read_fixture(os.path.basename(path))
+        if path == '/athletes/all':
+            if int(query['page'][0]) < self.roster_pages:
+                return 200, self.roster_page
+            return 200, self.roster_empty_page
+        return 404, self.empty_page
+
+    def fighter_page_at(self, fighter_index):
+        """
+        :param fighter_index: integer with index of an existing fighter
+        :return: bytes with fighter's page, fighter's name ends with his index
+        """
+        if fighter_index % self.long_every == 0:
+            return self.long_page.replace('José Aldo'.encode('utf-8'), b'Jose Aldo %d' % fighter_index)
+        return self.fighter_page.replace(b'Tony Galindo', b'Tony Galindo %d' % fighter_index)
+
+    def event_page_at(self, number):
+        """
+        :param number: integer with number of UFC event
+        :return: tuple (status code, bytes with event page), event is called 'UFC <number> - Swanson vs. Aldo'
+        """
+        if not 1 <= number <= self.events:
+            return 404, self.empty_page
+        page = self.event_page.replace(b'UFC 300', b'UFC %d' % number)
+        for fixture_number, linked in ((299, number - 1), (301, number + 1)):
+            page = page.replace(b'UFC-%d-Swanson-vs-Aldo-%d' % (fixture_number, fixture_number),
+                                b'UFC-%d-Swanson-vs-Aldo-%d' % (linked, linked))
+        return 200, page
+
+    def organization_page_at(self, page):
+        """
+        :param page: integer with number of UFC events listing page, starting with 1
+        :return: tuple (status code, bytes with listing page), last page has no link to the next one
+        """
+        row = re.search(rb'<tr itemscope.*?</tr>\n', self.organization_page, flags=re.S).group(0)
+        latest = self.events - (page - 1) * self.events_per_page
+        rows = b''.join(row.replace(b'300', b'%d' % number)
+                        for number in range(latest, max(latest - self.events_per_page, 0), -1))
+        listing = self.organization_page.replace(row, rows)
+        if latest - self.events_per_page > 0:
+            return 200, listing.replace(b'recent-events/2', b'recent-events/%d' % (page + 1))
+        return 200, re.sub(rb'<span class="pagination">.*?</span>', b'', listing)
+
+    def profile_path(self, fighter_index):
+        """
+        :param fighter_index: integer with index of an existing fighter
+        :return: bytes with path of fighter's profile page
+        """
+        if fighter_index % self.long_every == 0:
+            return b'/fighter/Jose-Aldo-%d' % fighter_index
+        return b'/fighter/Tony-Galindo-%d' % fighter_index
+
+    def is_throttled(self):
+        """
+        Records arrival of a request and checks it against rate limit.
+        :return: True if request is over the limit
+        """
+        if self.rate_limit is None:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                self.throttled += 1
+                return True
+            self._recent.append(now)
+            return False
+
+    def start(self):
+        """
+        Starts server in background thread.
+        :return: string with base url of the server
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keeps connections alive between requests.
+            wbufsize = -1  # headers and body leave in one write, otherwise delayed ACK stalls kept alive connections.
+
+            def setup(self):
+                stub.connections += 1
+                BaseHTTPRequestHandler.setup(self)
+
+            def do_GET(self):
+                stub.requests += 1
+                url = urlsplit(self.path)
+                time.sleep(stub.latency)
+                headers = {}
+                if stub.is_throttled():
+                    status, body = 429, b'Too Many Requests'
+                    headers['Retry-After'] = '1'
+                elif stub.random.random() < stub.error_rate:
+                    stub.errors += 1
+                    status, body = 503, b'Service Unavailable'
+                else:
+                    status, body = stub.route(url.path, parse_qs(url.query))
+                if status == 302:  # body of a redirect is its location.
+                    status, body, headers['Location'] = 302, b'', body.decode()
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    status, body = 304, b''
+                    stub.not_modified += 1
+                self.send_response(status)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                for header, value in headers.items():
+                    self.send_header(header, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            def handle_error(self, request, client_address):
+                pass  # clients that exit (e.g. shard processes) drop their kept alive connections.
+
+        self._server = Server(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def stop(self):
+        """
+        Shuts server down.
+        :return: None
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def bench_crawl(concurrency_levels=(1, 4, 16, 32), fighters=200, latency=0.05):
+    """
+    Measures fighters per second of scrape_all_fighters for different concurrency levels.
+    :param concurrency_levels: tuple of integers with concurrency values to be compared
+    :param fighters: integer with number of fighters served by stub server
+    :param latency: float with seconds each response is delayed by
+    :return: None
+    """
+    parser = load_parser()
+    stub = StubServer(fighters=fighters, latency=latency)
+    parser.SHERDOG_URL = stub.start()
+    print(f'crawl: {fighters} indexes, {latency * 1000:.0f} ms latency')
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for concurrency in concurrency_levels:
+                filename = os.path.join(tmp, f'crawl-{concurrency}')
+                stub.requests = 0
+                start = time.perf_counter()
+                with quiet():
+                    parser.scrape_all_fighters(filename, concurrency=concurrency)
+                elapsed = time.perf_counter() - start
+                with open(f'{filename}.csv', newline='', encoding='utf-8') as output:
+                    names = [row[0] for row in csv.reader(output)][1:]
+                print(f'  concurrency={concurrency:<3} {elapsed:7.2f} s  {len(set(names)) / elapsed:8.1f} fighters/s  '
+                      f'{stub.requests / elapsed:8.1f} pages/s  {len(names)} rows')
+    finally:
+        stub.stop()
+
+
+def bench_throttle(fighters=300, rate_limit=40, concurrency=32, latency=0.05):
+    """
+    Runs the same crawl against a throttling stub server without and with adaptive rate limiter.
+    :param fighters: integer with number of fighters served by stub server
+    :param rate_limit: integer with requests per second the stub serves before answering 429
+    :param concurrency: integer with number of fetches crawl keeps in flight
+    :param latency: float with seconds each response is delayed by
+    :return: None
+    """
+    parser = load_parser()
+    stub = StubServer(fighters=fighters, latency=latency, rate_limit=rate_limit)
+    parser.SHERDOG_URL = stub.start()
+    print(f'throttle: {fighters} indexes, stub allows {rate_limit} requests/s, concurrency={concurrency}')
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for run in ('unlimited', 'limited'):
+                parser.configure_transport(backoff=0.1)
+                limiter = parser.configure_rate_limit(rate=rate_limit * 2) if run == 'limited' else None
+                time.sleep(1.0)  # letting stub's rate window empty.
+                stub.requests, stub.throttled = 0, 0
+                start = time.perf_counter()
+                with quiet():
+                    parser.scrape_all_fighters(os.path.join(tmp, run), concurrency=concurrency)
+                elapsed = time.perf_counter() - start
+                with open(os.path.join(tmp, f'{run}.csv'), encoding='utf-8') as output:
+                    rows = sum(1 for _ in output) - 1
+                print(f'  {run:<10} {elapsed:7.2f} s  {stub.requests - stub.throttled:5} pages  '
+                      f'{stub.throttled:5} throttled (429)  {(stub.requests - stub.throttled) / elapsed:7.1f} pages/s  '
+                      f'{rows} rows')
+                if limiter is not None:
+                    print(f'  {limiter.stats()}')
+    finally:
+        stub.stop()
+
+
+def bench_transport(requests_count=300, latency=0.0, error_rate=0.1):
+    """
+    Compares bare requests.get (new connection for each request) with pooled shared transport, and shows retries
+    getting through injected 503 errors.
+    :param requests_count: integer with number of requests sent in each run
+    :param latency: float with seconds each response is delayed by
+    :param error_rate: float with fraction of requests answered with 503 error in retry run
+    :return: None
+    """
+    parser = load_parser()
+    stub = StubServer(latency=latency)
+    base_url = stub.start()
+    url = f'{base_url}/fighter/index?id=1.'
+    print(f'transport: {requests_count} requests')
+    try:
+        stub.connections = 0
+        latencies = []
+        for _ in range(requests_count):
+            start = time.perf_counter()
+            requests.get(url)
+            latencies.append(time.perf_counter() - start)
+        print(f'  bare requests.get  {sum(latencies) / len(latencies) * 1000:7.3f} ms mean  '
+              f'{stub.connections} connections')
+        stub.connections = 0
+        transport = parser.configure_transport(backoff=0.01)
+        for _ in range(requests_count):
+            transport.get(url)
+        stats = transport.latency_stats()
+        print(f'  pooled transport   {stats["mean"] * 1000:7.3f} ms mean  {stub.connections} connections')
+        stub.error_rate, stub.errors = error_rate, 0
+        statuses = collections.Counter(transport.get(url).status_code for _ in range(requests_count))
+        print(f'  {error_rate:.0%} errors injected: {stub.errors} errors retried, final statuses {dict(statuses)}')
+    finally:
+        stub.stop()
+
+
+def bench_cache(fighters=200, latency=0.05, concurrency=8):
+    """
+    Runs the same crawl with empty cache, with warm cache and with expired cache (revalidated with ETag).
+    :param fighters: integer with number of fighters served by stub server
+    :param latency: float with seconds each response is delayed by
+    :param concurrency: integer with number of fetches in flight
+    :return: None
+    """
+    parser = load_parser()
+    stub = StubServer(fighters=fighters, latency=latency)
+    parser.SHERDOG_URL = stub.start()
+    print(f'cache: {fighters} indexes, {latency * 1000:.0f} ms latency, concurrency={concurrency}')
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, 'cache')
+            for run, ttl in (('cold', 3600), ('warm', 3600), ('expired', 0)):
+                parser.configure_transport()
+                cache = parser.configure_cache(cache_dir, ttl=ttl)
+                stub.requests = 0
+                start = time.perf_counter()
+                with quiet():
+                    parser.scrape_all_fighters(os.path.join(tmp, run), concurrency=concurrency)
+                elapsed = time.perf_counter() - start
+                print(f'  {run:<8} {elapsed:7.2f} s  {stub.requests:4} requests  {cache.stats()}')
+    finally:
+        stub.stop()
+
+
+def bench_columnar(fighters=3000):
+    """
+    Compares size and load time of csv output with parquet and arrow output of the same crawl. csv load includes
+    turning text into the same types columnar files store (dates, integer rounds, time in seconds).
+    :param fighters: integer with number of fighters served by stub server
+    :return: None
+    """
+    parser = load_parser()
+    if parser.pyarrow is None:
+        print('columnar: skipped, pyarrow is not installed')
+        return
+    import pyarrow.parquet
+    stub = StubServer(fighters=fighters, latency=0)
+    parser.SHERDOG_URL = stub.start()
+    print(f'columnar: {fighters} indexes')
+
+    def load_csv(path):
+        with open(path, newline='', encoding='utf-8') as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader)
+            return [(row[0], row[1], row[2], row[3], parser.parse_event_date(row[4]), row[5], row[6],
+                     parser.parse_round(row[7]), parser.parse_fight_time(row[8])) for row in reader]
+
+    loaders = {
+        'csv': load_csv,
+        'parquet': pyarrow.parquet.read_table,
+        'arrow': lambda path: pyarrow.ipc.open_stream(path).read_all(),
+    }
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for filetype, loader in loaders.items():
+                filename = os.path.join(tmp, 'sherdog')
+                with quiet():
+                    parser.scrape_all_fighters(filename, filetype=filetype, concurrency=16)
+                path = f'{filename}.{parser.COLUMNAR_FILETYPES.get(filetype, filetype)}'
+                start = time.perf_counter()
+                rows = len(loader(path))
+                elapsed = time.perf_counter() - start
+                print(f'  {filetype:<8} {os.path.getsize(path) / 1024:9.1f} KiB  {elapsed * 1000:8.1f} ms load  '
+                      f'{rows} rows')
+    finally:
+        stub.stop()
+
+
+def bench_store(fighters=3000):
+    """
+    Measures FightStore load time and aggregates over csv output, against the same records counted in a Python loop.
+    :param fighters: integer with number of fighters served by stub server
+    :return: None
+    """
+    parser = load_parser()
+    if parser.numpy is None:
+        print('store: skipped, numpy is not installed')
+        return
+    stub = StubServer(fighters=fighters, latency=0)
+    parser.SHERDOG_URL = stub.start()
+    print(f'store: {fighters} indexes')
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'sherdog')
+            with quiet():
+                parser.scrape_all_fighters(filename, concurrency=16)
+            start = time.perf_counter()
+            store = parser.FightStore.load(filename)
+            print(f'  load                  {(time.perf_counter() - start) * 1000:8.1f} ms  {len(store)} rows')
+            aggregates = {
+                'records': store.records,
+                'win_streaks': store.win_streaks,
+                'method_distribution': store.method_distribution,
+                'average_fight_time': store.average_fight_time,
+            }
+            for name, aggregate in aggregates.items():
+                start = time.perf_counter()
+                aggregate()
+                print(f'  {name:<21} {(time.perf_counter() - start) * 1000:8.1f} ms')
+            start = time.perf_counter()
+            records = collections.defaultdict(collections.Counter)
+            for row in parser.read_fight_rows(filename):
+                records[row[0]][row[2]] += 1
+            print(f'  records, Python loop  {(time.perf_counter() - start) * 1000:8.1f} ms (reading csv included)')
+    finally:
+        stub.stop()
+
+
+class FixtureResponse(object):
+    """Stands in for requests response object, so Fighter can be fed with a fixture page."""
+
+    def __init__(self, content):
+        self.content = content
+        self.text = content.decode('utf-8')
+        self.status_code = 200
+
+
+def bench_parse(pages=('fighter_short.html', 'fighter_long.html', 'fighter_empty.html'), repeat=200):
+    """
+    Measures time of Fighter.extract (soup + fight history extraction) per fixture page, and time of whole
+    Fighter.scrape_fighter (fetch from local stub server + extract + save) for the same pages.
+    :param pages: tuple of strings with fixture filenames
+    :param repeat: integer with number of times each page is parsed
+    :return: None
+    """
+    parser = load_parser()
+    stub = StubServer(latency=0)
+    parser.SHERDOG_URL = stub.start()
+    print(f'parse: {repeat} runs per page, {parser.PARSER_BACKEND} backend')
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for page in pages:
+                response = FixtureResponse(read_fixture(page))
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    F = parser.Fighter()
+                    F.resource = response
+                    F.extract()
+                extract_elapsed = time.perf_counter() - start
+                start = time.perf_counter()
+                with quiet():
+                    for _ in range(repeat):
+                        parser.Fighter().scrape_fighter('csv', os.path.join(tmp, 'parse'),
+                                                        fighter_page=f'/fixtures/{page}')
+                scrape_elapsed = time.perf_counter() - start
+                print(f'  {page:<24} {extract_elapsed / repeat * 1000:8.3f} ms/page extract  '
+                      f'{scrape_elapsed / repeat * 1000:8.3f} ms/page scrape_fighter')
+    finally:
+        stub.stop()
+
+
+def bench_pipeline(worker_counts=(None, 2, 4), fighters=300, concurrency=8):
+    """
+    Measures fighters per second of scrape_all_fighters with parsing in the main thread and in a pool of processes.
+    Stub server answers without delay and every other fighter has a long record, so the crawl is parse-bound.
+    :param worker_counts: tuple with numbers of parsing processes to be compared, None parses in the main thread
+    :param fighters: integer with number of fighters served by stub server
+    :param concurrency: integer with number of fetches in flight
+    :return: None
+    """
+    parser = load_parser()
+    stub = StubServer(fighters=fighters, long_every=2, latency=0)
+    parser.SHERDOG_URL = stub.start()
+    print(f'pipeline: {fighters} indexes, concurrency={concurrency}, {os.cpu_count()} CPUs')
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for parse_workers in worker_counts:
+                filename = os.path.join(tmp, f'pipeline-{parse_workers}')
+                start = time.perf_counter()
+                with quiet():
+                    parser.scrape_all_fighters(filename, concurrency=concurrency, parse_workers=parse_workers)
+                elapsed = time.perf_counter() - start
+                with open(f'{filename}.csv', newline='', encoding='utf-8') as output:
+                    fighters_saved = len({row[0] for row in csv.reader(output)}) - 1
+                print(f'  parse_workers={str(parse_workers):<5} {elapsed:7.2f} s  '
+                      f'{fighters_saved / elapsed:8.1f} fighters/s')
+    finally:
+        stub.stop()
+
+
+def bench_shards(worker_counts=(1, 2, 4), fighters=200, latency=0.05):
+    """
+    Measures fighters per second of scrape_sharded (one process per shard, parts merged at the end) for different
+    numbers of workers.
+    :param worker_counts: tuple of integers with numbers of workers to be compared
+    :param fighters: integer with number of fighters served by stub server
+    :param latency: float with seconds each response is delayed by
+    :return: None
+    """
+    parser = load_parser()
+    stub = StubServer(fighters=fighters, latency=latency)
+    parser.SHERDOG_URL = stub.start()
+    print(f'shards: {fighters} indexes, {latency * 1000:.0f} ms latency')
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for workers in worker_counts:
+                start = time.perf_counter()
+                with quiet():
+                    saved = parser.scrape_sharded(os.path.join(tmp, f'shards-{workers}'), workers=workers)
+                elapsed = time.perf_counter() - start
+                print(f'  workers={workers:<3} {elapsed:7.2f} s  {saved / elapsed:8.1f} fighters/s  {saved} fighters')
+    finally:
+        stub.stop()
+
+
+def bench_list(count=200, concurrency_levels=(1, 8), latency=0.02):
+    """
+    Measures fighters per second of scrape_list_of_fighters for a list mixing fighters found by name, fighters that
+    need weight-class filter and fighters that can not be found.
+    :param count: integer with number of fighters in the list
+    :param concurrency_levels: tuple of integers with concurrency values to be compared
+    :param latency: float with seconds each response is delayed by
+    :return: None
+    """
+    parser = load_parser()
+    stub = StubServer(latency=latency)
+    parser.SHERDOG_URL = stub.start()
+    kinds = ('Jon Jones', 'Multi Jones', 'Unknown Jones')
+    fighters_list = [(f'{kinds[number % 3]} {number}', 'Light Heavyweight', 'Bones') for number in range(count)]
+    print(f'list: {count} fighters, {latency * 1000:.0f} ms latency')
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for concurrency in concurrency_levels:
+                parser._search_cache.clear()  # every run sends its own searches.
+                stub.requests = 0
+                start = time.perf_counter()
+                with quiet():
+                    parser.scrape_list_of_fighters(fighters_list, os.path.join(tmp, f'list-{concurrency}'),
+                                                   concurrency=concurrency)
+                elapsed = time.perf_counter() - start
+                print(f'  concurrency={concurrency:<3} {elapsed:7.2f} s  {count / elapsed:8.1f} fighters/s  '
+                      f'{stub.requests} requests')
+    finally:
+        stub.stop()
+
+
+def bench_roster(roster_pages=20, latency=0.02, prefetch_levels=(1, 4, 8)):
+    """
+    Measures listing pages per second of scrape_ufc_roster for a few prefetch depths, and time get_ufc_roster takes
+    once snapshot is there.
+    :param roster_pages: integer with number of athletes listing pages for each gender
+    :param latency: float with seconds each response is delayed by
+    :param prefetch_levels: tuple with numbers of pages fetched ahead for each gender
+    :return: None
+    """
+    parser = load_parser()
+    stub = StubServer(roster_pages=roster_pages, latency=latency)
+    parser.UFC_URL = stub.start()
+    print(f'roster: {roster_pages} pages per gender, {latency * 1000:.0f} ms latency')
+    try:
+        for prefetch in prefetch_levels:
+            stub.requests = 0
+            start = time.perf_counter()
+            roster = parser.scrape_ufc_roster(prefetch=prefetch)
+            elapsed = time.perf_counter() - start
+            athletes = len(roster['men']) + len(roster['women'])
+            print(f'  prefetch={prefetch:<3} {elapsed:7.2f} s  {stub.requests / elapsed:8.1f} pages/s  '
+                  f'{athletes} athletes  {stub.requests} requests')
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot = os.path.join(tmp, 'ufc-roster-snapshot')
+            parser.get_ufc_roster(filename=snapshot)
+            parser._roster_snapshots.clear()
+            start = time.perf_counter()
+            parser.get_ufc_roster(filename=snapshot)
+            print(f'  snapshot from disk   {(time.perf_counter() - start) * 1000:7.2f} ms')
+            start = time.perf_counter()
+            parser.get_ufc_roster(filename=snapshot)
+            print(f'  snapshot from memory {(time.perf_counter() - start) * 1000:7.2f} ms')
+    finally:
+        stub.stop()
+
+
+# Fixture pages and names of page parts which scraper reads from them.
+PARSED_PAGES = {
+    'fighter_short.html': 'FIGHTER_PAGE_PARTS',
+    'fighter_long.html': 'FIGHTER_PAGE_PARTS',
+    'search_single.html': 'SEARCH_PAGE_PARTS',
+    'ufc_athletes.html': 'UFC_ROSTER_PAGE_PARTS',
+}
+
+
+def bench_backends(repeat=200):
+    """
+    Measures parse time and peak memory of building soup for each parser backend, with full and restricted parsing.
+    Peak memory is measured with tracemalloc, so it covers Python allocations only.
+    :param repeat: integer with number of times each page is parsed
+    :return: None
+    """
+    parser = load_parser()
+    default_backend = parser.PARSER_BACKEND
+    print(f'backends: {repeat} runs per page')
+    for page, parts_name in PARSED_PAGES.items():
+        markup = read_fixture(page).decode('utf-8')
+        parts = getattr(parser, parts_name)
+        print(f'  {page}')
+        for backend in parser.PARSER_BACKENDS:
+            for restricted in (False, True):
+                try:
+                    parser.set_parser_backend(backend, restricted=restricted)
+                except ValueError as error:
+                    print(f'    {backend:<12} skipped: {error}')
+                    break
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    parser.make_soup(markup, parts)
+                elapsed = time.perf_counter() - start
+                tracemalloc.start()
+                soup = parser.make_soup(markup, parts)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                del soup
+                mode = 'restricted' if restricted else 'full'
+                print(f'    {backend:<12} {mode:<11} {elapsed / repeat * 1000:8.3f} ms/page  '
+                      f'{peak / 1024:8.1f} KiB peak')
+    parser.set_parser_backend(default_backend)
+
+
+def _memory_worker(mode, count):
+    """
+    Extracts `count` fixture profiles and keeps all Fighter instances, then prints bytes still allocated by them,
+    measured with tracemalloc after garbage collection (current memory, not peak, so parsing does not hide what is
+    kept). Runs in its own process, so modes do not share caches or allocator state.
+    :param mode: string, 'retained' keeps response and soup of every fighter (as before FightRecord), 'released'
+                 drops them after extraction
+    :param count: integer with number of profiles
+    :return: None
+    """
+    parser = load_parser()
+    content = read_fixture('fighter_short.html')
+    warm_up = parser.Fighter()  # lazily built parser state is not counted as kept by fighters.
+    warm_up.resource = FixtureResponse(content)
+    warm_up.extract(release=(mode == 'released'))
+    tracemalloc.start()
+    gc.collect()
+    baseline = tracemalloc.get_traced_memory()[0]
+    fighters = []
+    for fighter_index in range(count):
+        F = parser.Fighter()
+        F.resource = FixtureResponse(content.replace(b'Tony Galindo', b'Tony Galindo %d' % fighter_index))
+        F.extract(release=(mode == 'released'))
+        fighters.append(F)
+    gc.collect()
+    print(tracemalloc.get_traced_memory()[0] - baseline)
+
+
+def bench_memory(count=2000):
+    """
+    Compares memory retained by keeping `count` scraped fighters with and without releasing their pages and parse
+    trees.
+    :param count: integer with number of fixture profiles
+    :return: None
+    """
+    print(f'memory: {count} fighters kept in memory')
+    for mode in ('retained', 'released'):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '_memory', mode, str(count)],
+                                check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+        retained = int(output.split()[-1]) / 1024
+        print(f'  {mode:<9} {retained / 1024:8.1f} MiB retained  {retained / count:7.1f} KiB per fighter')
+
+
+BENCHMARKS = {
+    'parse': bench_parse,
+    'crawl': bench_crawl,
+    'pipeline': bench_pipeline,
+    'shards': bench_shards,
+    'list': bench_list,
+    'roster': bench_roster,
+    'backends': bench_backends,
+    'transport': bench_transport,
+    'throttle': bench_throttle,
+    'cache': bench_cache,
+    'columnar': bench_columnar,
+    'store': bench_store,
+    'memory': bench_memory,
+}
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['_memory']:
+        _memory_worker(sys.argv[2], int(sys.argv[3]))
+        sys.exit()
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for bench_name in selected:
+        BENCHMARKS[bench_name]()
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux.
+        print(f'  peak RSS of benchmark process so far: {peak_rss / 1024:.1f} MiB')
@@ -0,0 +1,39 @@
+# Python 3.7
+# shared by sherdog-parser.py and regex.py
+# Created by - Montanaz0r (https://github.com/Montanaz0r)
+# Row cleaning for scraped csv files. Nothing happens on import: no logging setup, no files and no network.
+
+
+def clean_field(field):
+    """
+    Cleans a single csv field the way regex.py always did: commas inside double quotes are removed, then all double
+    quotes and dashes. A comma is inside quotes when an odd number of quotes follows it, which is found in one linear
+    pass over the parts between quotes instead of scanning the rest of the field again for every comma.
+    :param field: string with field value
+    :return: string with cleaned field
+    """
+    if '"' not in field:
+        return field.replace('-', '')
+    parts = field.split('"')
+    last = len(parts) - 1  # quotes after part k: last - k.
+    return ''.join(part.replace(',', '') if (last - position) % 2 else part
+                   for position, part in enumerate(parts)).replace('-', '')
+
+
+def clean_row(row):
+    """
+    :param row: list of strings with csv row
+    :return: list of strings with cleaned row; a row read as a single field is split on its remaining commas
+    """
+    if len(row) == 1:
+        return clean_field(row[0]).split(',')
+    return [clean_field(field) for field in row]
+
+
+def clean_rows(rows):
+    """
+    :param rows: iterable with csv rows
+    :return: generator with cleaned rows, one row is held in memory at a time
+    """
+    for row in rows:
+        yield clean_row(row)
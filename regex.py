@@ -4,34 +4,28 @@
 # Some of records scrapped from sherdog did have tricky event names, for instance there was ',' inside double quote,
 # it messed with reading these lines properly in Pandas so i have decided to help myself with regular expressions.
 # Code below will adjust problematic lines.
+# Rows are cleaned one by one as they are read (see clean_field in csv_cleaner.py), so the whole csv is never held
+# in memory. scrape_all_fighters(..., sanitize=True) writes already cleaned csv, without a separate pass.
 
+from csv_cleaner import clean_rows
 import csv
-import re
-
-new_csv = []
-with open('sherdog.csv', newline='') as csvfile:
-    reader = csv.reader(csvfile)
-    for row in reader:
-        new_row = []
-        if len(row) == 1:
-            subbed = re.sub(r'(?!(([^"]*"){2})*[^"]*$),', '', row[0])
-            subbed = subbed.replace('"', '')
-            subbed = subbed.replace('-', '')
-            after_split = subbed.split(',')
-            new_csv.append(after_split)
-        else:
-            for word in row:
-                subbed = re.sub(r'(?!(([^"]*"){2})*[^"]*$),', '', word)
-                subbed = subbed.replace('"', '')
-                subbed = subbed.replace('-', '')
-                new_row.append(subbed)
-            new_csv.append(new_row)
-
-with open('sherdog-subbed.csv', 'w', newline='') as f:
-    writer = csv.writer(f, delimiter=';', skipinitialspace=True)
-    for line in new_csv:
-        writer.writerow(line)
 
 
+def clean_csv(source='sherdog.csv', target='sherdog-subbed.csv'):
+    """
+    Streams rows from source csv to target csv, cleaning them on the way.
+    :param source: string with path of csv file written by the scraper
+    :param target: string with path of semicolon separated csv file with cleaned rows
+    :return: integer with number of rows written
+    """
+    rows = 0
+    with open(source, newline='', encoding='utf-8') as csvfile, open(target, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=';', skipinitialspace=True)
+        for line in clean_rows(csv.reader(csvfile)):
+            writer.writerow(line)
+            rows += 1
+    return rows
 
 
+if __name__ == '__main__':
+    clean_csv()
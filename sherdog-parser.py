@@ -3,668 +3,3894 @@
 # please get familiar with readme file before using!
 # Created by - Montanaz0r (https://github.com/Montanaz0r)
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from csv_cleaner import clean_rows
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from urllib3.util.retry import Retry
 import requests
+import argparse
+import asyncio
+import bisect
+import collections
+import concurrent.futures
+import itertools
 import csv
+import datetime
+import gzip
+import hashlib
+import heapq
 import logging
 import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+try:  # pyarrow is needed only for parquet and arrow output.
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:  # numpy is needed only for FightStore.
+    import numpy
+except ImportError:
+    numpy = None
 
 # Initializes logging file.
 logging.basicConfig(filename='sherdog.log', level=logging.INFO, format='%(asctime)s:%(levelname)s:%(message)s')
 
+# Base addresses of scraped sites, can be pointed at a local stub server for benchmarking.
+SHERDOG_URL = 'https://www.sherdog.com'
+UFC_URL = 'https://www.ufc.com'
+
+MAX_FAILS = 10  # scraper will be done after there were 10 non-existing sites (indexes) in a row.
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)  # responses that are worth retrying after a while.
+
+
+class _NullTimer(object):
+    """Timer used while metrics are disabled, does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class _StageTimer(object):
+    """Measures time spent in a `with` block and records it in Metrics histogram of the stage."""
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics(object):
+    """Metrics class - counters and latency histograms of crawl stages (fetch, parse, extract, validate, save), with
+    export to Prometheus text format or json. Disabled metrics return right away, so instrumentation costs next to
+    nothing unless configure_metrics was called.
+    """
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+
+    def __init__(self, enabled=False):
+        """
+        Initializes a Metrics instance.
+        :param enabled: boolean, if False nothing is recorded
+        """
+        self.enabled = enabled
+        self.counters = collections.defaultdict(int)  # (name, ((label, value), ...)) -> integer
+        self.histograms = {}  # stage -> [list of bucket counts, sum of seconds, count]
+        self._lock = threading.Lock()
+        self._exporter = None
+        self._stop_exporter = None
+
+    def count(self, name, value=1, **labels):
+        """
+        Increments a counter.
+        :param name: string with counter name
+        :param value: integer added to the counter
+        :param labels: optional - string labels of the counter, e.g. status='200'
+        :return: None
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += value
+
+    def observe(self, stage, seconds):
+        """
+        Records duration of a single run of a stage.
+        :param stage: string with stage name
+        :param seconds: float with duration
+        :return: None
+        """
+        if not self.enabled:
+            return
+        bucket = bisect.bisect_left(self.BUCKETS, seconds)
+        with self._lock:
+            histogram = self.histograms.setdefault(stage, [[0] * (len(self.BUCKETS) + 1), 0.0, 0])
+            histogram[0][bucket] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def timer(self, stage):
+        """
+        :param stage: string with stage name
+        :return: context manager recording duration of its block for the stage
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def snapshot(self):
+        """
+        :return: dictionary with counters (name -> list of {'labels', 'value'}) and histograms (stage -> count, sum,
+                 mean and cumulative bucket counts)
+        """
+        with self._lock:
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+            histograms = {}
+            for stage, (buckets, total, count) in sorted(self.histograms.items()):
+                cumulative = list(itertools.accumulate(buckets))
+                histograms[stage] = {'count': count, 'sum': total, 'mean': total / count if count else None,
+                                     'buckets': dict(zip([str(bound) for bound in self.BUCKETS] + ['+Inf'],
+                                                         cumulative))}
+        return {'time': time.time(), 'counters': counters, 'histograms': histograms}
+
+    def to_prometheus(self):
+        """
+        :return: string with all metrics in Prometheus text exposition format
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name, samples in snapshot['counters'].items():
+            lines.append(f'# TYPE sherdog_{name}_total counter')
+            for sample in samples:
+                labels = ','.join(f'{label}="{value}"' for label, value in sample['labels'].items())
+                lines.append(f'sherdog_{name}_total{{{labels}}} {sample["value"]}' if labels
+                             else f'sherdog_{name}_total {sample["value"]}')
+        if snapshot['histograms']:
+            lines.append('# TYPE sherdog_stage_seconds histogram')
+        for stage, histogram in snapshot['histograms'].items():
+            for bound, count in histogram['buckets'].items():
+                lines.append(f'sherdog_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'sherdog_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]}')
+            lines.append(f'sherdog_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path, export_format='prometheus'):
+        """
+        Writes all metrics to a file, replacing the old one atomically, so scrapers never read half-written file.
+        :param path: string with path of the file
+        :param export_format: string with 'prometheus' (text exposition format) or 'json' (snapshot)
+        :return: None
+        """
+        if export_format == 'prometheus':
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=4)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as export_file:
+            export_file.write(content)
+        os.replace(f'{path}.tmp', path)
+
+    def start_exporter(self, path, export_format='prometheus', interval=15.0):
+        """
+        Starts background thread exporting metrics every `interval` seconds.
+        :param path: string with path of the file
+        :param export_format: string with 'prometheus' or 'json'
+        :param interval: float with seconds between exports
+        :return: None
+        """
+        self.stop_exporter()
+        stop = threading.Event()
+
+        def exporter():
+            while not stop.wait(interval):
+                self.export(path, export_format)
+            self.export(path, export_format)  # final state, written when exporter is stopped.
+
+        self._stop_exporter = stop
+        self._exporter = threading.Thread(target=exporter, name='metrics-exporter', daemon=True)
+        self._exporter.start()
+
+    def stop_exporter(self):
+        """
+        Stops exporter thread, if there is one, after it has written the final export.
+        :return: None
+        """
+        if self._exporter is not None:
+            self._stop_exporter.set()
+            self._exporter.join()
+            self._exporter = None
+
+
+_metrics = Metrics()  # shared Metrics instance, disabled until configure_metrics is called
+
+
+def configure_metrics(enabled=True, export_path=None, export_format='prometheus', interval=15.0):
+    """
+    Replaces shared metrics with new ones, optionally exported periodically to a file.
+    :param enabled: boolean, False turns instrumentation off
+    :param export_path: optional - string with path of the file metrics are written to, or None
+    :param export_format: string with 'prometheus' (text file, e.g. for node exporter textfile collector) or 'json'
+    :param interval: float with seconds between exports
+    :return: Metrics instance
+    """
+    global _metrics
+    _metrics.stop_exporter()
+    _metrics = Metrics(enabled=enabled)
+    if enabled and export_path is not None:
+        _metrics.start_exporter(export_path, export_format=export_format, interval=interval)
+    return _metrics
+
+
+def get_metrics():
+    """
+    :return: shared Metrics instance
+    """
+    return _metrics
+
+
+class ResponseCache(object):
+    """ResponseCache class - on-disk cache of successful responses. Bodies are gzipped and stored under the hash of
+    their content, so identical pages (e.g. all empty fighter indexes) are kept once; each url has a small entry file
+    pointing at its body. Entries older than ttl are revalidated with ETag/Last-Modified when the server sent them,
+    least recently used entries are evicted when bodies take more than max_bytes.
+    """
+
+    def __init__(self, directory='http-cache', ttl=7 * 24 * 3600, max_bytes=2 * 1024 ** 3):
+        """
+        Initializes a ResponseCache instance, picking up entries already stored in directory.
+        :param directory: string with path to cache directory, it will be created if needed
+        :param ttl: float with seconds a stored response is served without asking the server
+        :param max_bytes: integer with maximum size of stored (compressed) bodies
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0  # integer: responses served from disk without a request
+        self.revalidated = 0  # integer: responses served from disk after server answered 304 Not Modified
+        self.misses = 0  # integer: responses downloaded
+        self.evictions = 0  # integer: entries removed to stay under max_bytes
+        self.size = 0  # integer: bytes taken by stored bodies
+        self._entries = collections.OrderedDict()  # url key -> body key, least recently used first
+        self._body_refs = collections.Counter()  # body key -> number of entries pointing at it
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'entries'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'bodies'), exist_ok=True)
+        self._load()
+
+    def _entry_path(self, key):
+        """
+        :param key: string with url hash
+        :return: string with path of entry file
+        """
+        return os.path.join(self.directory, 'entries', f'{key}.json')
+
+    def _body_path(self, key):
+        """
+        :param key: string with content hash
+        :return: string with path of gzipped body
+        """
+        return os.path.join(self.directory, 'bodies', f'{key}.gz')
+
+    def _load(self):
+        """
+        Rebuilds in-memory index from entry files, using their modification time as last use time.
+        :return: None
+        """
+        entries_dir = os.path.join(self.directory, 'entries')
+        found = []
+        for entry_name in os.listdir(entries_dir):
+            if not entry_name.endswith('.json'):
+                continue
+            path = os.path.join(entries_dir, entry_name)
+            try:
+                with open(path) as entry_file:
+                    entry = json.load(entry_file)
+            except (OSError, ValueError):
+                continue
+            found.append((os.path.getmtime(path), entry_name[:-5], entry['body']))
+        for _, key, body_key in sorted(found):
+            if not os.path.exists(self._body_path(body_key)):
+                continue
+            self._entries[key] = body_key
+            if self._body_refs[body_key] == 0:
+                self.size += os.path.getsize(self._body_path(body_key))
+            self._body_refs[body_key] += 1
+
+    @staticmethod
+    def _write_atomic(path, data):
+        """
+        Writes file under temporary name and renames it, so readers never see half written files.
+        :param path: string with destination path
+        :param data: bytes
+        :return: None
+        """
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as temporary_file:
+            temporary_file.write(data)
+        os.replace(temporary, path)
+
+    def lookup(self, url):
+        """
+        Finds stored entry for url and marks it as recently used.
+        :param url: string with url
+        :return: dictionary with entry data, or None if url is not cached
+        """
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._entry_path(key)) as entry_file:
+                entry = json.load(entry_file)
+            os.utime(self._entry_path(key))
+        except (OSError, ValueError):
+            return None
+        entry['key'] = key
+        return entry
+
+    def is_fresh(self, entry):
+        """
+        :param entry: dictionary with entry data
+        :return: True if entry can be served without asking the server
+        """
+        return time.time() - entry['stored'] < self.ttl
+
+    @staticmethod
+    def validators(entry):
+        """
+        Builds conditional request headers for stale entry.
+        :param entry: dictionary with entry data, or None
+        :return: dictionary with If-None-Match / If-Modified-Since headers, empty if server sent no validators
+        """
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def response(self, entry):
+        """
+        Recreates response object from stored entry.
+        :param entry: dictionary with entry data
+        :return: response object with from_cache attribute set to True, or None if body is gone (evicted by another
+                 thread after entry was looked up), which is a cache miss
+        """
+        try:
+            with open(self._body_path(entry['body']), 'rb') as body_file:
+                content = gzip.decompress(body_file.read())
+        except (OSError, EOFError):
+            return None
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.url = entry['url']
+        response.encoding = entry['encoding']
+        response.headers['Content-Type'] = entry['content_type']
+        if entry.get('etag'):
+            response.headers['ETag'] = entry['etag']
+        if entry.get('last_modified'):
+            response.headers['Last-Modified'] = entry['last_modified']
+        response._content = content
+        response.from_cache = True
+        return response
+
+    def refresh(self, entry):
+        """
+        Restarts ttl of entry after server confirmed it was not modified. Entry evicted in the meantime is not written
+        again, eviction holds the same lock.
+        :param entry: dictionary with entry data
+        :return: True if entry is still stored, False if it was evicted (which is a cache miss)
+        """
+        entry = dict(entry)
+        key = entry.pop('key')
+        entry['stored'] = time.time()
+        with self._lock:
+            if self._entries.get(key) != entry['body']:
+                return False
+            self._write_atomic(self._entry_path(key), json.dumps(entry).encode('utf-8'))
+        return True
+
+    def record(self, counter):
+        """
+        Counts a served response; counters are shared by all fetching threads, so they are updated under lock.
+        :param counter: string with 'hits', 'revalidated' or 'misses'
+        :return: None
+        """
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def store(self, url, response):
+        """
+        Stores successful response, evicting least recently used entries if cache grows over max_bytes. Files are
+        written under lock, so an eviction running in another thread never removes them half way.
+        :param url: string with requested url
+        :param response: response object
+        :return: None
+        """
+        if response.status_code != 200:
+            return
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        body_key = hashlib.sha256(response.content).hexdigest()
+        body_path = self._body_path(body_key)
+        body = gzip.compress(response.content) if not os.path.exists(body_path) else None
+        entry = {'url': response.url or url, 'body': body_key, 'stored': time.time(), 'status': response.status_code,
+                 'encoding': response.encoding, 'content_type': response.headers.get('Content-Type', ''),
+                 'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+        with self._lock:
+            if not os.path.exists(body_path):
+                self._write_atomic(body_path, body if body is not None else gzip.compress(response.content))
+            self._write_atomic(self._entry_path(key), json.dumps(entry).encode('utf-8'))
+            if self._body_refs[body_key] == 0:
+                self.size += os.path.getsize(body_path)
+            self._body_refs[body_key] += 1  # taken before previous body is released, it may be the same one.
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._release_body(previous)
+            self._entries[key] = body_key
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                old_key, old_body_key = self._entries.popitem(last=False)
+                self._remove(self._entry_path(old_key))
+                self._release_body(old_body_key)
+                self.evictions += 1
+
+    def _release_body(self, body_key):
+        """
+        Drops reference to stored body, deleting it when no entry points at it anymore. Called with lock held.
+        :param body_key: string with body hash
+        :return: None
+        """
+        self._body_refs[body_key] -= 1
+        if self._body_refs[body_key] <= 0:
+            del self._body_refs[body_key]
+            body_path = self._body_path(body_key)
+            if os.path.exists(body_path):
+                self.size -= os.path.getsize(body_path)
+                self._remove(body_path)
+
+    @staticmethod
+    def _remove(path):
+        """
+        Removes file, ignoring files that are already gone.
+        :param path: string with path
+        :return: None
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self):
+        """
+        :return: dictionary with hit/miss counters, number of entries and size of stored bodies
+        """
+        return {'hits': self.hits, 'revalidated': self.revalidated, 'misses': self.misses,
+                'evictions': self.evictions, 'entries': len(self._entries), 'bytes': self.size}
+
+
+class TokenBucket(object):
+    """TokenBucket class - lets through at most `rate` requests per second on average, with bursts of up to `burst`
+    requests after a quiet period.
+    """
+
+    def __init__(self, rate, burst):
+        """
+        Initializes a TokenBucket instance, starting full.
+        :param rate: float with tokens added per second
+        :param burst: float with maximum number of tokens kept
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes a single token, waiting until one is available.
+        :return: float with seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class HostLimiter(object):
+    """HostLimiter class - rate and concurrency limit for a single host, both adjusted with AIMD. Concurrency limit
+    grows by about one request per round of healthy responses and is cut by `decrease` factor when the host answers
+    with 429 or 5xx, needed retries, failed, or became much slower than usual - at most once per round trip, so a burst
+    of bad responses to requests sent at the same time counts once. Throttled (429) responses cut the rate as well,
+    which then grows back by about one request per second each second, up to `rate`.
+    """
+
+    def __init__(self, rate=10.0, burst=10, initial_concurrency=4, max_concurrency=32, decrease=0.5,
+                 latency_tolerance=2.0):
+        """
+        Initializes a HostLimiter instance.
+        :param rate: float with maximum requests per second
+        :param burst: integer with maximum requests sent at once after a quiet period
+        :param initial_concurrency: integer with requests allowed in flight at start
+        :param max_concurrency: integer with upper bound of requests in flight
+        :param decrease: float, concurrency limit is multiplied by it on overload
+        :param latency_tolerance: float, latency above usual latency times tolerance counts as overload
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.max_rate = rate
+        self.limit = float(initial_concurrency)
+        self.max_concurrency = max_concurrency
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.latency = None  # smoothed latency of recent responses
+        self.baseline = None  # lowest smoothed latency seen, taken as usual latency of the host
+        self.last_decrease = 0.0
+        self.overloads = 0  # integer: number of responses treated as overload
+        self.waited = 0.0  # float: seconds requests spent waiting for rate or concurrency limit
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Waits until another request may be sent to the host.
+        :return: None
+        """
+        start = time.monotonic()
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        self.bucket.acquire()
+        self.waited += time.monotonic() - start
+
+    def release(self, status_code=None, latency=None, retries=0):
+        """
+        Records outcome of a request and adjusts concurrency limit.
+        :param status_code: integer with final status code, or None if request failed
+        :param latency: float with seconds the request took, or None
+        :param retries: integer with number of retries the request needed
+        :return: None
+        """
+        with self._condition:
+            self.in_flight -= 1
+            slow = False
+            if latency is not None and retries == 0:  # latency of retried requests includes waiting between tries.
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                self.baseline = self.latency if self.baseline is None else min(self.baseline, self.latency)
+                slow = self.latency > self.baseline * self.latency_tolerance
+            overloaded = status_code is None or status_code == 429 or status_code >= 500 or retries > 0 or slow
+            now = time.monotonic()
+            if overloaded:
+                self.overloads += 1
+                if now - self.last_decrease >= (self.latency or 0.0):
+                    self.limit = max(1.0, self.limit * self.decrease)
+                    if status_code == 429 or retries > 0:
+                        self.bucket.rate = max(0.1, self.bucket.rate * self.decrease)
+                    self.last_decrease = now
+                    if slow:
+                        self.baseline = self.latency  # slower host becomes the new normal, otherwise limit collapses.
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                self.bucket.rate = min(self.max_rate, self.bucket.rate + 1 / self.bucket.rate)
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        :return: dictionary with current concurrency limit and rate, requests in flight, smoothed latency, overloads
+                 and seconds spent waiting
+        """
+        return {'limit': int(self.limit), 'rate': self.bucket.rate, 'in_flight': self.in_flight,
+                'latency': self.latency, 'overloads': self.overloads, 'waited': self.waited}
+
+
+class RateLimiter(object):
+    """RateLimiter class - keeps a HostLimiter for every host requests are sent to, so Sherdog and UFC limits are
+    applied separately.
+    """
+
+    def __init__(self, **host_settings):
+        """
+        Initializes a RateLimiter instance.
+        :param host_settings: arguments of HostLimiter used for every host
+        """
+        self.host_settings = host_settings
+        self.hosts = {}  # host -> HostLimiter instance
+        self._lock = threading.Lock()
+
+    def host(self, url):
+        """
+        :param url: string with url
+        :return: HostLimiter instance of url's host
+        """
+        netloc = urlsplit(url).netloc
+        with self._lock:
+            if netloc not in self.hosts:
+                self.hosts[netloc] = HostLimiter(**self.host_settings)
+            return self.hosts[netloc]
+
+    def stats(self):
+        """
+        :return: dictionary with stats of each host
+        """
+        return {netloc: limiter.stats() for netloc, limiter in self.hosts.items()}
+
+
+class Transport(object):
+    """Transport class - shared HTTP layer used for all fetches, keeps a pool of keep-alive connections, so handshakes
+    are not repeated for every request, and retries transient errors with growing delay.
+    """
+
+    def __init__(self, pool_size=10, timeout=(5, 30), retries=5, backoff=0.5, latency_samples=1000, cache=None,
+                 limiter=None):
+        """
+        Initializes a Transport instance.
+        :param pool_size: integer with number of connections kept alive per host
+        :param timeout: float or tuple (connect, read) with seconds to wait for the server
+        :param retries: integer with number of retries on connection errors and RETRY_STATUSES responses
+        :param backoff: float, retries wait backoff * 2 ** (retry number - 1) seconds (Retry-After is respected)
+        :param latency_samples: integer with number of recent request latencies kept for latency_stats
+        :param cache: optional - ResponseCache instance used in front of all requests, or None
+        :param limiter: optional - RateLimiter instance every request has to pass, or None
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff,
+                           status_forcelist=RETRY_STATUSES, raise_on_status=False)
+        self.session = requests.Session()
+        self._pid = os.getpid()  # process the session was created in
+        self._mount()
+        self.latencies = collections.deque(maxlen=latency_samples)  # seconds, most recent requests
+        self.requests = 0  # integer: number of requests sent, retries not included
+        self.cache = cache
+        self.limiter = limiter
+
+    def _mount(self):
+        """
+        Mounts connection pool adapter with current pool size and retry policy on the session.
+        :return: None
+        """
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=self.retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def ensure_pool_size(self, pool_size):
+        """
+        Grows connection pool, so it can hold a connection for each concurrent fetch.
+        :param pool_size: integer with required number of connections per host
+        :return: None
+        """
+        if pool_size > self.pool_size:
+            self.pool_size = pool_size
+            self._mount()
+
+    def get(self, url, validators=None):
+        """
+        Sends GET request through the pooled session, or serves it from cache when possible.
+        :param url: string with url
+        :param validators: optional - dictionary with If-None-Match / If-Modified-Since headers of a page caller already
+                           has (they replace those of a stale cache entry), a 304 answer to them is returned as is
+        :return: response object, with latency attribute holding seconds spent on the request including retries
+        """
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.lookup(url)
+            if entry is not None and self.cache.is_fresh(entry):
+                response = self.cache.response(entry)
+                if response is not None:
+                    self.cache.record('hits')
+                    _metrics.count('cache_hits')
+                    response.latency = 0.0
+                    return response
+                entry = None  # body was evicted meanwhile, page is downloaded again.
+        response = self._send(url, validators if validators else ResponseCache.validators(entry))
+        if self.cache is not None and not (response.status_code == 304 and validators):  # caller has 304's page.
+            if response.status_code == 304 and entry is not None:
+                cached = self.cache.response(entry) if self.cache.refresh(entry) else None
+                if cached is not None:
+                    self.cache.record('revalidated')
+                    cached.latency = response.latency
+                    return cached
+                response = self._send(url, {})  # entry was evicted meanwhile, page is downloaded again.
+            self.cache.record('misses')
+            self.cache.store(url, response)
+        return response
+
+    def _send(self, url, headers):
+        """
+        Sends GET request through the pooled session, passing rate limiter and recording latency and metrics.
+        :param url: string with url
+        :param headers: dictionary with request headers
+        :return: response object, with latency attribute holding seconds spent on the request including retries
+        """
+        if self._pid != os.getpid():  # forked process (e.g. of scrape_sharded) must not share parent's connections.
+            self.session = requests.Session()
+            self._pid = os.getpid()
+            self._mount()
+        host = self.limiter.host(url) if self.limiter is not None else None
+        if host is not None:
+            host.acquire()
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        except requests.RequestException:
+            if host is not None:
+                host.release()
+            raise
+        response.latency = time.perf_counter() - start
+        if host is not None:
+            retries = getattr(response.raw, 'retries', None)
+            host.release(response.status_code, response.latency, len(retries.history) if retries is not None else 0)
+        self.latencies.append(response.latency)
+        self.requests += 1
+        if _metrics.enabled:
+            _metrics.observe('fetch', response.latency)
+            _metrics.count('http_responses', status=str(response.status_code))
+            _metrics.count('bytes_fetched', len(response.content))
+            retries = getattr(response.raw, 'retries', None)
+            if retries is not None and retries.history:
+                _metrics.count('http_retries', len(retries.history))
+        return response
+
+    def latency_stats(self):
+        """
+        Summarizes latency of recent requests.
+        :return: dictionary with number of samples, mean, median and 95th percentile in seconds
+        """
+        samples = sorted(self.latencies)
+        if not samples:
+            return {'samples': 0, 'mean': None, 'p50': None, 'p95': None}
+        return {'samples': len(samples), 'mean': sum(samples) / len(samples), 'p50': samples[len(samples) // 2],
+                'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))]}
+
+
+_transport = None  # shared Transport instance, created on first fetch
+
+
+def configure_transport(**kwargs):
+    """
+    Replaces shared transport with a new one, takes the same arguments as Transport.
+    :return: Transport instance
+    """
+    global _transport
+    _transport = Transport(**kwargs)
+    return _transport
+
+
+def configure_cache(directory='http-cache', ttl=7 * 24 * 3600, max_bytes=2 * 1024 ** 3):
+    """
+    Puts on-disk response cache in front of shared transport, takes the same arguments as ResponseCache.
+    :return: ResponseCache instance
+    """
+    cache = ResponseCache(directory=directory, ttl=ttl, max_bytes=max_bytes)
+    get_transport().cache = cache
+    return cache
+
+
+def configure_rate_limit(rate=10.0, burst=10, initial_concurrency=4, max_concurrency=32, **host_settings):
+    """
+    Puts per-host rate limiter in front of shared transport, takes the same arguments as HostLimiter.
+    :return: RateLimiter instance
+    """
+    limiter = RateLimiter(rate=rate, burst=burst, initial_concurrency=initial_concurrency,
+                          max_concurrency=max_concurrency, **host_settings)
+    get_transport().limiter = limiter
+    return limiter
+
+
+def get_transport():
+    """
+    Gets shared transport, creating one with default settings when needed.
+    :return: Transport instance
+    """
+    if _transport is None:
+        return configure_transport()
+    return _transport
+
+
+# HTML parser settings, see set_parser_backend.
+PARSER_BACKENDS = ('html.parser', 'lxml', 'stream')
+PARSER_BACKEND = 'lxml' if builder_registry.lookup('lxml') is not None else 'html.parser'
+RESTRICTED_PARSING = True
+
+# Parts of pages which are actually read by the scraper, as (tag, class attribute) pairs.
+FIGHTER_PAGE_PARTS = [('span', 'fn'), ('span', 'nickname'), ('h6', 'item wclass'), ('div', 'module fight_history')]
+SEARCH_PAGE_PARTS = [('div', 'col_left')]
+UFC_ROSTER_PAGE_PARTS = [('div', 'c-listing-athlete__text')]
+EVENT_PAGE_PARTS = [('div', 'module event_detail'), ('div', 'module fight_card'), ('div', 'module event_match')]
+
+
+def set_parser_backend(backend, restricted=True):
+    """
+    Chooses HTML parser used for all scraped pages.
+    :param backend: string with one of PARSER_BACKENDS:
+                    'html.parser' - pure-Python parser from standard library (default without lxml)
+                    'lxml' - C parser, requires lxml package (default when it is installed)
+                    'stream' - cuts needed parts out of raw page first, then parses only them with html.parser
+    :param restricted: boolean, if True only parts of pages that scraper reads are turned into soup, which makes
+                       smaller trees; whole page is still tokenized, so parse time drops only a little
+    :return: None
+    """
+    global PARSER_BACKEND, RESTRICTED_PARSING
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f'Unknown parser backend {backend}, please choose one of {PARSER_BACKENDS}.')
+    if backend == 'lxml' and builder_registry.lookup('lxml') is None:
+        raise ValueError('lxml parser backend requires lxml package to be installed.')
+    PARSER_BACKEND = backend
+    RESTRICTED_PARSING = restricted
+
+
+def _slice_parts(markup, parts):
+    """
+    Streaming tokenizer - finds elements with given tag and class in raw markup and cuts them out, balancing nested
+    tags of the same name, without building any tree.
+    :param markup: string with html page
+    :param parts: list of (tag, class attribute) pairs
+    :return: list of strings with html of found elements, in page order
+    """
+    found = []
+    for tag, class_name in parts:
+        start_pattern = re.compile(rf'<{tag}\b[^>]*\bclass\s*=\s*["\']{re.escape(class_name)}["\']', re.IGNORECASE)
+        tag_pattern = re.compile(rf'<(/?){tag}\b[^>]*>', re.IGNORECASE)
+        position = 0
+        while True:
+            start = start_pattern.search(markup, position)
+            if start is None:
+                break
+            depth = 0
+            end = len(markup)
+            for tag_match in tag_pattern.finditer(markup, start.start()):
+                depth += -1 if tag_match.group(1) else 1
+                if depth == 0:
+                    end = tag_match.end()
+                    break
+            found.append((start.start(), end))
+            position = end
+    fragments = []
+    last_end = 0
+    for start, end in sorted(found):
+        if start >= last_end:  # skipping elements nested in already cut ones.
+            fragments.append(markup[start:end])
+            last_end = end
+    return fragments
+
+
+def make_soup(markup, parts=None):
+    """
+    Creates BeautifulSoup object with chosen parser backend.
+    :param markup: string with html page
+    :param parts: optional - list of (tag, class attribute) pairs; with restricted parsing only these elements
+                  (with everything inside them) are built, None builds whole page
+    :return: BeautifulSoup instance
+    """
+    with _metrics.timer('parse'):
+        if parts is None or not RESTRICTED_PARSING:
+            features = 'lxml' if PARSER_BACKEND == 'lxml' else 'html.parser'
+            return BeautifulSoup(markup, features=features)
+        if PARSER_BACKEND == 'stream':
+            return BeautifulSoup(''.join(_slice_parts(markup, parts)), features='html.parser')
+        strainer = SoupStrainer([tag for tag, _ in parts], class_=[class_name for _, class_name in parts])
+        return BeautifulSoup(markup, features=PARSER_BACKEND, parse_only=strainer)
+
+
+def _row_digest(fight_row):
+    """
+    Hashes all fields of a single fight.
+    :param fight_row: FightRecord instance
+    :return: string with short hex digest
+    """
+    return hashlib.sha1(json.dumps(fight_row.as_dict(), sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class FightRecord(object):
+    """FightRecord class - single pro fight of a fighter. Uses __slots__, so a fight takes a few dozen bytes besides
+    its strings instead of a dictionary per fight.
+    """
+
+    __slots__ = ('opponent', 'result', 'event', 'date', 'method', 'judge', 'round', 'time')
+
+    def __init__(self, opponent, result, event, date, method, judge, round, time):
+        """
+        Initializes a FightRecord instance, all fields are strings as scraped from Sherdog.
+        """
+        self.opponent = opponent
+        self.result = result
+        self.event = event
+        self.date = date
+        self.method = method
+        self.judge = judge
+        self.round = round
+        self.time = time
+
+    def as_dict(self):
+        """
+        :return: dictionary with fight, in the form it is saved to json files
+        """
+        return {'opponent': self.opponent, 'result': self.result, 'event': self.event, 'date': self.date,
+                'method': self.method, 'judge': self.judge, 'round': self.round, 'time': self.time}
+
+    def __repr__(self):
+        return f'FightRecord({self.as_dict()})'
+
+
+def _normalize(text):
+    """
+    :param text: string, e.g. fighter's name or event name
+    :return: string in lower case with single spaces, so the same name scraped from two pages compares equal
+    """
+    return ' '.join(str(text).casefold().split())
+
+
+FLIPPED_RESULTS = {'win': 'loss', 'loss': 'win'}  # result seen from the opponent's side, others (draw, NC) stay.
+
+
+class Bout(object):
+    """Bout class - single fight between two fighters, stored once for both of them. Fighters are kept in sorted
+    order of their normalized names and result is seen from the first one's side.
+    """
+
+    __slots__ = ('fighters', 'result', 'event', 'date', 'method', 'judge', 'round', 'time')
+
+    def __init__(self, fighters, result, event, date, method, judge, round, time):
+        """
+        Initializes a Bout instance.
+        :param fighters: tuple with names of both fighters
+        :param result: string with result of the first fighter
+        """
+        self.fighters = fighters
+        self.result = result
+        self.event = event
+        self.date = date
+        self.method = method
+        self.judge = judge
+        self.round = round
+        self.time = time
+
+    def view(self, name):
+        """
+        :param name: string with name of one of the fighters
+        :return: FightRecord instance with the bout seen from that fighter's side
+        """
+        if _normalize(name) == _normalize(self.fighters[0]):
+            opponent, result = self.fighters[1], self.result
+        else:
+            opponent, result = self.fighters[0], FLIPPED_RESULTS.get(self.result, self.result)
+        return FightRecord(opponent, result, self.event, self.date, self.method, self.judge, self.round, self.time)
+
+    def as_row(self):
+        """
+        :return: list with bout, in the form it is saved to bouts csv file
+        """
+        return [self.fighters[0], self.fighters[1], self.result, self.event, self.date, self.method, self.judge,
+                self.round, self.time]
+
+
+class BoutIndex(object):
+    """BoutIndex class - keeps every bout once, keyed on normalized (event, date, unordered pair of fighters), so the
+    same fight scraped from both fighters' profiles is recognized. Fights of a fighter can be derived from bouts saved
+    from his opponents' profiles.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty BoutIndex instance.
+        """
+        self.bouts = {}  # (event, date, frozenset of both fighters) -> Bout instance
+        self.by_fighter = collections.defaultdict(list)  # normalized fighter's name -> list of bout keys
+
+    @staticmethod
+    def key(name, fight):
+        """
+        :param name: string with fighter's name
+        :param fight: FightRecord instance of the fighter
+        :return: tuple identifying the bout no matter whose profile it was scraped from
+        """
+        fighters = frozenset((_normalize(name), _normalize(fight.opponent)))
+        return _normalize(fight.event), _normalize(fight.date), fighters
+
+    def add(self, name, fight):
+        """
+        Adds a fight of a fighter, unless the bout is already known.
+        :param name: string with fighter's name
+        :param fight: FightRecord instance of the fighter
+        :return: Bout instance if bout was new, None if it was already in the index
+        """
+        key = self.key(name, fight)
+        if key in self.bouts:
+            return None
+        if _normalize(name) <= _normalize(fight.opponent):
+            fighters, result = (name, fight.opponent), fight.result
+        else:
+            fighters, result = (fight.opponent, name), FLIPPED_RESULTS.get(fight.result, fight.result)
+        bout = Bout(fighters, result, fight.event, fight.date, fight.method, fight.judge, fight.round, fight.time)
+        self.bouts[key] = bout
+        for fighter_name in fighters:
+            self.by_fighter[_normalize(fighter_name)].append(key)
+        return bout
+
+    def add_fighter(self, fighter):
+        """
+        Adds all fights of extracted fighter.
+        :param fighter: Fighter instance with extracted fights
+        :return: list of Bout instances that were new
+        """
+        new_bouts = []
+        for fight in fighter.fight_rows:
+            bout = self.add(fighter.name, fight)
+            if bout is not None:
+                new_bouts.append(bout)
+        return new_bouts
+
+    def fighter_view(self, name):
+        """
+        :param name: string with fighter's name, the fighter does not need to be scraped himself
+        :return: list of FightRecord instances with all known bouts of the fighter, seen from his side
+        """
+        return [self.bouts[key].view(name) for key in self.by_fighter.get(_normalize(name), [])]
+
+    def __len__(self):
+        return len(self.bouts)
+
+
+def _cell_text(tag):
+    """
+    Gets text of a tag found inside fight history table cell.
+    :param tag: bs4 Tag, or None if it was not found
+    :return: string with tag's text, 'NA' if tag is missing
+    """
+    if tag is None:
+        return 'NA'
+    return tag.get_text()
+
+
+class Fighter(object):
+    """Fighter class - creating fighter instance based on fighter's Sherdog profile.
+    """
+
+    def __init__(self):
+        """
+        Initializes a Fighter instance.
+        """
+        self.url = None
+        self.index = None  # int: fighter's index in Sherdog database, None if fighter was found another way
+        self.name = None  # str: fighter's name, None by default
+        self.nickname = None  # str: fighter's nickname, None if fighter has none
+        self.weight_class = None  # str: fighter's weight class as Sherdog names it (e.g. 'Bantamweight'), or None
+        self.resource = None  # setting up resource based on url, None by default
+        self.soup = None  # creating BeautifulSoup object, None by default
+        self.pro_range = None  # selector: selecting range to pro fights exclusively, None by default
+        self.validation = False  # boolean: confirms if scraped data for fighter instance is validated, False by default
+
+        # Information about all pro fights, which certain Fighter instance had. Per-field lists (result_data,
+        # opponents, events, events_date, method, judges, rounds, time) are derived from it on access.
+
+        self.fight_rows = None  # list of FightRecord: all fields of each pro fight, collected in a single pass
+        self.opponent_links = None  # list of str: opponents' pages (e.g. '/fighter/Chad-Mendes-1023'), or None
+        self.event_links = None  # list of str: pages of events of pro fights, see scrape_events
+        self.extracted = None  # boolean: result of extraction, None until page was extracted
+        self._history_digest = None  # str: digest of raw fight history html, see history_digest
+        self.validators = {}  # dict: ETag and Last-Modified headers of downloaded page, see FingerprintStore
+
+    def _set_url_from_index(self, fighter_index):
+        """
+        Sets up url for fighter's instance.
+        :param fighter_index: integer with fighter's index
+        :return: None
+        """
+        self.index = fighter_index
+        self.url = f'{SHERDOG_URL}/fighter/index?id={fighter_index}.'
+
+    def _set_url_from_selector(self, fighter_page):
+        """
+        Sets up url from css selector match.
+        :param fighter_page: css selector result
+        :return: None
+        """
+        self.url = f'{SHERDOG_URL}{fighter_page}'
+
+    def _set_resource(self, validators=None):
+        """
+        Sets up response object based on self.url value. Url is replaced with the one of the response, so a fighter
+        reached by index (which redirects to his profile) has the same url as when he was reached by a link.
+        :param validators: optional - dictionary with conditional request headers, see Transport.get
+        :return: response object
+        """
+        resource = get_transport().get(self.url, validators=validators)
+        self.resource = resource
+        self.url = getattr(resource, 'url', None) or self.url
+        self.validators = {'etag': resource.headers.get('ETag'), 'last_modified': resource.headers.get('Last-Modified')}
+        return resource
+
+    def _set_soup(self):
+        """
+        Sets up soup for Fighter's instance using data provided in self.resource.
+        :return: BeautifulSoup instance
+        """
+        soup = make_soup(self.resource.text, FIGHTER_PAGE_PARTS)
+        self.soup = soup
+        return soup
+
+    def set_pro_fights(self):
+        """
+        Sets up range of pro fights for Fighter instance with html code scraped from the site.
+        :return: None
+        """
+        not_selected = self.soup.find_all('div', class_='module fight_history')
+        for line in not_selected:
+            if line.div.h2.get_text() == 'Fight History - Pro':
+                pro_fights = line
+                self.pro_range = pro_fights
+
+    def set_name(self):
+        """
+        Collects and sets name for Fighter instance.
+        :return: sets self.name to scraped string with fighter's name, returns AttributeError in case none was found
+        """
+        name = self.soup.find('span', class_='fn')
+        try:
+            self.name = name.get_text()
+        except AttributeError:
+            return AttributeError
+
+    def set_details(self):
+        """
+        Collects and sets nickname and weight class for Fighter instance, they stay None if they are not on the page.
+        :return: None
+        """
+        nickname = self.soup.find('span', class_='nickname')
+        if nickname is not None:
+            self.nickname = (nickname.em or nickname).get_text().strip('"').strip() or None
+        weight_class = self.soup.find('h6', class_='wclass')
+        if weight_class is not None and weight_class.find('strong', class_='title') is not None:
+            self.weight_class = weight_class.find('strong', class_='title').get_text().strip() or None
+
+    def grab_fight_rows(self):
+        """
+        Collects all pro fights in range of Fighter instance in a single pass over fight history table rows.
+        :return: list of FightRecord instances, one per fight
+        """
+        fight_rows = []
+        opponent_links = []
+        event_links = []
+        try:
+            table_rows = self.pro_range.find_all('tr')
+        except AttributeError:
+            logging.info(f'Attribute Error while grabbing fight history for {self.name}, the data might be missing!')
+            return None
+        for row in table_rows[1:]:  # first row is a table header.
+            cells = row.find_all('td', recursive=False)
+            if len(cells) < 6:
+                continue
+            method = list(cells[3].stripped_strings)  # end method first, judge name in sub line.
+            if cells[1].a is not None and cells[1].a.get('href'):
+                opponent_links.append(cells[1].a['href'])
+            if cells[2].a is not None and cells[2].a.get('href'):
+                event_links.append(cells[2].a['href'])
+            fight_rows.append(FightRecord(
+                opponent=_cell_text(cells[1].a or cells[1]),  # opponents without profile are not linked.
+                result=_cell_text(cells[0].find('span', class_='final_result')),
+                event=_cell_text(cells[2].a),
+                date=_cell_text(cells[2].find('span', class_='sub_line')),
+                method=method[0] if method else 'NA',
+                judge=_cell_text(cells[3].find('span', class_='sub_line')),
+                round=cells[4].get_text(),
+                time=cells[5].get_text(),
+            ))
+        self.fight_rows = fight_rows
+        self.opponent_links = opponent_links
+        self.event_links = event_links
+        return fight_rows
+
+    def _grab_field(self, field):
+        """
+        Derives list with a single field of all pro fights from fight rows, collecting rows first if needed.
+        :param field: string with FightRecord field name
+        :return: list of strings, or None if fight history could not be collected
+        """
+        if self.fight_rows is None and self.pro_range is not None:
+            self.grab_fight_rows()
+        if self.fight_rows is not None:
+            return [getattr(row, field) for row in self.fight_rows]
+
+    result_data = property(lambda self: self._grab_field('result'), doc='list of str: fight results')
+    opponents = property(lambda self: self._grab_field('opponent'), doc='list of str: opponents')
+    events = property(lambda self: self._grab_field('event'), doc='list of str: events')
+    events_date = property(lambda self: self._grab_field('date'), doc='list of str: events date')
+    method = property(lambda self: self._grab_field('method'), doc='list of str: methods in which fights have ended')
+    judges = property(lambda self: self._grab_field('judge'), doc='list of str: judges names')
+    rounds = property(lambda self: self._grab_field('round'), doc='list of str: rounds in which fights have ended')
+    time = property(lambda self: self._grab_field('time'),
+                    doc='list of str: exact point of time in the round where fights have ended')
+
+    def grab_result_data(self):
+        """
+        Collects results for all pro fights in range of Fighter instance.
+        :return: list of strings with results
+        """
+        return self.result_data
+
+    def grab_opponents(self):
+        """
+        Collects names of opponents in range of pro fights for Fighter instance.
+        :return: list of strings with opponents names
+        """
+        return self.opponents
+
+    def grab_opponent_links(self):
+        """
+        Collects links to opponents' pages in range of pro fights for Fighter instance, used by crawl_fighter_graph.
+        :return: list of strings with opponents pages (opponents without a page on Sherdog are left out)
+        """
+        if self.opponent_links is None and self.pro_range is not None:
+            self.grab_fight_rows()
+        return self.opponent_links
+
+    def grab_events(self):
+        """
+        Collects events in range of pro fights for Fighter instance.
+        :return: list of strings with events
+        """
+        return self.events
+
+    def grab_events_date(self):
+        """
+        Collects events dates in range of pro fights for Fighter instance.
+        :return: list of strings with events dates
+        """
+        return self.events_date
+
+    def grab_judges(self):
+        """
+        Collects judges names in range of pro fights for Fighter instance.
+        :return: list of strings with judges names
+        """
+        return self.judges
+
+    def grab_method(self):
+        """
+        Collects fight end methods in range of pro fights for Fighter instance.
+        :return: list of strings with fight end methods
+        """
+        return self.method
+
+    def grab_rounds(self):
+        """
+        Collects information about round in which fight was finished in range of pro fights for Fighter instance.
+        :return: list of strings with rounds
+        """
+        return self.rounds
+
+    def grab_time(self):
+        """
+        Collects fight time end in range of pro fights for Fighter instance.
+        :return: list of strings with time
+        """
+        return self.time
+
+    def get_validation(self):
+        """
+        Making validation by comparing collected data, checking if length of all information matches number of fights
+        that was scraped for fighter instance.
+        :return: boolean value or TypeError in case any of lists was empty (self.validation is False by default)
+        """
+        if self.fight_rows is None:
+            _metrics.count('validation_failures')
+            return TypeError
+        with _metrics.timer('validate'):
+            for_validation = [self.time, self.rounds, self.method, self.judges, self.events_date, self.events,
+                              self.result_data]
+            try:
+                if all(len(x) == len(self.opponents) for x in for_validation):
+                    self.validation = True
+                    return True
+                else:
+                    print(f'Warning: validation unsuccessful for {self.name}!')
+                    _metrics.count('validation_failures')
+                    return False
+            except TypeError:
+                _metrics.count('validation_failures')
+                return TypeError
+
+    def is_valid(self):
+        """
+        Supporting method for checking status of validation for fighter instance.
+        :return: boolean value
+        """
+        if self.validation is True:
+            return True
+        else:
+            return False
+
+    def save_to_csv(self, filename):
+        """
+        Appending all collected information regarding fighter instance to csv file, header is written when file is
+        new. Crawls keep a single sink open instead, see open_sink.
+        :param filename: string with name of the file we want to save data to; file will be created with given name
+        :return: None
+        """
+        with open_sink(filename, 'csv', mode='a') as sink:
+            sink.write_fighter(self)
+        print(f'CSV file was successfully appended for {self.name}!')
+
+    def _fighter_dictionary(self):
+        """
+        Arranges all collected information regarding fighter instance in a form that is saved to json files.
+        :return: dictionary with fighter's name as a key and list of dictionaries (one per fight) as a value
+        """
+        return {self.name: [fight.as_dict() for fight in self.fight_rows]}
+
+    def save_to_json(self, filename):
+        """
+        Adding all collected information regarding fighter instance to json file, fighters already stored in the file
+        are kept. Crawls keep a single sink open instead, see open_sink.
+        :param filename: string with name of the file we want to save data to; file will be created with given name
+        :return: None
+        """
+        with open_sink(filename, 'json', mode='a') as sink:
+            sink.write_fighter(self)
+        print(f'JSON file was successfully overwritten for {self.name}!')
+
+    def save_to_jsonl(self, filename):
+        """
+        Appending all collected information regarding fighter instance as a single line of json lines file. See
+        jsonl_to_json for turning the file into the same layout that save_to_json produces.
+        :param filename: string with name of the file we want to save data to; file will be created with given name
+        :return: None
+        """
+        with open_sink(filename, 'jsonl', mode='a') as sink:
+            sink.write_fighter(self)
+        print(f'JSONL file was successfully appended for {self.name}!')
+
+    def fetch(self, fighter_index=None, fighter_page=None, validators=None):
+        """
+        Sets up url and downloads fighter's page, without parsing it yet.
+        :param fighter_index: optional - integer with fighter's index, or None
+        :param fighter_page: optional - css selector match with fighter's page, or None
+        :param validators: optional - dictionary with conditional request headers, see Transport.get; page that has
+                           not changed comes back as an empty 304 response
+        :return: Fighter instance (self), so it can be passed along by crawl engines
+        """
+        if fighter_index is not None:
+            self._set_url_from_index(fighter_index)
+        elif fighter_page is not None:
+            self._set_url_from_selector(fighter_page)
+        else:
+            print("Error, please pass fighter's index, or fighter's page in order to proceed.")
+        self._set_resource(validators)
+        return self
+
+    def extract(self, release=True):
+        """
+        Parses downloaded page and collects all pro fights information for Fighter instance.
+        :param release: boolean, if True downloaded page and parse tree are dropped once fights are collected, so
+                        Fighter instance keeps only its FightRecord list. Default is True
+        :return: True for valid fighter's page and False if page was empty
+        """
+        if self.extracted is None:  # pages of pipeline crawl are extracted in worker processes, see set_extracted.
+            self._set_soup()
+            self.extracted = self.extract_soup()
+        if release:
+            self.release()
+        return self.extracted
+
+    def extract_soup(self):
+        """
+        Collects name and all pro fights information from already built soup.
+        :return: True for valid fighter's page and False if page was empty
+        """
+        if self.set_name() != AttributeError:  # checking if there is existing name for a fighter instance.
+            with _metrics.timer('extract'):
+                self.set_details()
+                self.set_pro_fights()
+                self.set_fight_rows(self.grab_fight_rows())
+            return True
+        return False
+
+    def set_extracted(self, extracted):
+        """
+        Takes over result of extract_page, which was run in another process.
+        :param extracted: tuple (name, list of fight tuples, nickname, weight class) extracted by extract_page, or None
+                          for an empty page
+        :return: None
+        """
+        if extracted is None:
+            self.extracted = False
+        else:
+            self.name, fights, self.nickname, self.weight_class = extracted
+            self.set_fight_rows([FightRecord(*fight) for fight in fights])
+            self.extracted = True
+
+    def release(self):
+        """
+        Drops response, soup and pro fights range of Fighter instance, which take far more memory than the fights.
+        :return: None
+        """
+        self.resource = None
+        self.soup = None
+        self.pro_range = None
+
+    def set_fight_rows(self, fight_rows):
+        """
+        Sets fight rows for Fighter instance, per-field lists of pro fights are derived from them.
+        :param fight_rows: list of FightRecord instances, or None if fight history could not be collected
+        :return: None
+        """
+        self.fight_rows = fight_rows
+
+    def history_digest(self):
+        """
+        Hashes raw html of fight history straight from downloaded page, without parsing it, so unchanged fighters can
+        be recognized cheaply. Digest is remembered, so it is still available after page was released.
+        :return: string with hex digest
+        """
+        if self._history_digest is None:
+            history = ''.join(_slice_parts(self.resource.text, [('div', 'module fight_history')]))
+            self._history_digest = hashlib.sha1(history.encode('utf-8')).hexdigest()
+        return self._history_digest
+
+    def fingerprint(self):
+        """
+        Summarizes extracted pro fights of Fighter instance, see FingerprintStore.
+        :return: dictionary with name, fight count, latest event date, digest of fight history html, digest of each
+                 fight row and validators (ETag, Last-Modified) of the page
+        """
+        fight_rows = self.fight_rows or []
+        return {'name': self.name, 'count': len(fight_rows),
+                'latest': fight_rows[0].date if fight_rows else None,  # Sherdog lists latest fight first.
+                'digest': self.history_digest(), 'rows': [_row_digest(row) for row in fight_rows],
+                'etag': self.validators.get('etag'), 'last_modified': self.validators.get('last_modified')}
+
+    def save(self, sink):
+        """
+        Saves extracted fighter's data, fighter instance will be dropped if there was an empty list while validating.
+        :param sink: open output sink (see open_sink) where results will be stored
+        :return: None
+        """
+        if self.get_validation() != TypeError:
+            with _metrics.timer('save'):
+                sink.write_fighter(self)
+            _metrics.count('fighters_saved')
+            print(f'{len(self.fight_rows)} fights of {self.name} were passed to {sink.path}!')
+
+    def scrape_fighter(self, filetype, filename, fighter_index=None, fighter_page=None):
+        """
+        :param filetype: string with 'csv', 'json', 'jsonl', 'parquet' or 'arrow' as a type of file where results
+                         will be stored; csv, json and jsonl files are appended, parquet and arrow files are replaced
+        :param filename: string with name of the file we want to save data to; file will be created with given name
+        :param fighter_index: optional - integer with fighter's index, or None
+        :param fighter_page: optional - css selector match with fighter's page, or None
+        :return: True for valid fighter's page and False if page was empty
+        """
+        self.fetch(fighter_index=fighter_index, fighter_page=fighter_page)
+        if self.extract():
+            with open_sink(filename, filetype, mode='w' if filetype in COLUMNAR_FILETYPES else 'a') as sink:
+                self.save(sink)
+            return True
+        else:
+            return False
+
+# END OF FIGHTER CLASS
+
+
+COLUMNAR_FILETYPES = {'parquet': 'parquet', 'arrow': 'arrows'}  # filetype -> file extension
+
+
+def parse_event_date(event_date):
+    """
+    :param event_date: string with date in Sherdog's format, e.g. 'Mar / 20 / 2005'
+    :return: datetime.date, or None if date could not be read
+    """
+    try:
+        return datetime.datetime.strptime(event_date, '%b / %d / %Y').date()
+    except ValueError:
+        return None
+
+
+def parse_round(fight_round):
+    """
+    :param fight_round: string with round number
+    :return: integer, or None if round could not be read
+    """
+    try:
+        return int(fight_round)
+    except ValueError:
+        return None
+
+
+def parse_fight_time(fight_time):
+    """
+    :param fight_time: string with time in the round, e.g. '3:24'
+    :return: integer with seconds, or None if time could not be read
+    """
+    try:
+        minutes, seconds = fight_time.split(':')
+        return int(minutes) * 60 + int(seconds)
+    except ValueError:
+        return None
+
+
+FIGHT_HEADERS = ['Fighter', 'Opponent', 'Result', 'Event', 'Event_date', 'Method', 'Referee', 'Round', 'Time']
+
+
+class OutputSink(object):
+    """OutputSink class - base of all output sinks. A sink is opened once for the whole crawl, keeps records in memory
+    and writes them in batches, once batch_size records are waiting or flush_interval seconds have passed since last
+    write, so saving a fighter costs no file open and almost never a write call. Text files are always UTF-8.
+    Optionally every fighter is also written to a names sidecar next to the output, see NameSink.
+    """
+    filetype = None
+    extension = None
+
+    def __init__(self, filename, mode='w', offset=None, batch_size=1000, flush_interval=5.0, names=False):
+        """
+        Initializes an OutputSink instance, opening output file.
+        :param filename: string with name of the file (without extension)
+        :param mode: string with 'w' for a new file or 'a' for appending to existing one
+        :param offset: optional - integer, file is cut to that size before appending (used when crawl is resumed)
+        :param batch_size: integer with number of records kept in memory before they are written
+        :param flush_interval: float with maximum number of seconds records are kept in memory
+        :param names: boolean, if True name, nickname, weight class and page of every fighter are also written to
+                      {filename}.names.jsonl, which NameIndex.load reads. Sidecar is never cut, NameIndex skips
+                      fighters it already has
+        """
+        self.names = NameSink(filename, mode=mode, flush_interval=flush_interval) if names else None
+        self.filename = filename
+        self.path = f'{filename}.{self.extension}'
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.records = 0  # integer: number of records written so far
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        if offset is not None:
+            with open(self.path, 'r+b') as output_file:
+                output_file.truncate(offset)  # dropping partial records written after checkpoint.
+        self._file = self._open(mode)
+
+    def _open(self, mode):
+        """
+        :param mode: string with 'w' or 'a'
+        :return: file object records are written to
+        """
+        return open(self.path, mode, newline='', encoding='utf-8')
+
+    def _due(self):
+        """
+        :return: True if buffered records should be written now
+        """
+        return len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval
+
+    def write_record(self, record):
+        """
+        Buffers a single record, writing a batch when it is due.
+        :param record: record in the form the sink writes (row list or dictionary)
+        :return: None
+        """
+        self._buffer.append(record)
+        if self._due():
+            self.flush()
+
+    def fighter_records(self, fighter):
+        """
+        :param fighter: Fighter instance with extracted fights
+        :return: list of records for the fighter
+        """
+        raise NotImplementedError
+
+    def write_fighter(self, fighter):
+        """
+        Buffers all fights of extracted fighter, writing a batch when it is due.
+        :param fighter: Fighter instance with extracted fights
+        :return: None
+        """
+        self._buffer.extend(self.fighter_records(fighter))
+        if self.names is not None:
+            self.names.write_fighter(fighter)
+        if self._due():
+            self.flush()
+
+    def _write(self, records):
+        """
+        Writes a batch of records to the file.
+        :param records: list of records
+        :return: None
+        """
+        raise NotImplementedError
+
+    def flush(self, sync=False):
+        """
+        Writes buffered records.
+        :param sync: boolean, if True file is also synced to disk
+        :return: None
+        """
+        if self._buffer:
+            self._write(self._buffer)
+            self.records += len(self._buffer)
+            _metrics.count('rows_written', len(self._buffer), filetype=self.filetype)
+            self._buffer = []
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        if self.names is not None:
+            self.names.flush(sync=sync)
+        self._last_flush = time.monotonic()
+
+    def tell(self):
+        """
+        :return: integer with size of the file in bytes, records still in buffer are not included
+        """
+        return os.path.getsize(self.path)
+
+    def close(self, finalize=True):
+        """
+        Writes remaining records and closes the file.
+        :param finalize: boolean, False leaves work files in place, so an interrupted crawl can be resumed
+        :return: None
+        """
+        self.flush()
+        self._file.close()
+        if self.names is not None:
+            self.names.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(finalize=exc_type is None)
+
+
+class CsvSink(OutputSink):
+    """CsvSink class - writes rows to a comma separated csv file, with headers as the first line."""
+    filetype = 'csv'
+    extension = 'csv'
+
+    def __init__(self, filename, headers=FIGHT_HEADERS, mode='w', offset=None, sanitize=False, **options):
+        """
+        Initializes a CsvSink instance, headers are written when file is new or empty.
+        :param filename: string with name of the file (without extension)
+        :param headers: list of strings with column names
+        :param mode, offset, options: see OutputSink
+        :param sanitize: boolean, if True fields are cleaned with csv_cleaner.clean_field and file is semicolon
+                         separated, the same as regex.py output, so no separate cleanup pass is needed. Default is False
+        """
+        OutputSink.__init__(self, filename, mode=mode, offset=offset, **options)
+        self.sanitize = sanitize
+        self._writer = csv.writer(self._file, delimiter=';' if sanitize else ',')
+        if self.tell() == 0:
+            self._writer.writerow(headers)
+
+    def fighter_records(self, fighter):
+        """
+        :param fighter: Fighter instance with extracted fights
+        :return: list of rows, one per fight
+        """
+        return [[fighter.name, fight.opponent, fight.result, fight.event, fight.date, fight.method, fight.judge,
+                 fight.round, fight.time] for fight in fighter.fight_rows]
+
+    def _write(self, records):
+        """
+        :param records: list of rows
+        :return: None
+        """
+        self._writer.writerows(clean_rows(records) if self.sanitize else records)
+
+
+class JsonLinesSink(OutputSink):
+    """JsonLinesSink class - writes every fighter as a single line of json lines file, see jsonl_to_json."""
+    filetype = 'jsonl'
+    extension = 'jsonl'
+
+    def fighter_records(self, fighter):
+        """
+        :param fighter: Fighter instance with extracted fights
+        :return: list with fighter's dictionary
+        """
+        return [fighter._fighter_dictionary()]
+
+    def _write(self, records):
+        """
+        :param records: list of dictionaries
+        :return: None
+        """
+        self._file.write(''.join(json.dumps(record) + '\n' for record in records))
+
+
+def _write_json_from_lines(lines_path, json_path):
+    """
+    Turns json lines file into a json file with a single dictionary, in a single pass and without loading whole file
+    into memory.
+    :param lines_path: string with path of json lines file, each line holds a dictionary
+    :param json_path: string with path of json file to be written
+    :return: None
+    """
+    with open(lines_path, encoding='utf-8') as lines_file, open(json_path, 'w', encoding='utf-8') as json_file:
+        json_file.write('{')
+        separator = '\n'
+        for line in lines_file:
+            if not line.strip():
+                continue
+            for name, fights in json.loads(line).items():
+                fights_json = json.dumps(fights, indent=4).replace('\n', '\n    ')
+                json_file.write(f'{separator}    {json.dumps(name)}: {fights_json}')
+                separator = ',\n'
+        json_file.write('\n}' if separator != '\n' else '}')
+
+
+class JsonSink(JsonLinesSink):
+    """JsonSink class - collects fighters in {filename}.json.part json lines file, which is turned into {filename}.json
+    when sink is closed, so json file is written once instead of being rewritten for every fighter.
+    """
+    filetype = 'json'
+    extension = 'json.part'
+
+    def __init__(self, filename, mode='w', offset=None, **options):
+        """
+        Initializes a JsonSink instance. When appending without a .part file, fighters already stored in json file are
+        carried over.
+        :param filename: string with name of the file (without extension)
+        :param mode, offset, options: see OutputSink
+        """
+        self.json_path = f'{filename}.json'
+        OutputSink.__init__(self, filename, mode=mode, offset=offset, **options)
+
+    def _open(self, mode):
+        """
+        :param mode: string with 'w' or 'a'
+        :return: file object records are written to
+        """
+        carried = {}
+        if mode == 'a' and not os.path.exists(self.path) and os.path.exists(self.json_path):
+            with open(self.json_path, encoding='utf-8') as fighter_json:
+                carried = json.load(fighter_json)
+        part_file = OutputSink._open(self, mode)
+        part_file.write(''.join(json.dumps({name: fights}) + '\n' for name, fights in carried.items()))
+        return part_file
+
+    def close(self, finalize=True):
+        """
+        Writes remaining fighters and turns collected fighters into json file.
+        :param finalize: boolean, False only closes .part file, so an interrupted crawl can be resumed
+        :return: None
+        """
+        OutputSink.close(self)
+        if finalize:
+            _write_json_from_lines(self.path, self.json_path)
+            os.remove(self.path)
+
+
+class ShardSink(JsonLinesSink):
+    """ShardSink class - writes output part of a single shard, see scrape_shard. Every fighter is a json line with its
+    index and url, so parts can be merged in index order and deduplicated by merge_shards.
+    """
+    filetype = 'shard'
+    extension = 'jsonl'
+
+    def fighter_records(self, fighter):
+        """
+        :param fighter: Fighter instance with extracted fights
+        :return: list with dictionary holding fighter's index, url, name and fights
+        """
+        return [{'index': fighter.index, 'url': fighter.url, 'name': fighter.name,
+                 'fights': [fight.as_dict() for fight in fighter.fight_rows]}]
+
+
+class NameSink(JsonLinesSink):
+    """NameSink class - writes name, nickname, weight class and page of every fighter as a json line, without fights.
+    Such file is loaded by NameIndex, see scrape_list_of_fighters. Sinks opened by open_sink write it next to their
+    output as well.
+    """
+    filetype = 'names'
+    extension = 'names.jsonl'
+
+    def fighter_records(self, fighter):
+        """
+        :param fighter: Fighter instance with extracted name
+        :return: list with dictionary holding fighter's url, name, nickname and weight class, empty for a fighter
+                 without page (e.g. a fighter of event crawl without a link)
+        """
+        if fighter.url is None:
+            return []
+        return [{'url': fighter.url, 'name': fighter.name, 'nickname': fighter.nickname,
+                 'weight_class': fighter.weight_class}]
+
+
+BOUT_HEADERS = ['Fighter_A', 'Fighter_B', 'Result_A', 'Event', 'Event_date', 'Method', 'Referee', 'Round', 'Time']
+
+
+class BoutSink(CsvSink):
+    """BoutSink class - writes each bout once, no matter how many of its fighters were scraped, see BoutIndex. Result
+    is given for Fighter_A, the other side of the bout is its flipped result.
+    """
+    filetype = 'bouts'
+    extension = 'bouts.csv'
+
+    def __init__(self, filename, mode='w', offset=None, index=None, **options):
+        """
+        Initializes a BoutSink instance. When appending, bouts already in the file are put into index first, so they
+        are not written again.
+        :param filename: string with name of the file (without extension)
+        :param mode, offset, options: see OutputSink
+        :param index: optional - BoutIndex instance shared with other code, or None for a new one
+        """
+        CsvSink.__init__(self, filename, headers=BOUT_HEADERS, mode=mode, offset=offset, **options)
+        self.index = index if index is not None else BoutIndex()
+        if mode == 'a':
+            with open(self.path, newline='', encoding='utf-8') as bouts_file:
+                reader = csv.reader(bouts_file)
+                next(reader, None)
+                for row in reader:
+                    self.index.add(row[0], FightRecord(*row[1:]))
+
+    def fighter_records(self, fighter):
+        """
+        :param fighter: Fighter instance with extracted fights
+        :return: list of rows, one per bout that was not written before
+        """
+        return [bout.as_row() for bout in self.index.add_fighter(fighter)]
+
+
+class ColumnarWriter(OutputSink):
+    """ColumnarWriter class - output sink which writes fights of many fighters in batches as typed columns, to parquet
+    file or arrow IPC stream. Dates are parsed, rounds and times (in seconds) are integers and repeated strings are
+    dictionary encoded. Files are complete only after the sink is closed, so they can not be appended to.
+    """
+
+    def __init__(self, filename, filetype='parquet', mode='w', offset=None, batch_size=50000, flush_interval=60.0,
+                 names=False):
+        """
+        Initializes a ColumnarWriter instance, creating empty output file.
+        :param filename: string with name of the file (without extension)
+        :param filetype: string with 'parquet' or 'arrow'
+        :param mode: string, only 'w' is supported
+        :param offset: must be None, columnar files can not be cut
+        :param batch_size: integer with number of fights buffered before they are written as one batch
+        :param flush_interval: float with maximum number of seconds fights are buffered
+        :param names: boolean, if True names sidecar is written as well, see OutputSink
+        """
+        if pyarrow is None:
+            raise ValueError(f'{filetype} output requires pyarrow package to be installed.')
+        if mode != 'w' or offset is not None:
+            raise ValueError(f'{filetype} output can not be appended to, please use csv or jsonl instead.')
+        dictionary = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        self.schema = pyarrow.schema([
+            ('Fighter', pyarrow.string()), ('Opponent', pyarrow.string()), ('Result', dictionary),
+            ('Event', dictionary), ('Event_date', pyarrow.date32()), ('Method', dictionary),
+            ('Referee', dictionary), ('Round', pyarrow.int8()), ('Time', pyarrow.int16()),
+        ])
+        self.filetype = filetype
+        self.extension = COLUMNAR_FILETYPES[filetype]
+        self._columns = {field.name: [] for field in self.schema}
+        OutputSink.__init__(self, filename, batch_size=batch_size, flush_interval=flush_interval, names=names)
+
+    def _open(self, mode):
+        """
+        :param mode: string with 'w'
+        :return: pyarrow writer
+        """
+        if self.filetype == 'parquet':
+            return pyarrow.parquet.ParquetWriter(self.path, self.schema)
+        return pyarrow.ipc.new_stream(self.path, self.schema)
+
+    def _due(self):
+        """
+        :return: True if buffered fights should be written now
+        """
+        return (len(self._columns['Fighter']) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval)
+
+    def write_fighter(self, fighter):
+        """
+        Buffers all fights of extracted fighter, writing a batch when it is due.
+        :param fighter: Fighter instance with extracted fights
+        :return: None
+        """
+        columns = self._columns
+        for row in fighter.fight_rows:
+            columns['Fighter'].append(fighter.name)
+            columns['Opponent'].append(row.opponent)
+            columns['Result'].append(row.result)
+            columns['Event'].append(row.event)
+            columns['Event_date'].append(parse_event_date(row.date))
+            columns['Method'].append(row.method)
+            columns['Referee'].append(row.judge)
+            columns['Round'].append(parse_round(row.round))
+            columns['Time'].append(parse_fight_time(row.time))
+        if self.names is not None:
+            self.names.write_fighter(fighter)
+        if self._due():
+            self.flush()
+
+    def flush(self, sync=False):
+        """
+        Writes buffered fights as a single batch.
+        :param sync: ignored, columnar files are complete only after they are closed
+        :return: None
+        """
+        self._last_flush = time.monotonic()
+        if self.names is not None:
+            self.names.flush(sync=sync)
+        if not self._columns['Fighter']:
+            return
+        batch = pyarrow.record_batch([pyarrow.array(self._columns[field.name], type=field.type)
+                                      for field in self.schema], schema=self.schema)
+        if self.filetype == 'parquet':
+            self._file.write_table(pyarrow.Table.from_batches([batch]))
+        else:
+            self._file.write_batch(batch)
+        self.records += batch.num_rows
+        _metrics.count('rows_written', batch.num_rows, filetype=self.filetype)
+        for values in self._columns.values():
+            values.clear()
+
+    @property
+    def rows(self):
+        """
+        :return: integer with number of fights written so far
+        """
+        return self.records
+
+
+SQLITE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS fighters (
+    id INTEGER PRIMARY KEY,
+    profile TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    sherdog_index INTEGER,
+    fights INTEGER NOT NULL,
+    updated TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bouts (
+    fighter_id INTEGER NOT NULL REFERENCES fighters (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    fighter TEXT NOT NULL,
+    opponent TEXT,
+    result TEXT,
+    event TEXT,
+    event_date TEXT,
+    date TEXT,
+    method TEXT,
+    referee TEXT,
+    round TEXT,
+    time TEXT,
+    PRIMARY KEY (fighter_id, position)
+);
+CREATE INDEX IF NOT EXISTS bouts_fighter ON bouts (fighter COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS bouts_opponent ON bouts (opponent COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS bouts_event ON bouts (event COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS bouts_date ON bouts (date);
+CREATE TABLE IF NOT EXISTS roster (
+    name TEXT NOT NULL,
+    gender TEXT NOT NULL,
+    division TEXT,
+    nickname TEXT,
+    updated TEXT NOT NULL,
+    PRIMARY KEY (name, gender)
+);
+CREATE INDEX IF NOT EXISTS roster_division ON roster (division);
+'''
+
+
+def _connect_database(path):
+    """
+    :param path: string with path of SQLite database file, it is created with all tables when missing
+    :return: sqlite3 connection
+    """
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode = WAL')  # readers (FightDatabase) are not blocked by a running crawl.
+    connection.execute('PRAGMA foreign_keys = ON')
+    connection.executescript(SQLITE_SCHEMA)
+    return connection
+
+
+class SqliteSink(OutputSink):
+    """SqliteSink class - stores fighters in SQLite database with fighters, bouts and roster tables. Fighters are
+    upserted on path of their profile page (see fighter_profile), so scraping a fighter again - also the other way,
+    by index or by a link - replaces his fights instead of adding them twice, and each batch of fighters is written
+    in a single transaction. Query it with FightDatabase.
+    """
+    filetype = 'sqlite'
+    extension = 'db'
+
+    def __init__(self, filename, mode='w', offset=None, batch_size=200, flush_interval=5.0, names=False):
+        """
+        Initializes a SqliteSink instance, creating database when it does not exist yet. Database is never cut or
+        replaced - mode and offset are accepted for compatibility with other sinks, upserts make resumed crawls
+        write the same rows again instead.
+        :param filename: string with name of the file (without extension)
+        :param batch_size: integer with number of fighters kept in memory before they are written
+        :param flush_interval: float with maximum number of seconds fighters are kept in memory
+        :param names: boolean, if True names sidecar is written as well (appended to, like the database)
+        """
+        OutputSink.__init__(self, filename, mode='a', batch_size=batch_size, flush_interval=flush_interval,
+                            names=names)
+
+    def _open(self, mode):
+        """
+        :param mode: ignored, see __init__
+        :return: sqlite3 connection
+        """
+        return _connect_database(self.path)
+
+    def fighter_records(self, fighter):
+        """
+        :param fighter: Fighter instance with extracted fights
+        :return: list with a single record (profile, name, index, list of FightRecord instances)
+        """
+        return [(fighter_profile(fighter.url), fighter.name, fighter.index, fighter.fight_rows)]
+
+    def _write(self, records):
+        """
+        Upserts a batch of fighters with their fights in one transaction.
+        :param records: list of records, see fighter_records
+        :return: None
+        """
+        updated = datetime.datetime.now().isoformat(timespec='seconds')
+        with self._file:
+            for profile, name, fighter_index, fight_rows in records:
+                self._file.execute(
+                    'INSERT INTO fighters (profile, name, sherdog_index, fights, updated) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (profile) DO UPDATE SET name = excluded.name, '
+                    'sherdog_index = COALESCE(excluded.sherdog_index, sherdog_index), fights = excluded.fights, '
+                    'updated = excluded.updated',
+                    (profile, name, fighter_index, len(fight_rows), updated))
+                fighter_id = self._file.execute('SELECT id FROM fighters WHERE profile = ?', (profile,)).fetchone()[0]
+                self._file.execute('DELETE FROM bouts WHERE fighter_id = ?', (fighter_id,))
+                self._file.executemany(
+                    'INSERT INTO bouts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(fighter_id, position, name, row.opponent, row.result, row.event, row.date,
+                      _iso_date(row.date), row.method, row.judge, row.round, row.time)
+                     for position, row in enumerate(fight_rows)])
+
+    def write_roster(self, ufc_roster):
+        """
+        Upserts UFC roster, see scrape_ufc_roster; fighters are keyed on name and gender.
+        :param ufc_roster: dictionary with 'men' and 'women' lists of (name, division, nickname) tuples
+        :return: None
+        """
+        updated = datetime.datetime.now().isoformat(timespec='seconds')
+        with self._file:
+            for gender in ('men', 'women'):
+                self._file.executemany(
+                    'INSERT INTO roster VALUES (?, ?, ?, ?, ?) ON CONFLICT (name, gender) DO UPDATE SET '
+                    'division = excluded.division, nickname = excluded.nickname, updated = excluded.updated',
+                    [(name, gender, division, nickname, updated) for name, division, nickname in ufc_roster[gender]])
+        self.records += len(ufc_roster['men']) + len(ufc_roster['women'])
+
+    def flush(self, sync=False):
+        """
+        Writes buffered fighters, committed transactions are already on disk.
+        :param sync: ignored, every batch is committed
+        :return: None
+        """
+        if self._buffer:
+            self._write(self._buffer)
+            self.records += len(self._buffer)
+            _metrics.count('rows_written', len(self._buffer), filetype=self.filetype)
+            self._buffer = []
+        if self.names is not None:
+            self.names.flush(sync=sync)
+        self._last_flush = time.monotonic()
+
+    def tell(self):
+        """
+        :return: integer with number of fighters written so far (database is not cut when crawl is resumed)
+        """
+        return self.records
+
+
+def _iso_date(event_date):
+    """
+    :param event_date: string with date in Sherdog's format
+    :return: string with date in ISO format (so dates sort and compare in SQL), or None
+    """
+    parsed = parse_event_date(event_date)
+    return parsed.isoformat() if parsed is not None else None
+
+
+def fighter_profile(url):
+    """
+    :param url: string with fighter's page url (or path), e.g. 'https://www.sherdog.com/fighter/Jose-Aldo-11506'
+    :return: string with path of the page, which identifies the fighter no matter what host served him; index urls
+             that were not redirected to a profile keep their query ('/fighter/index?id=11506.')
+    """
+    parts = urlsplit(url)
+    return f'{parts.path}?{parts.query}' if parts.query else parts.path.rstrip('/')
+
+
+class FightDatabase(object):
+    """FightDatabase class - queries SQLite database written by SqliteSink. Names are matched case-insensitively,
+    every lookup is served by an index.
+    """
+
+    def __init__(self, filename):
+        """
+        Initializes a FightDatabase instance.
+        :param filename: string with name of the database file (without extension)
+        """
+        self.path = f'{filename}.{SqliteSink.extension}'
+        if not os.path.exists(self.path):
+            raise ValueError(f'There is no database {self.path}, please scrape fighters with sqlite filetype first.')
+        self._connection = _connect_database(self.path)
+
+    def _fights(self, where, parameters):
+        """
+        :param where: string with SQL condition on bouts table
+        :param parameters: tuple with parameters of the condition
+        :return: list of tuples (fighter, FightRecord instance), latest fights first (fights with unknown date last)
+        """
+        rows = self._connection.execute(
+            'SELECT fighter, opponent, result, event, event_date, method, referee, round, time FROM bouts '
+            f'WHERE {where} ORDER BY date DESC, fighter_id, position', parameters)  # NULL dates sort last.
+        return [(row[0], FightRecord(*row[1:])) for row in rows]
+
+    def fighter_history(self, name):
+        """
+        :param name: string with fighter's name
+        :return: list of FightRecord instances with fighter's pro fights, latest first
+        """
+        return [fight for _, fight in self._fights('fighter = ? COLLATE NOCASE', (name,))]
+
+    def head_to_head(self, name, opponent):
+        """
+        Collects fights between two fighters. Fights stored only from opponent's side (e.g. fighter himself was not
+        scraped) are included as well, with their result flipped.
+        :param name: string with fighter's name
+        :param opponent: string with opponent's name
+        :return: list of FightRecord instances seen from fighter's side, latest first
+        """
+        index = BoutIndex()
+        for fighter, fight in self._fights('(fighter = ? COLLATE NOCASE AND opponent = ? COLLATE NOCASE) OR '
+                                           '(fighter = ? COLLATE NOCASE AND opponent = ? COLLATE NOCASE)',
+                                           (name, opponent, opponent, name)):
+            index.add(fighter, fight)
+        return index.fighter_view(name)
+
+    def event_card(self, event):
+        """
+        :param event: string with event name, e.g. 'UFC 214 - Cormier vs. Jones 2'
+        :return: list of Bout instances of the event, each bout once
+        """
+        index = BoutIndex()
+        for fighter, fight in self._fights('event = ? COLLATE NOCASE', (event,)):
+            index.add(fighter, fight)
+        return list(index.bouts.values())
+
+    def roster(self, division=None):
+        """
+        :param division: optional - string with weight-division, or None for the whole roster
+        :return: list of tuples (name, gender, division, nickname)
+        """
+        if division is None:
+            rows = self._connection.execute('SELECT name, gender, division, nickname FROM roster ORDER BY name')
+        else:
+            rows = self._connection.execute('SELECT name, gender, division, nickname FROM roster '
+                                            'WHERE division = ? ORDER BY name', (division,))
+        return rows.fetchall()
+
+    def close(self):
+        """
+        Closes database connection.
+        :return: None
+        """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+SINKS = {'csv': CsvSink, 'json': JsonSink, 'jsonl': JsonLinesSink, 'shard': ShardSink, 'bouts': BoutSink,
+         'sqlite': SqliteSink, 'names': NameSink}
+
+
+def open_sink(filename, filetype, mode='w', offset=None, **options):
+    """
+    Opens output sink for fighters, which stays open for the whole crawl; output is complete after sink is closed.
+    :param filename: string with name of the file we want to save data to (without extension)
+    :param filetype: string with 'csv', 'json', 'jsonl', 'bouts', 'sqlite', 'parquet' or 'arrow' as a type of file
+                     where results will be stored
+    :param mode: string with 'w' for a new file (csv header is written) or 'a' for appending to existing one
+    :param offset: optional - integer, file is cut to that size before appending (used when crawl is resumed)
+    :param options: batch_size, flush_interval and names, see OutputSink; names sidecar is written by default, so
+                    NameIndex can be loaded after any crawl
+    :return: OutputSink instance
+    """
+    options.setdefault('names', filetype != NameSink.filetype)
+    if filetype in COLUMNAR_FILETYPES:
+        return ColumnarWriter(filename, filetype, mode=mode, offset=offset, **options)
+    try:
+        sink_class = SINKS[filetype]
+    except KeyError:
+        raise ValueError(f'Unknown filetype {filetype}, please use csv, json, jsonl, bouts, sqlite, parquet or arrow.')
+    return sink_class(filename, mode=mode, offset=offset, **options)
+
+
+class _CrawlState(object):
+    """Crawl state shared by all crawl engines - receives fetched fighters in index order, saves them and keeps track
+    of 'empty' indexes in a row. Optionally writes checkpoints, so crawl can be resumed after a crash.
+    """
+
+    def __init__(self, sink, fail_counter=0, checkpoint_every=None, max_fails=MAX_FAILS):
+        """
+        Initializes crawl state.
+        :param sink: open output sink where results will be stored
+        :param fail_counter: integer with amount of 'empty' indexes in a row the crawl starts with
+        :param checkpoint_every: optional - integer, checkpoint is written after each that many indexes, or None
+        :param max_fails: optional - integer with amount of 'empty' indexes in a row that ends the crawl, or None when
+                          crawl ends only with its indexes
+        """
+        self.sink = sink
+        self.filename = sink.filename
+        self.fail_counter = fail_counter  # amount of 'empty' indexes in a row.
+        self.checkpoint_every = checkpoint_every
+        self.max_fails = max_fails
+        self.handled = 0  # amount of indexes handled since crawl (re)started.
+        self.next_index = None  # first index after the last handled one.
+
+    def fetch(self, fighter_index):
+        """
+        Downloads fighter's page, crawl engines call it for every index.
+        :param fighter_index: integer with fighter's index
+        :return: Fighter instance with downloaded page
+        """
+        return Fighter().fetch(fighter_index=fighter_index)
+
+    def __call__(self, fighter):
+        """
+        Extracts and saves fetched fighter, updating fail counter.
+        :param fighter: Fighter instance with already downloaded page
+        :return: True if crawl should go on, False after there were too many 'empty' indexes in a row
+        """
+        if fighter.extract():
+            fighter.save(self.sink)
+            self.fail_counter = 0  # resetting fail counter after finding valid page(index) for a fighter.
+        else:
+            self.fail_counter += 1  # incrementing fail counter if there was no data for certain index.
+        self.handled += 1
+        self.next_index = fighter.index + 1
+        go_on = self.max_fails is None or self.fail_counter <= self.max_fails
+        if self.checkpoint_every and (self.handled % self.checkpoint_every == 0 or not go_on):
+            self.checkpoint(fighter.index + 1, finished=not go_on)
+        return go_on
+
+    def checkpoint(self, next_index, finished=False):
+        """
+        Durably records crawl progress: buffered records are written and synced to disk first, then checkpoint file
+        is replaced atomically, so checkpoint never points past data that is actually stored.
+        :param next_index: integer with first index that was not handled yet (all lower ones are saved)
+        :param finished: boolean, True when crawl has reached its end
+        :return: None
+        """
+        self.sink.flush(sync=True)
+        checkpoint = {'next_index': next_index, 'fail_counter': self.fail_counter, 'filetype': self.sink.filetype,
+                      'offset': self.sink.tell(), 'finished': finished}
+        temporary = f'{self.filename}.checkpoint.tmp'
+        with open(temporary, 'w') as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary, f'{self.filename}.checkpoint')
+
+
+def read_checkpoint(filename):
+    """
+    Reads checkpoint written by scrape_all_fighters.
+    :param filename: string with name of the output file (without extension)
+    :return: dictionary with next_index, fail_counter, filetype, offset and finished keys, or None if there is none
+    """
+    try:
+        with open(f'{filename}.checkpoint') as checkpoint_file:
+            return json.load(checkpoint_file)
+    except FileNotFoundError:
+        return None
+
+
+def _crawl_sequential(indexes, handle):
+    """
+    Crawl engine that fetches fighters one after another.
+    :param indexes: iterator with fighters indexes to be fetched
+    :param handle: crawl state (see _CrawlState) receiving fetched Fighter instances in index order, returns False to
+                   stop the crawl; its fetch method downloads fighters
+    :return: None
+    """
+    for fighter_index in indexes:
+        if not handle(handle.fetch(fighter_index)):
+            break
+
+
+def extract_page(markup):
+    """
+    Extracts fighter's page in a worker process of pipeline crawl. Only plain strings and tuples cross the process
+    boundary, which keeps pickling cheap. Stages are timed here and returned, metrics of the worker are not seen by
+    the crawling process.
+    :param markup: string with html page
+    :return: tuple (extracted, parse seconds, extract seconds), extracted is tuple (name, list of tuples with fields
+             of each pro fight, nickname, weight class), or None for an empty page
+    """
+    F = Fighter()
+    start = time.perf_counter()
+    F.soup = make_soup(markup, FIGHTER_PAGE_PARTS)
+    parsed = time.perf_counter()
+    extracted = None
+    if F.extract_soup():
+        fights = [tuple(getattr(fight, field) for field in FightRecord.__slots__) for fight in F.fight_rows]
+        extracted = F.name, fights, F.nickname, F.weight_class
+    return extracted, parsed - start, time.perf_counter() - parsed
+
+
+def _fetch_markup(handle, fighter_index):
+    """
+    Downloads fighter in a fetch thread of pipeline crawl and decodes the page there, so event loop only passes it on.
+    :param handle: crawl state (see _CrawlState)
+    :param fighter_index: integer with fighter index
+    :return: tuple (Fighter instance, string with html page)
+    """
+    F = handle.fetch(fighter_index)
+    return F, F.resource.text
+
+
+async def _crawl_concurrent(indexes, handle, concurrency, parse_workers=None):
+    """
+    Crawl engine that keeps up to `concurrency` fetches in flight. Responses may come back out of order, fighters are
+    held back until all lower indexes were handled, so output is still written in index order. Crawl runs at most
+    2 * `concurrency` indexes ahead of the oldest unhandled one, so a slow (e.g. throttled and retried) fetch does not
+    let it run far past the end of the database.
+    With `parse_workers` this is a pipeline: fetch threads download pages, a pool of processes extracts them (at most
+    2 pages per process are queued) and handle saves them from the main thread, so parsing uses more than one core.
+    :param indexes: iterator with fighters indexes to be fetched
+    :param handle: crawl state (see _CrawlState) receiving fetched Fighter instances in index order, returns False to
+                   stop the crawl; its fetch method downloads fighters
+    :param concurrency: integer with maximum number of fetches in flight
+    :param parse_workers: optional - integer with number of parsing processes, or None to parse in handle
+    :return: None
+    """
+    loop = asyncio.get_running_loop()
+    get_transport().ensure_pool_size(concurrency)
+    parse_executor = None
+    if parse_workers:
+        parse_executor = ProcessPoolExecutor(max_workers=parse_workers)
+        parse_executor.submit(int).result()  # workers are forked now, before fetch threads could hold any lock.
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    parse_slots = asyncio.Semaphore(2 * parse_workers) if parse_workers else None
+    window = concurrency + (2 * parse_workers if parse_workers else 0)  # fighters fetched or parsed at once
+
+    async def fetch(fighter_index):
+        if parse_executor is None:
+            return await loop.run_in_executor(executor, handle.fetch, fighter_index)
+        F, markup = await loop.run_in_executor(executor, _fetch_markup, handle, fighter_index)
+        async with parse_slots:
+            extracted, parse_seconds, extract_seconds = await loop.run_in_executor(parse_executor, extract_page, markup)
+        _metrics.observe('parse', parse_seconds)
+        _metrics.observe('extract', extract_seconds)
+        F.set_extracted(extracted)
+        F.release()
+        return F
+
+    in_flight = {}   # task -> fighter index
+    fetched = {}     # fighter index -> fetched Fighter instance waiting for its turn
+    scheduled = collections.deque()  # fighters indexes in order they have to be handled
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(in_flight) < window and len(scheduled) < 2 * window:
+                fighter_index = next(indexes, None)
+                if fighter_index is None:
+                    exhausted = True
+                    break
+                in_flight[asyncio.ensure_future(fetch(fighter_index))] = fighter_index
+                scheduled.append(fighter_index)
+            if not in_flight:
+                break
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                fetched[in_flight.pop(future)] = future.result()
+            while scheduled and scheduled[0] in fetched:
+                if not handle(fetched.pop(scheduled.popleft())):
+                    return
+    finally:
+        for future in in_flight:  # fetches past the end of the crawl are not needed anymore.
+            future.cancel()
+        if in_flight:
+            await asyncio.wait(in_flight)
+        executor.shutdown(wait=True)  # letting already started fetches finish, so nothing runs after crawl returns.
+        if parse_executor is not None:
+            parse_executor.shutdown(wait=True)
+
+
+def scrape_all_fighters(filename, filetype='csv', concurrency=1, resume=False, checkpoint_every=100,
+                        parse_workers=None, sanitize=False):
+    """
+    Scrapes information about all fighters in Sherdog's database and saves them into csv or json file.
+    :param filename: string with name of the file we want to save data to; file will be created with given name
+    :param filetype: string with 'csv', 'json', 'jsonl', 'parquet' or 'arrow' as a type of file where results will be
+                     stored
+    :param concurrency: integer with number of fighters pages fetched at the same time, default is 1 (no concurrency)
+    :param resume: boolean, if True crawl continues from {filename}.checkpoint; anything written to output after the
+                   checkpoint is cut off first, so no fighter is lost or saved twice. json output is resumed from
+                   {filename}.json.part, which is kept until crawl is done. Default is False
+    :param checkpoint_every: integer, checkpoint is written after each that many indexes; None disables checkpoints.
+                             parquet and arrow files are complete only after crawl ends, so they are not checkpointed
+    :param parse_workers: optional - integer with number of processes pages are parsed in, so parsing is not limited
+                          to a single core; fetch threads only download pages and the main thread only saves. Default
+                          is None (pages are parsed in the main thread)
+    :param sanitize: boolean, if True csv output is cleaned while it is written, see CsvSink. Default is False
+    :return: None
+    """
+    _run_crawl(filename, filetype, itertools.count, concurrency=concurrency, resume=resume,
+               checkpoint_every=checkpoint_every, parse_workers=parse_workers, sanitize=sanitize)
+
+
+def _run_crawl(filename, filetype, indexes_from, concurrency=1, resume=False, checkpoint_every=100,
+               max_fails=MAX_FAILS, parse_workers=None, sanitize=False):
+    """
+    Runs a crawl over fighters indexes with checkpoints and resume, see scrape_all_fighters.
+    :param filename: string with name of the file we want to save data to
+    :param filetype: string with type of output file, see open_sink
+    :param indexes_from: callable taking first index to be crawled and returning iterator with indexes from there on
+    :param concurrency: integer with number of fighters pages fetched at the same time
+    :param resume: boolean, if True crawl continues from {filename}.checkpoint
+    :param checkpoint_every: integer, checkpoint is written after each that many indexes; None disables checkpoints
+    :param max_fails: optional - integer with amount of 'empty' indexes in a row that ends the crawl, or None
+    :param parse_workers: optional - integer with number of processes pages are parsed in, or None
+    :param sanitize: boolean, if True csv output is cleaned while it is written
+    :return: None
+    """
+    options = {}
+    if sanitize:
+        if filetype != 'csv':
+            raise ValueError('Only csv output can be sanitized, other filetypes have no delimiter to clash with.')
+        options['sanitize'] = True
+    if filetype in COLUMNAR_FILETYPES:
+        if resume:
+            raise ValueError(f'{filetype} output can not be resumed, please use csv or jsonl for resumable crawls.')
+        checkpoint_every = None
+    checkpoint = read_checkpoint(filename) if resume else None
+    if checkpoint is not None:
+        if checkpoint['filetype'] != filetype:
+            raise ValueError(f'Checkpoint for {filename} was written for {checkpoint["filetype"]} output.')
+        if checkpoint['finished']:
+            print(f'Crawl for {filename} has already finished, there is nothing to resume.')
+            return
+        print(f'Resuming crawl for {filename} from index {checkpoint["next_index"]}.')
+        start_index, fail_counter = checkpoint['next_index'], checkpoint['fail_counter']
+        sink = open_sink(filename, filetype, mode='a', offset=checkpoint['offset'], **options)
+
+    else:
+        start_index, fail_counter = 0, 0
+        sink = open_sink(filename, filetype, **options)
+
+    indexes = indexes_from(start_index)  # indexes of fighters that scraper is collecting information about.
+    handle = _CrawlState(sink, fail_counter=fail_counter, checkpoint_every=checkpoint_every, max_fails=max_fails)
+
+    with sink:
+        if concurrency > 1 or parse_workers:
+            asyncio.run(_crawl_concurrent(indexes, handle, concurrency, parse_workers=parse_workers))
+        else:
+            _crawl_sequential(indexes, handle)
+        go_on = handle.max_fails is None or handle.fail_counter <= handle.max_fails
+        if checkpoint_every and go_on:  # crawl ran out of indexes, instead of running into 'empty' ones.
+            handle.checkpoint(handle.next_index if handle.next_index is not None else start_index, finished=True)
+
+
+SHARD_MODES = ('modulus', 'range')
+
+
+def shard_filename(filename, shard, shards):
+    """
+    :param filename: string with name of the merged output file
+    :param shard: integer with shard number, from 0 to shards - 1
+    :param shards: integer with number of shards
+    :return: string with name of shard's output part (without extension)
+    """
+    return f'{filename}.shard{shard}-of-{shards}'
+
+
+def shard_indexes(shard, shards, shard_by='modulus', end=None, start=0):
+    """
+    Gives fighters indexes that belong to a shard.
+    :param shard: integer with shard number, from 0 to shards - 1
+    :param shards: integer with number of shards
+    :param shard_by: string with 'modulus' (shard takes every shards-th index) or 'range' (shard takes a continuous
+                     range of indexes below end, last shard also everything from end on)
+    :param end: optional - integer with index the ranges are split up to, required for 'range'
+    :param start: integer with first index to be crawled, when resuming
+    :return: tuple (iterator with indexes, boolean True if shard ends only after 'empty' indexes)
+    """
+    if shard_by not in SHARD_MODES:
+        raise ValueError(f'Unknown shard mode {shard_by}, please choose one of {SHARD_MODES}.')
+    if not 0 <= shard < shards:
+        raise ValueError(f'Shard number has to be between 0 and {shards - 1}.')
+    if shard_by == 'modulus':
+        first = start + (shard - start) % shards  # first index not lower than start that belongs to the shard.
+        return itertools.count(first, shards), True
+    if end is None:
+        raise ValueError("Range sharding needs end - the index ranges are split up to.")
+    low, high = shard * end // shards, (shard + 1) * end // shards
+    if shard == shards - 1:
+        return itertools.count(max(start, low)), True
+    return iter(range(max(start, low), high)), False
+
+
+def scrape_shard(filename, shard, shards, shard_by='modulus', end=None, concurrency=1, resume=False,
+                 checkpoint_every=100):
+    """
+    Scrapes a single shard of Sherdog's index space into its own output part, so a crawl can be split between
+    processes or hosts. Parts are combined with merge_shards.
+    Modulus shards stop after 10 'empty' indexes in a row of their own, which are 10 * shards indexes of the database.
+    Range shards below the last one crawl their whole range, the last one stops after 10 'empty' indexes in a row.
+    :param filename: string with name of the merged output file, part is saved to {filename}.shard{k}-of-{n}.jsonl
+    :param shard: integer with shard number, from 0 to shards - 1
+    :param shards: integer with number of shards
+    :param shard_by: string with 'modulus' or 'range', see shard_indexes
+    :param end: optional - integer with index the ranges are split up to, required for 'range'
+    :param concurrency: integer with number of fighters pages fetched at the same time
+    :param resume: boolean, if True shard continues from its checkpoint
+    :param checkpoint_every: integer, checkpoint is written after each that many indexes; None disables checkpoints
+    :return: None
+    """
+    open_ended = shard_indexes(shard, shards, shard_by=shard_by, end=end)[1]
+
+    def indexes_from(start_index):
+        return shard_indexes(shard, shards, shard_by=shard_by, end=end, start=start_index)[0]
+
+    _run_crawl(shard_filename(filename, shard, shards), 'shard', indexes_from, concurrency=concurrency,
+               resume=resume, checkpoint_every=checkpoint_every, max_fails=MAX_FAILS if open_ended else None)
+
+
+def read_shard(path):
+    """
+    Reads output part written by scrape_shard.
+    :param path: string with path of the part
+    :return: generator with dictionaries holding index, url, name and fights of each fighter, in index order
+    """
+    with open(path, encoding='utf-8') as part:
+        for line in part:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _fighter_from_part(record):
+    """
+    :param record: dictionary read from output part
+    :return: Fighter instance with fights, name, index and url of the record
+    """
+    F = Fighter()
+    F.index, F.url, F.name = record['index'], record['url'], record['name']
+    F.set_fight_rows([FightRecord(**fight) for fight in record['fights']])
+    return F
+
+
+def merge_shards(filename, shards, filetype='csv'):
+    """
+    Merges output parts of all shards into a single output ordered by fighter index, in one streaming pass. A
+    fighter found in more than one part (e.g. after overlapping reruns) is saved only once.
+    :param filename: string with name of the merged output file
+    :param shards: integer with number of shards
+    :param filetype: string with 'csv', 'json', 'jsonl', 'parquet' or 'arrow' as a type of merged file
+    :return: integer with number of fighters saved
+    """
+    parts = [read_shard(f'{shard_filename(filename, shard, shards)}.{ShardSink.extension}') for shard in range(shards)]
+    saved = 0
+    last_index = None
+    with open_sink(filename, filetype) as sink:
+        for record in heapq.merge(*parts, key=lambda part_record: part_record['index']):
+            if record['index'] == last_index:
+                continue
+            last_index = record['index']
+            sink.write_fighter(_fighter_from_part(record))
+            saved += 1
+    print(f'{saved} fighters from {shards} shards were merged into {sink.path}.')
+    return saved
+
+
+def scrape_sharded(filename, workers=4, filetype='csv', shard_by='modulus', end=None, concurrency=1, resume=False):
+    """
+    Scrapes all fighters with one process per shard and merges their parts, see scrape_shard and merge_shards. For
+    crawls split between hosts, run scrape_shard (or `python sherdog-parser.py shard`) on each host instead and merge
+    copied parts.
+    :param filename: string with name of the merged output file
+    :param workers: integer with number of processes (shards)
+    :param filetype: string with type of merged file
+    :param shard_by: string with 'modulus' or 'range', see shard_indexes
+    :param end: optional - integer with index the ranges are split up to, required for 'range'
+    :param concurrency: integer with number of fighters pages fetched at the same time by each process
+    :param resume: boolean, if True every shard continues from its checkpoint
+    :return: integer with number of fighters saved
+    """
+    processes = [multiprocessing.Process(target=scrape_shard, args=(filename, shard, workers),
+                                         kwargs={'shard_by': shard_by, 'end': end, 'concurrency': concurrency,
+                                                 'resume': resume})
+                 for shard in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    failed = [shard for shard, process in enumerate(processes) if process.exitcode != 0]
+    if failed:
+        raise RuntimeError(f'Shards {failed} failed, run scrape_sharded again with resume=True to finish them.')
+    return merge_shards(filename, workers, filetype=filetype)
+
+
+def fighter_page_key(fighter_page):
+    """
+    :param fighter_page: string with fighter's page, as a path ('/fighter/Jose-Aldo-11506') or a full url
+    :return: tuple (path of the page, Sherdog id of the fighter or None), id identifies fighter for visited set of
+             crawl_fighter_graph, even when his name is spelled differently in two links
+    """
+    path = urlsplit(fighter_page).path.rstrip('/')
+    fighter_id = re.search(r'-(\d+)$', path)
+    return path, int(fighter_id.group(1)) if fighter_id else None
+
+
+def crawl_fighter_graph(seeds, filename, filetype='csv', concurrency=1, max_fighters=None):
+    """
+    Scrapes fighters by following links between them instead of probing indexes: breadth first search starts from
+    seed fighters, and opponents linked in fight history of each scraped fighter make the next level. Every fighter
+    is fetched once (visited set is keyed on Sherdog id), so there are no requests for deleted or empty indexes and no
+    fighter is missed because of a gap in indexes; fighters without any pro fight linking them to seeds are not
+    reached.
+    :param seeds: list of strings with fighters pages (paths like '/fighter/Jose-Aldo-11506' or full urls)
+    :param filename: string with name of the file we want to save data to; file will be created with given name
+    :param filetype: string with type of output file, see open_sink
+    :param concurrency: integer with number of fighters pages fetched at the same time, default is 1
+    :param max_fighters: optional - integer with maximum number of fighters pages fetched, or None for no limit
+    :return: integer with number of fighters pages fetched
+    """
+    visited = set()
+    level = []
+    for seed in seeds:
+        path, fighter_id = fighter_page_key(seed)
+        if (fighter_id or path) not in visited:
+            visited.add(fighter_id or path)
+            level.append(path)
+    get_transport().ensure_pool_size(concurrency)
+    fetched = 0
+    depth = 0
+    with open_sink(filename, filetype) as sink, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while level:
+            if max_fighters is not None:
+                level = level[:max_fighters - fetched]
+                if not level:
+                    break
+            logging.info(f'Fighter graph level {depth}: {len(level)} fighters, {len(visited)} visited so far.')
+            next_level = []
+            # pages of a level are fetched in chunks, so only a few of them are held in memory at once.
+            for start in range(0, len(level), 4 * concurrency):
+                chunk = level[start:start + 4 * concurrency]
+                for F in executor.map(lambda fighter_page: Fighter().fetch(fighter_page=fighter_page), chunk):
+                    fetched += 1
+                    if not F.extract():
+                        continue
+                    F.save(sink)
+                    for link in F.opponent_links or []:
+                        path, fighter_id = fighter_page_key(link)
+                        if (fighter_id or path) not in visited:
+                            visited.add(fighter_id or path)
+                            next_level.append(path)
+            level = next_level
+            depth += 1
+    print(f'Fighter graph crawl is done, {fetched} fighters pages were fetched in {depth} levels.')
+    return fetched
+
+
+def _missing(value):
+    """
+    :param value: string with a field of a fight
+    :return: True if field was not found on the page
+    """
+    return value is None or value.strip() in ('', 'NA', 'N/A')
+
+
+class Event(object):
+    """Event class - single Sherdog event page, which lists every bout of the card with both fighters, result, method,
+    referee, round and time, so a whole card takes one request instead of two fighters profiles per bout.
+    """
+
+    def __init__(self):
+        """
+        Initializes an Event instance.
+        """
+        self.url = None
+        self.name = None  # str: event name, e.g. 'UFC 179 - Aldo vs. Mendes 2'
+        self.date = None  # str: event date in the same format as on fighters profiles, e.g. 'Oct / 25 / 2014'
+        self.resource = None
+        self.soup = None
+        # list of bouts, each a list [left, right, method, referee, round, time] where left and right are
+        # [name, fighter's page or None, result]; fields missing on the page are 'NA'.
+        self.bouts = None
+        self.links = None  # list of str: pages linked from event details - previous and next event, organization
+
+    def fetch(self, event_page):
+        """
+        Sets up url and downloads event page, without parsing it yet.
+        :param event_page: string with event page, e.g. '/events/UFC-179-Aldo-vs-Mendes-2-39325'
+        :return: Event instance (self)
+        """
+        self.url = f'{SHERDOG_URL}{urlsplit(event_page).path}'
+        self.resource = get_transport().get(self.url)
+        return self
+
+    @staticmethod
+    def _side(tag):
+        """
+        :param tag: bs4 Tag with one fighter of a bout
+        :return: list [name, fighter's page or None, result]
+        """
+        name = tag.find(attrs={'itemprop': 'name'})
+        link = tag.find('a', href=re.compile('^/fighter/'))
+        return [name.get_text(' ', strip=True) if name is not None else 'NA',
+                link['href'] if link is not None else None,
+                _cell_text(tag.find('span', class_='final_result'))]
+
+    def extract(self, release=True):
+        """
+        Parses downloaded page and collects event name, date and all bouts.
+        :param release: boolean, if True downloaded page and parse tree are dropped afterwards. Default is True
+        :return: True for an event page with at least one bout, False otherwise
+        """
+        self.soup = make_soup(self.resource.text, EVENT_PAGE_PARTS)
+        detail = self.soup.find('div', class_='event_detail')
+        self.bouts = []
+        self.links = []
+        if detail is not None:
+            self.name = _cell_text(detail.find('span', attrs={'itemprop': 'name'}))
+            self.links = [urlsplit(link['href']).path.rstrip('/') for link in detail.find_all('a', href=EVENT_LINK)]
+            start_date = detail.find('meta', attrs={'itemprop': 'startDate'})
+            try:
+                self.date = datetime.datetime.strptime(start_date['content'][:10], '%Y-%m-%d').strftime('%b / %d / %Y')
+            except (TypeError, KeyError, ValueError):
+                self.date = 'NA'
+        main_event = self.soup.find('div', class_='fight_card')
+        if main_event is not None and main_event.find('div', class_='left_side') is not None:
+            resume = {}
+            for cell in main_event.select('table.resume td'):
+                if cell.em is not None:
+                    label = cell.em.get_text()
+                    resume[label] = cell.get_text()[len(label):].strip() or 'NA'
+            self.bouts.append([self._side(main_event.find('div', class_='left_side')),
+                               self._side(main_event.find('div', class_='right_side')),
+                               resume.get('Method', 'NA'), resume.get('Referee', 'NA'), resume.get('Round', 'NA'),
+                               resume.get('Time', 'NA')])
+        card = self.soup.find('div', class_='event_match')
+        for row in card.find_all('tr', attrs={'itemprop': 'subEvent'}) if card is not None else []:
+            cells = row.find_all('td', recursive=False)
+            if len(cells) < 7:
+                continue
+            self.bouts.append([self._side(cells[1]), self._side(cells[3]), _cell_text(cells[4].b),
+                               _cell_text(cells[4].find('span', class_='sub_line')), cells[5].get_text().strip(),
+                               cells[6].get_text().strip()])
+        if release:
+            self.resource = None
+            self.soup = None
+        return len(self.bouts) > 0
+
+    def fill_from_profiles(self, profiles):
+        """
+        Fills fields of bouts that are missing on the event page (e.g. no referee or result) from the fight history
+        of one of the fighters. Profiles are fetched only for such bouts.
+        :param profiles: dictionary fighter's page -> {normalized event name: FightRecord}, shared between events,
+                         so each profile is fetched at most once
+        :return: integer with number of profiles fetched
+        """
+        fetched = 0
+        for bout in self.bouts:
+            for side, other in ((0, 1), (1, 0)):
+                fields = [bout[side][2]] + bout[2:]
+                if not any(_missing(value) for value in fields):
+                    break
+                page = bout[side][1]
+                if page is None:
+                    continue
+                if page not in profiles:
+                    F = Fighter().fetch(fighter_page=page)
+                    fetched += 1
+                    profiles[page] = {}
+                    if F.extract():
+                        profiles[page] = {_normalize(fight.event): fight for fight in F.fight_rows}
+                fight = profiles[page].get(_normalize(self.name))
+                if fight is None:
+                    continue
+                known = [fight.result, fight.method, fight.judge, fight.round, fight.time]
+                for position, (value, found) in enumerate(zip(fields, known)):
+                    if _missing(value) and not _missing(found):
+                        if position == 0:
+                            bout[side][2] = found
+                            bout[other][2] = FLIPPED_RESULTS.get(found, found)
+                        else:
+                            bout[position + 1] = found
+        return fetched
+
+    def fight_rows(self):
+        """
+        :return: list of tuples (fighter, fighter's page, FightRecord instance), two per bout - one from each side,
+                 the same nine fields fighters profiles give
+        """
+        rows = []
+        for left, right, method, referee, fight_round, fight_time in self.bouts:
+            for fighter, opponent in ((left, right), (right, left)):
+                rows.append((fighter[0], fighter[1], FightRecord(opponent[0], fighter[2], self.name, self.date, method,
+                                                                 referee, fight_round, fight_time)))
+        return rows
+
+
+# Event crawl writes two records per bout, one for each fighter; outputs which keep a single entry per fighter (json,
+# sqlite, shard) would lose all but the last event of a fighter.
+EVENT_FILETYPES = ('csv', 'jsonl', 'bouts', 'parquet', 'arrow')
+EVENT_SEEDS = ('/organizations/Ultimate-Fighting-Championship-UFC-2',)  # event discovery starts from UFC listing.
+EVENT_LINK = re.compile(r'^(?:https?://[^/]+)?/(?:events|organizations)/')  # event pages and organization listings
+
+
+def organization_listing_links(markup, listing_page):
+    """
+    Collects links of an organization's events listing page - its events and further listing pages of the same
+    organization; other organizations linked from the page are left out.
+    :param markup: string with html page
+    :param listing_page: string with path of the page, e.g. '/organizations/Ultimate-Fighting-Championship-UFC-2'
+    :return: list of strings with paths of event pages and listing pages
+    """
+    organization = '/'.join(listing_page.split('/')[:3])
+    links = []
+    for link in make_soup(markup).find_all('a', href=EVENT_LINK):
+        path = urlsplit(link['href']).path.rstrip('/')
+        if path.startswith('/events/') or path == organization or path.startswith(f'{organization}/'):
+            links.append(path)
+    return links
+
+
+def _fetch_event_page(page):
+    """
+    :param page: string with path of event page or organization listing page
+    :return: tuple (page, Event instance with downloaded page) for event page, (page, list of links) for listing
+    """
+    if page.startswith('/events/'):
+        return page, Event().fetch(page)
+    return page, organization_listing_links(get_transport().get(f'{SHERDOG_URL}{page}').text, page)
+
+
+def scrape_events(event_pages=None, filename='sherdog-events', filetype='csv', concurrency=1, fill_from_profiles=True,
+                  follow_links=None, max_events=None):
+    """
+    Scrapes whole cards from Sherdog event pages, one request per event, and saves the same fight rows fighter crawl
+    does (one per fighter of every bout). Pages wait in a frontier and every page is fetched once (visited set is
+    keyed on its path), also when it is listed or linked more than once. Organization listing pages (e.g.
+    '/organizations/Ultimate-Fighting-Championship-UFC-2') are expanded into their events and next listing pages; with
+    follow_links, previous and next events and organization linked from each event page are added as well, so a crawl
+    started from a single event reaches the whole organization.
+    :param event_pages: optional - iterable with strings of event pages or organization listing pages, e.g. event
+                        links of fighters (see Fighter.event_links), or None to discover events from EVENT_SEEDS
+    :param filename: string with name of the file we want to save data to, default is 'sherdog-events'
+    :param filetype: string with one of EVENT_FILETYPES as a type of file where results will be stored
+    :param concurrency: integer with number of pages fetched at the same time, default is 1
+    :param fill_from_profiles: boolean, if True fighters profiles are fetched for bouts with fields missing on the
+                               event page. Default is True
+    :param follow_links: optional - boolean, if True links of event pages are followed; None follows them only when
+                         there are no event_pages
+    :param max_events: optional - integer with maximum number of event pages fetched, or None for no limit
+    :return: integer with number of bouts saved
+    """
+    if filetype not in EVENT_FILETYPES:
+        raise ValueError(f'Events can not be saved to {filetype} output, please use one of {EVENT_FILETYPES}.')
+    if follow_links is None:
+        follow_links = event_pages is None
+    get_transport().ensure_pool_size(concurrency)
+    seeds = iter(EVENT_SEEDS if event_pages is None else event_pages)
+    frontier = collections.deque()  # paths of pages waiting to be fetched, in order they were found
+    visited = set()
+
+    def enqueue(page):
+        path = urlsplit(page).path.rstrip('/')
+        if path not in visited:
+            visited.add(path)
+            frontier.append(path)
+
+    profiles = {}
+    bouts = profiles_fetched = events_fetched = 0
+    with open_sink(filename, filetype) as sink, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while max_events is None or events_fetched < max_events:
+            chunk = []
+            while len(chunk) < 4 * concurrency:
+                if not frontier:
+                    seed = next(seeds, None)  # caller's pages are taken lazily, when the frontier runs dry.
+                    if seed is None:
+                        break
+                    enqueue(seed)
+                    continue
+                page = frontier.popleft()
+                if page.startswith('/events/'):
+                    if max_events is not None and events_fetched >= max_events:
+                        break
+                    events_fetched += 1
+                chunk.append(page)
+            if not chunk:
+                break
+            for page, event in executor.map(_fetch_event_page, chunk):
+                if not isinstance(event, Event):  # organization listing page.
+                    for link in event:
+                        enqueue(link)
+                    continue
+                if not event.extract():
+                    logging.info(f'No bouts were found on event page {event.url}.')
+                    continue
+                if follow_links:
+                    for link in event.links:
+                        enqueue(link)
+                if fill_from_profiles:
+                    profiles_fetched += event.fill_from_profiles(profiles)
+                for name, fighter_page, fight in event.fight_rows():
+                    F = Fighter()
+                    F.name = name
+                    F.url = f'{SHERDOG_URL}{fighter_page}' if fighter_page is not None else None
+                    F.set_fight_rows([fight])
+                    sink.write_fighter(F)
+                bouts += len(event.bouts)
+                print(f'{len(event.bouts)} bouts of {event.name} were passed to {sink.path}!')
+    print(f'Event crawl is done, {bouts} bouts of {events_fetched} events were saved, {profiles_fetched} fighters '
+          f'profiles were fetched.')
+    return bouts
+
+
+class FingerprintStore(object):
+    """FingerprintStore class - keeps a fingerprint of every scraped fighter (fight count, latest event date, digest
+    of fight history html and digest of each fight), so later refreshes can tell what has changed.
+    """
+
+    def __init__(self, filename):
+        """
+        Initializes a FingerprintStore instance, loading {filename}.json if it exists.
+        :param filename: string with name of fingerprints file (without extension)
+        """
+        self.filename = filename
+        try:
+            with open(f'{filename}.json', encoding='utf-8') as store_file:
+                self.fingerprints = json.load(store_file)  # fighter's url -> fingerprint dictionary
+        except FileNotFoundError:
+            self.fingerprints = {}
+        self.urls = {fingerprint['index']: url for url, fingerprint in self.fingerprints.items()
+                     if fingerprint.get('index') is not None}  # fighter's index -> url of his page
+
+    def known_indexes(self):
+        """
+        :return: sorted list of integers with indexes of fighters in the store that were found by index
+        """
+        indexes = []
+        for fingerprint in self.fingerprints.values():
+            if fingerprint.get('index') is not None:
+                indexes.append(fingerprint['index'])
+        return sorted(indexes)
+
+    def validators(self, fighter_index):
+        """
+        :param fighter_index: integer with fighter's index
+        :return: dictionary with If-None-Match / If-Modified-Since headers of the page stored for the index, empty if
+                 there is none
+        """
+        return ResponseCache.validators(self.fingerprints.get(self.urls.get(fighter_index)))
+
+    def is_unchanged(self, fighter):
+        """
+        Checks fetched fighter against stored fingerprint, without parsing the page: server answered 304 Not Modified
+        to conditional request, or raw fight history is the same (validators of the page are updated then).
+        :param fighter: Fighter instance with downloaded page
+        :return: True if fight history html has not changed since fingerprint was stored
+        """
+        if fighter.resource.status_code == 304:
+            return True
+        digest = fighter.history_digest()  # taken before page is parsed and released.
+        fingerprint = self.fingerprints.get(fighter.url)
+        if fingerprint is None or fingerprint['digest'] != digest:
+            return False
+        fingerprint.update(fighter.validators)
+        return True
+
+    def update(self, fighter):
+        """
+        Stores fingerprint of extracted fighter.
+        :param fighter: Fighter instance with extracted fights
+        :return: list of dictionaries with fights that are new or changed since previous fingerprint
+        """
+        previous = self.fingerprints.get(fighter.url)
+        known_rows = set(previous['rows']) if previous is not None else set()
+        fingerprint = fighter.fingerprint()
+        fingerprint['index'] = fighter.index
+        self.fingerprints[fighter.url] = fingerprint
+        if fighter.index is not None:
+            self.urls[fighter.index] = fighter.url
+        return [row for row, digest in zip(fighter.fight_rows or [], fingerprint['rows']) if digest not in known_rows]
+
+    def save(self):
+        """
+        Writes store to {filename}.json, replacing the old file atomically.
+        :return: None
+        """
+        with open(f'{self.filename}.json.tmp', 'w', encoding='utf-8') as store_file:
+            json.dump(self.fingerprints, store_file)
+        os.replace(f'{self.filename}.json.tmp', f'{self.filename}.json')
+
+
+class _RefreshState(_CrawlState):
+    """Crawl state for refresh_fighters - fetches known fighters with conditional requests, skips fighters whose
+    fight history has not changed and saves only new or changed fights of the others. Known indexes are always visited,
+    fail counter only stops probing for new ones (it starts from zero after the last known index).
+    """
+
+    def __init__(self, sink, store, last_known_index):
+        """
+        Initializes refresh state.
+        :param sink: open output sink where changes will be stored
+        :param store: FingerprintStore instance
+        :param last_known_index: integer with highest index found in store, -1 if store is empty
+        """
+        _CrawlState.__init__(self, sink)
+        self.store = store
+        self.last_known_index = last_known_index
+        self.unchanged = 0  # amount of fighters skipped without parsing.
+        self.changed = 0  # amount of new fighters and fighters with new or changed fights.
+
+    def fetch(self, fighter_index):
+        """
+        Downloads fighter's page with validators stored in his fingerprint, unchanged page comes back as 304.
+        :param fighter_index: integer with fighter's index
+        :return: Fighter instance with downloaded page
+        """
+        return Fighter().fetch(fighter_index=fighter_index, validators=self.store.validators(fighter_index))
+
+    def __call__(self, fighter):
+        """
+        Saves new or changed fights of fetched fighter, updating fail counter.
+        :param fighter: Fighter instance with already downloaded page
+        :return: True if refresh should go on
+        """
+        if self.store.is_unchanged(fighter):
+            self.unchanged += 1
+            self.fail_counter = 0
+        elif fighter.extract():
+            delta = self.store.update(fighter)
+            if delta:
+                self.changed += 1
+                fighter.set_fight_rows(delta)
+                fighter.save(self.sink)
+            self.fail_counter = 0
+        else:
+            self.fail_counter += 1
+        if fighter.index == self.last_known_index:
+            self.fail_counter = 0  # deleted known fighters must not end probing for new ones.
+        self.handled += 1
+        if self.handled % 100 == 0:
+            self.sink.flush(sync=True)  # fingerprints must never get ahead of fights that are actually stored.
+            self.store.save()
+        return fighter.index <= self.last_known_index or self.fail_counter <= MAX_FAILS
+
+
+def refresh_fighters(filename, filetype='csv', fingerprints='sherdog-fingerprints', concurrency=1):
+    """
+    Refreshes Sherdog data incrementally: visits every fighter stored in fingerprints file and probes indexes after
+    the last known one for new fighters, writing only new or changed fights. Known fighters are requested with ETag /
+    Last-Modified stored in their fingerprints, so unchanged pages come back as empty 304 answers; fighters whose fight
+    history html has not changed are skipped without parsing as well, so refresh cost follows amount of change instead
+    of database size. With an empty fingerprints file this is a full crawl which records fingerprints for the next
+    refresh.
+    :param filename: string with name of the file new or changed fights are saved to
+    :param filetype: string with 'csv', 'json', 'jsonl', 'parquet' or 'arrow' as a type of file where changes will be
+                     stored
+    :param fingerprints: string with name of fingerprints file (without extension)
+    :param concurrency: integer with number of fighters pages fetched at the same time
+    :return: dictionary with amount of unchanged and changed fighters
+    """
+    store = FingerprintStore(fingerprints)
+    known_indexes = store.known_indexes()
+    last_known_index = known_indexes[-1] if known_indexes else -1
+    indexes = itertools.chain(known_indexes, itertools.count(last_known_index + 1))
+    handle = _RefreshState(open_sink(filename, filetype), store, last_known_index)
+
+    with handle.sink:
+        if concurrency > 1:
+            asyncio.run(_crawl_concurrent(indexes, handle, concurrency))
+        else:
+            _crawl_sequential(indexes, handle)
+    store.save()
+    return {'unchanged': handle.unchanged, 'changed': handle.changed}
+
+
+def roster_page_fighters(markup):
+    """
+    Collects fighters from a single UFC athletes listing page.
+    :param markup: string with html page
+    :return: list of tuples (name, weight-division, nickname), empty list for a page past the last one
+    """
+    soup = make_soup(markup, UFC_ROSTER_PAGE_PARTS)
+    fighters = []
+    for fighter in soup.find_all('div', class_='c-listing-athlete__text'):
+        name = fighter.find('span', class_='c-listing-athlete__name').get_text().strip()
+        division = fighter.find_all('div', class_='field__item')
+        try:
+            div = division[1].get_text()
+        except IndexError:
+            try:
+                div = division[0].get_text()
+            except IndexError:
+                div = 'NA'
+        try:
+            nickname = fighter.find('span', class_='c-listing-athlete__nickname').div.get_text()
+            nickname = nickname.replace('\n', '')
+        except AttributeError:
+            nickname = 'NA'
+        fighters.append((name, div, nickname))
+    return fighters
+
+
+def _fetch_roster_page(gender_index, page):
+    """
+    :param gender_index: integer with 1 for men and 2 for women
+    :param page: integer with listing page number
+    :return: list of fighters on the page, see roster_page_fighters
+    """
+    resource = get_transport().get(f'{UFC_URL}/athletes/all?filters%5B0%5D=status%3A23&'
+                                   f'gender={gender_index}&page={page}')
+    return roster_page_fighters(resource.text)
+
+
+def scrape_ufc_roster(save='no', filetype=None, prefetch=4, database='sherdog'):
+    """
+    Scrapes information about all fighters in UFC database and saves them into csv or json file. Both genders are
+    fetched at the same time, and for each of them up to `prefetch` pages are requested ahead, before it is known
+    whether the listing goes on that far; pages are read in order and the first empty page ends the gender, pages
+    requested past it are dropped.
+    :param save: string with 'yes' or 'no' depends on output data allocation. Default is 'no' and data will be stored
+                 only in variable
+    :param filetype: string with 'csv', 'json' or 'sqlite' as a type of file where results will be stored; sqlite
+                     roster is upserted into roster table of the fighters database (see database). Default is None
+    :param prefetch: integer with number of listing pages of each gender fetched at the same time, default is 4
+    :param database: string with name of the database file (without extension) fighters were scraped into with
+                     sqlite filetype, so FightDatabase.roster answers from the same file. Default is 'sherdog'
+    :return: dictionary with information about UFC roster, for each fighter there will be a tuple containing
+             (name, weight-division, nickname)
+    """
+    ufc_roster = {
+        'men': [],
+        'women': []
+    }
+    genders = {1: 'men', 2: 'women'}
+    get_transport().ensure_pool_size(2 * prefetch)
+    with ThreadPoolExecutor(max_workers=2 * prefetch) as executor:
+        pending = {gender_index: collections.deque() for gender_index in genders}  # futures of pages, in order
+        next_page = {gender_index: 0 for gender_index in genders}
+        while pending:
+            for gender_index, pages in pending.items():
+                while len(pages) < prefetch:
+                    pages.append(executor.submit(_fetch_roster_page, gender_index, next_page[gender_index]))
+                    next_page[gender_index] += 1
+            concurrent.futures.wait([pages[0] for pages in pending.values()],
+                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for gender_index in list(pending):
+                pages = pending[gender_index]
+                while pages and pages[0].done():
+                    fighters = pages.popleft().result()
+                    if len(fighters) == 0:  # if page is empty = there are no fighters left, current gender is done.
+                        for future in pages:
+                            future.cancel()
+                        del pending[gender_index]
+                        break
+                    ufc_roster[genders[gender_index]].extend(fighters)
+
+    if save == 'yes':
+        if filetype == 'csv':
+            with CsvSink('ufc-roster', headers=['Name', 'Division', 'Nickname']) as sink:
+                for fighter in itertools.chain(ufc_roster['men'], ufc_roster['women']):
+                    sink.write_record(list(fighter))
+        elif filetype == 'json':
+            with open('ufc-roster.json', 'w') as fighter_json:
+                json.dump(ufc_roster, fighter_json, indent=4)
+        elif filetype == 'sqlite':
+            with SqliteSink(database) as sink:
+                sink.write_roster(ufc_roster)
+    return ufc_roster
+
+
+class RosterSnapshot(object):
+    """RosterSnapshot class - UFC roster scraped at a known time, with an index by weight-division and by name. Can be
+    used in place of scrape_ufc_roster result (snapshot['men'], snapshot['women']).
+    """
+
+    def __init__(self, roster, fetched):
+        """
+        Initializes a RosterSnapshot instance.
+        :param roster: dictionary with 'men' and 'women' lists of (name, weight-division, nickname) tuples
+        :param fetched: float with unix time the roster was scraped at
+        """
+        self.roster = {gender: [tuple(fighter) for fighter in fighters] for gender, fighters in roster.items()}
+        self.fetched = fetched
+        self.by_division = collections.defaultdict(list)  # weight-division -> list of fighters tuples
+        self.by_name = {}  # normalized name -> (gender, fighter tuple)
+        for gender, fighters in self.roster.items():
+            for fighter in fighters:
+                self.by_division[fighter[1]].append(fighter)
+                self.by_name[_normalize(fighter[0])] = (gender, fighter)
+
+    def __getitem__(self, gender):
+        return self.roster[gender]
+
+    def age(self):
+        """
+        :return: float with seconds since roster was scraped
+        """
+        return time.time() - self.fetched
+
+    def division(self, division):
+        """
+        :param division: string with weight-division, e.g. "Women's Strawweight"
+        :return: list of (name, weight-division, nickname) tuples
+        """
+        return self.by_division.get(division, [])
+
+    def find(self, name):
+        """
+        :param name: string with fighter's name, case and spacing are ignored
+        :return: tuple (gender, (name, weight-division, nickname)), or None if fighter is not on the roster
+        """
+        return self.by_name.get(_normalize(name))
+
+    def save(self, filename):
+        """
+        Writes snapshot to {filename}.json, replacing the old file atomically.
+        :param filename: string with name of snapshot file (without extension)
+        :return: None
+        """
+        with open(f'{filename}.json.tmp', 'w', encoding='utf-8') as snapshot_file:
+            json.dump({'fetched': self.fetched, 'roster': self.roster}, snapshot_file)
+        os.replace(f'{filename}.json.tmp', f'{filename}.json')
+
+    @classmethod
+    def load(cls, filename):
+        """
+        :param filename: string with name of snapshot file (without extension)
+        :return: RosterSnapshot instance, or None if there is no snapshot
+        """
+        try:
+            with open(f'{filename}.json', encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except FileNotFoundError:
+            return None
+        return cls(snapshot['roster'], snapshot['fetched'])
+
+
+_roster_snapshots = {}  # snapshot filename -> RosterSnapshot loaded by get_ufc_roster
+
+
+def get_ufc_roster(ttl=24 * 3600, filename='ufc-roster-snapshot', prefetch=4):
+    """
+    Returns UFC roster, scraping it only when the last snapshot is older than `ttl`. Snapshot is kept in memory and
+    in {filename}.json, so later calls (also from other processes) get the roster without paging the site again.
+    :param ttl: float with maximum age of snapshot in seconds, default is a day; 0 always scrapes the roster
+    :param filename: string with name of snapshot file (without extension)
+    :param prefetch: integer with number of listing pages of each gender fetched at the same time, see
+                     scrape_ufc_roster
+    :return: RosterSnapshot instance
+    """
+    snapshot = _roster_snapshots.get(filename) or RosterSnapshot.load(filename)
+    if snapshot is None or snapshot.age() >= ttl:
+        fetched = time.time()
+        snapshot = RosterSnapshot(scrape_ufc_roster(prefetch=prefetch), fetched)
+        snapshot.save(filename)
+    _roster_snapshots[filename] = snapshot
+    return snapshot
+
+
+# Sherdog's fightfinder weight filter values for UFC weight-divisions.
+WEIGHT_CLASSES = {
+    "Heavyweight": 2,
+    "Light Heavyweight": 3,
+    "Middleweight": 4,
+    "Welterweight": 5,
+    "Lightweight": 6,
+    "Featherweight": 7,
+    "Bantamweight": 9,
+    "Flyweight": 10,
+    "Women's Strawweight": 13,
+    "Women's Flyweight": 10,
+    "Women's Bantamweight": 9,
+    "Women's Featherweight": 7,
+}
+
+SEARCH_CACHE_SIZE = 1024  # fightfinder searches remembered, least recently used ones are dropped first.
+_search_cache = collections.OrderedDict()  # fightfinder url -> list of fighters pages found by a successful search
+_search_cache_lock = threading.Lock()
+
+
+def search_fightfinder(url):
+    """
+    Sends fightfinder search, or takes its result from memo if the same search succeeded recently (see
+    SEARCH_CACHE_SIZE). Failed searches - error answers and pages without results table - are not remembered, so
+    they are sent again next time.
+    :param url: string with fightfinder url
+    :return: list of strings with fighters pages found, or IndexError if there was no results table
+    """
+    with _search_cache_lock:
+        if url in _search_cache:
+            _search_cache.move_to_end(url)
+            return _search_cache[url]
+    resource = get_transport().get(url)
+    if resource.status_code != 200:
+        logging.info(f'Fightfinder search {url} failed with status {resource.status_code}.')
+        return IndexError
+    soup = make_soup(resource.text, SEARCH_PAGE_PARTS)
+    css_selector = soup.select('div.col_left > section:nth-child(2) > div > div.content.table > table')
+    try:
+        found = [link['href'] for link in css_selector[0].find_all('a')]
+    except IndexError:
+        return IndexError
+    with _search_cache_lock:
+        _search_cache[url] = found
+        if len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+    return found
+
+
+def _name_key(text):
+    """
+    :param text: string with fighter's name or nickname
+    :return: string in lower case without accents and punctuation, with single spaces, e.g. 'jose aldo' for 'José Aldo'
+    """
+    decomposed = unicodedata.normalize('NFKD', str(text).casefold())
+    return ' '.join(re.findall(r'[a-z0-9]+', ''.join(char for char in decomposed if not unicodedata.combining(char))))
+
+
+def _trigrams(key):
+    """
+    :param key: string returned by _name_key
+    :return: set of strings with all three letter parts of the key, padded with spaces
+    """
+    padded = f'  {key} '
+    return {padded[position:position + 3] for position in range(len(padded) - 2)}
+
+
+def _weight_code(weight_class):
+    """
+    :param weight_class: string with weight class, either as UFC roster (e.g. "Women's Strawweight") or as Sherdog
+                         profile names it (e.g. 'Strawweight')
+    :return: integer with fightfinder weight filter value, see WEIGHT_CLASSES, or None if it is not known
+    """
+    if not weight_class:
+        return None
+    return WEIGHT_CLASSES.get(weight_class, WEIGHT_CLASSES.get(f"Women's {weight_class}"))
+
 
-class Fighter(object):
-    """Fighter class - creating fighter instance based on fighter's Sherdog profile.
+class NameIndex(object):
+    """NameIndex class - resolves fighters to their Sherdog pages offline, from profiles crawled before. Only fighters
+    with the same normalized name are resolved; fighters of a conflicting weight class (compared through
+    WEIGHT_CLASSES) are dropped and several matches are narrowed down by nickname, the same filters fightfinder
+    searches use. Misspelled names are never resolved, trigram similarity only suggests them (see similar), so
+    fightfinder is searched for them instead of saving a wrong fighter.
     """
 
-    def __init__(self):
+    def __init__(self, min_similarity=0.6):
         """
-        Initializes a Fighter instance.
+        Initializes an empty NameIndex instance.
+        :param min_similarity: float, trigram similarity (0 to 1) a name needs to be suggested by similar
         """
-        self.url = None
-        self.name = None  # str: fighter's name, None by default
-        self.resource = None  # setting up resource based on url, None by default
-        self.soup = None  # creating BeautifulSoup object, None by default
-        self.pro_range = None  # selector: selecting range to pro fights exclusively, None by default
-        self.validation = False  # boolean: confirms if scraped data for fighter instance is validated, False by default
-
-        # Information about all pro fights, which certain Fighter instance had.
+        self.min_similarity = min_similarity
+        self.entries = []  # list of tuples (page, name, nickname key, weight code)
+        self.by_name = collections.defaultdict(list)  # name key -> list of entry positions
+        self.by_trigram = collections.defaultdict(set)  # trigram -> set of name keys
 
-        self.result_data = None  # list of str: fight results
-        self.opponents = None  # list of str: opponents
-        self.events = None  # list of str: events
-        self.events_date = None  # list of str: events date
-        self.method = None  # list of str: methods in which fights have ended
-        self.judges = None  # list od str: judges names
-        self.rounds = None  # list of str: rounds in which fights have ended
-        self.time = None  # list of str: exact point of time in the round where fights have ended
+    @classmethod
+    def load(cls, filename, **options):
+        """
+        :param filename: string with name of crawl output (without extension) - names sidecar written next to it (see
+                         open_sink) is read - or of names file written with filetype='names'
+        :param options: see __init__
+        :return: NameIndex instance with all fighters of the file
+        """
+        index = cls(**options)
+        with open(f'{filename}.{NameSink.extension}', encoding='utf-8') as names_file:
+            for line in names_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # empty line, or the last one cut by a crash.
+                index.add(record['url'], record['name'], record.get('nickname'), record.get('weight_class'))
+        return index
 
-    def _set_url_from_index(self, fighter_index):
+    def add(self, url, name, nickname=None, weight_class=None):
         """
-        Sets up url for fighter's instance.
-        :param fighter_index: integer with fighter's index
+        Adds a single fighter, the same page is added only once.
+        :param url: string with fighter's page url (or path)
+        :param name: string with fighter's name
+        :param nickname: optional - string with fighter's nickname
+        :param weight_class: optional - string with fighter's weight class
         :return: None
         """
-        self.url = f'https://www.sherdog.com/fighter/index?id={fighter_index}.'
+        parts = urlsplit(url)
+        page = parts.path + (f'?{parts.query}' if parts.query else '')
+        key = _name_key(name)
+        if any(self.entries[position][0] == page for position in self.by_name.get(key, [])):
+            return
+        if key not in self.by_name:
+            for trigram in _trigrams(key):
+                self.by_trigram[trigram].add(key)
+        self.by_name[key].append(len(self.entries))
+        self.entries.append((page, name, _name_key(nickname) if nickname else None, _weight_code(weight_class)))
 
-    def _set_url_from_selector(self, fighter_page):
+    def add_fighter(self, fighter):
         """
-        Sets up url from css selector match.
-        :param fighter_page: css selector result
+        :param fighter: Fighter instance with extracted name
         :return: None
         """
-        self.url = f'http://www.sherdog.com{fighter_page}'
+        self.add(fighter.url, fighter.name, fighter.nickname, fighter.weight_class)
+
+    def __len__(self):
+        return len(self.entries)
 
-    def _set_resource(self):
+    def similar(self, name):
         """
-        Sets up response object based on self.url value.
-        :return: response object
+        :param name: string with fighter's name, e.g. a misspelled one
+        :return: list of pages of fighters with the most similar name, empty if none reaches min_similarity
         """
-        resource = requests.get(self.url)
-        self.resource = resource
-        return resource
+        key = _name_key(name)
+        trigrams = _trigrams(key)
+        shared = collections.Counter()
+        for trigram in trigrams:
+            shared.update(self.by_trigram.get(trigram, ()))
+        best, best_similarity = [], self.min_similarity
+        for other, count in shared.items():
+            similarity = count / (len(trigrams) + len(_trigrams(other)) - count)
+            if similarity > best_similarity:
+                best, best_similarity = [other], similarity
+            elif similarity == best_similarity:
+                best.append(other)
+        return [self.entries[position][0] for other in best for position in self.by_name[other]]
 
-    def _set_soup(self):
+    def resolve(self, name, division=None, nickname=None):
         """
-        Sets up soup for Fighter's instance using data provided in self.resource.
-        :return: BeautifulSoup instance
+        :param name: string with fighter's name
+        :param division: optional - string with weight-division, e.g. from scrape_ufc_roster
+        :param nickname: optional - string with fighter's nickname ('NA' is taken as no nickname)
+        :return: string with fighter's page if exactly one fighter with the same normalized name matches, None otherwise
         """
-        soup = BeautifulSoup(self.resource.text, features='html.parser')
-        self.soup = soup
-        return soup
+        found = self.by_name.get(_name_key(name), [])
+        weight_code = _weight_code(division)
+        if weight_code is not None:  # fighters with unknown weight class are kept, conflicting ones are not.
+            found = [position for position in found if self.entries[position][3] in (None, weight_code)]
+        if len(found) > 1 and nickname and nickname != 'NA':
+            nickname_key = _name_key(nickname)
+            found = [position for position in found if self.entries[position][2] == nickname_key] or found
+        if len(found) == 1:
+            return self.entries[found[0]][0]
+        return None
 
-    def set_pro_fights(self):
+
+class _LazySearch(object):
+    """Four fightfinder searches for a single fighter, each one is sent only when it is asked for:
+    0 - based only on fighter's name
+    1 - based on fighter's name and weight class
+    2 - based on fighter's name and nickname
+    3 - based on fighter's name, nickname and weight class
+    """
+
+    def __init__(self, fighter_tuple):
         """
-        Sets up range of pro fights for Fighter instance with html code scraped from the site.
-        :return: None
+        :param fighter_tuple: tuple that contains (name, weight-division, nickname) for certain fighter.
         """
-        not_selected = self.soup.find_all('div', class_='module fight_history')
-        for line in not_selected:
-            if line.div.h2.get_text() == 'Fight History - Pro':
-                pro_fights = line
-                self.pro_range = pro_fights
+        self.fighter_tuple = fighter_tuple
 
-    def set_name(self):
+    def __getitem__(self, query):
         """
-        Collects and sets name for Fighter instance.
-        :return: sets self.name to scraped string with fighter's name, returns AttributeError in case none was found
+        :param query: integer with search number
+        :return: list of strings with fighters pages found, or IndexError if there were none; raises KeyError if
+                 search needs weight-division that is not in WEIGHT_CLASSES
         """
-        name = self.soup.find('span', class_='fn')
-        try:
-            self.name = name.get_text()
-        except AttributeError:
-            return AttributeError
+        name, division, nickname = self.fighter_tuple[:3]
+        search_text = f'{name}+{nickname}' if query >= 2 else name
+        url = f'{SHERDOG_URL}/stats/fightfinder?SearchTxt={search_text}'
+        if query in (1, 3):
+            url += f'&weight={WEIGHT_CLASSES[division]}'
+        return search_fightfinder(url)
 
-    def grab_result_data(self):
+
+def scrape_list_of_fighters(fighters_list, filename, filetype='csv', concurrency=1, name_index=None):
+    """
+    Scrapes information about list of fighters in sherdog's database and saves them into csv or json file.
+    :param fighters_list: list with fighters to be scrapped from sherdog, fighter list should contain tuple with
+           (name, weight-division, nickname) for each fighter
+    :param filename: string with name of the file we want to save data to; file will be created with given name
+    :param filetype: string with 'csv', 'json', 'jsonl', 'parquet' or 'arrow' as a type of file where results will
+                     be stored. Default is 'csv'
+    :param concurrency: integer with number of fighters searched and fetched at the same time, fighters are still
+                        saved in the order of the list. Default is 1
+    :param name_index: optional - NameIndex instance; fighters it resolves are fetched straight away, fightfinder
+                       is searched only for the others. Default is None (every fighter is searched)
+    :return: None
+    """
+
+    def resolve_fighter(fighter):
         """
-        Collects and sets results for all pro fights in range of Fighter instance.
-        :return: list of strings with results
+        Nested function that narrows down fightfinder searches until a single fighter is found; next search is sent
+        only if previous one was not enough.
+        :param fighter: tuple that contains (name, weight-division, nickname) for certain fighter.
+        :return: string with fighter's page, or None if fighter could not be found
         """
-        results = []
+        search_results = _LazySearch(fighter)
+        results = search_results[0]  # searching by name first.
+        if results == IndexError:
+            logging.info(f'Error occurred with {fighter}, please check carefully '
+                         f'if there is no mistake in fighter name!')
+            return None
+        if len(results) == 1:
+            return results[0]
         try:
-            finder = self.pro_range.find_all('span', class_='final_result')
-            for result in finder:
-                results.append(result.get_text())
-        except AttributeError:
-            logging.info(f'Attribute Error while grabbing result data for {self.name}, the data might be missing!')
-        else:
-            self.result_data = results
-            return results
+            results = search_results[1]  # narrowing down by weight class.
+        except KeyError:
+            print('Search engine tried to narrow down findings by using weight-class filter, apparently '
+                  'you have not specified weight-class data!')
+            results = IndexError
+        if results == IndexError:
+            results = search_results[2]  # narrowing down by nickname instead.
+            if results == IndexError:
+                logging.info(f'Error occured with {fighter}, please check carefully if there is no mistake '
+                             f'in nickname!')
+            elif len(results) == 1:
+                return results[0]
+            return None
+        if len(results) == 1:
+            return results[0]
+        results = search_results[2]  # narrowing down by nickname.
+        if results == IndexError:
+            logging.info(f'Error occurred with {fighter}, please check carefully '
+                         f'- searching with name & nickname data was unsuccessful!')
+            return None
+        if len(results) == 1:
+            return results[0]
+        try:
+            results = search_results[3]  # using all filters.
+        except KeyError:
+            print(f'Search engine tried to narrow down findings by using all filters, '
+                  f'apparently this was not enough to find {fighter[0]}!')
+            return None
+        if results == IndexError:
+            logging.info(f'Error occurred with {fighter}, please check carefully '
+                         f'- searching with all provided data was unsuccessful!')
+            return None
+        return results[0]
 
-    def grab_opponents(self):
+    def fetch_fighter(fighter):
         """
-        Collects and sets names of opponents in range of pro fights for Fighter instance.
-        :return: list of strings with opponents names
+        Nested function that finds fighter and downloads his page, runs in worker threads.
+        :param fighter: tuple that contains (name, weight-division, nickname) for certain fighter.
+        :return: Fighter instance with downloaded page, or None if fighter could not be found
         """
-        fighters = []
-        try:
-            finder = self.pro_range.find_all('a')
-            for index in range(0, len(finder), 2):
-                fighters.append(finder[index].get_text())
-        except AttributeError:
-            logging.info(f'Attribute Error while grabbing opponent data for {self.name}, the data might be missing!')
-        else:
-            self.opponents = fighters
-            return fighters
+        fighter_page = name_index.resolve(*fighter[:3]) if name_index is not None else None
+        if fighter_page is None:
+            fighter_page = resolve_fighter(fighter)
+        if fighter_page is None:
+            return None
+        return Fighter().fetch(fighter_page=fighter_page)
 
-    def grab_events(self):
+    def fetch_in_order(executor):
         """
-        Collects and sets events in range of pro fights for Fighter instance.
-        :return: list of strings with events
+        Nested generator that keeps at most 2 * concurrency fighters submitted ahead of the one being saved, like the
+        crawl engine does, so queued searches and downloaded pages do not grow with the list.
+        :param executor: ThreadPoolExecutor fighters are fetched in
+        :return: generator with results of fetch_fighter, in the order of the list
         """
-        events = []
-        try:
-            finder = self.pro_range.find_all('a')
-            for index in range(1, len(finder), 2):
-                events.append(finder[index].get_text())
-        except AttributeError:
-            logging.info(f'Attribute Error while grabbing event data for {self.name}, the data might be missing!')
-        else:
-            self.events = events
-            return events
+        fighters = iter(fighters_list)
+        window = collections.deque(executor.submit(fetch_fighter, fighter)
+                                   for fighter in itertools.islice(fighters, 2 * concurrency))
+        while window:
+            F = window.popleft().result()
+            for fighter in itertools.islice(fighters, 1):
+                window.append(executor.submit(fetch_fighter, fighter))
+            yield F
 
-    def grab_events_date(self):
+    sink = open_sink(filename, filetype)
+    executor = None
+    if concurrency > 1:
+        get_transport().ensure_pool_size(concurrency)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        fetched = fetch_in_order(executor)
+    else:
+        fetched = map(fetch_fighter, fighters_list)
+    try:
+        with sink:
+            for F in fetched:
+                if F is not None and F.extract():  # saving found fighters in the order of the list.
+                    F.save(sink)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def jsonl_to_json(filename):
+    """
+    Turns json lines file created with filetype='jsonl' into a json file with the same layout as filetype='json'
+    produces, in a single pass and without loading whole file into memory.
+    Fighters that appear more than once keep all their entries, when such file is loaded the last one wins - the same
+    way as it would have been with filetype='json'.
+    :param filename: string with name of the file, {filename}.jsonl is read and {filename}.json is written
+    :return: None
+    """
+    _write_json_from_lines(f'{filename}.jsonl', f'{filename}.json')
+
+
+def read_fight_rows(filename, filetype='csv', delimiter=','):
+    """
+    Reads fights back from output of the scraper, one fight at a time.
+    :param filename: string with name of the file (without extension)
+    :param filetype: string with 'csv', 'jsonl' or 'json' as a type of the file
+    :param delimiter: string with csv delimiter, ';' for sanitized csv files
+    :return: generator with tuples of strings (fighter, opponent, result, event, event date, method, referee, round,
+             time)
+    """
+    if filetype == 'csv':
+        with open(f'{filename}.csv', newline='', encoding='utf-8') as csv_file:
+            reader = csv.reader(csv_file, delimiter=delimiter)
+            next(reader, None)  # skipping headers.
+            for row in reader:
+                if len(row) == len(FIGHT_HEADERS):
+                    yield tuple(row)
+    elif filetype in ('jsonl', 'json'):
+        with open(f'{filename}.{filetype}', encoding='utf-8') as json_file:
+            fighters = map(json.loads, json_file) if filetype == 'jsonl' else [json.load(json_file)]
+            for fighter in fighters:
+                for name, fights in fighter.items():
+                    for fight in fights:
+                        yield (name,) + tuple(fight[field] for field in FightRecord.__slots__)
+    else:
+        raise ValueError(f'Fights can not be read from {filetype} output, please use csv, jsonl or json.')
+
+
+FIGHT_MINUTES = 5  # length of a round used for fight time, championship and old rounds are counted the same.
+
+
+class FightStore(object):
+    """FightStore class - fights loaded into NumPy columns for analytics. Strings (names, results, events, methods,
+    referees) are stored as integer codes into lookup lists, dates as datetime64 and rounds and times as integers
+    (-1 when they could not be read). Hash indexes map a fighter, opponent, event or date to positions of its rows,
+    and aggregates are computed over whole columns at once instead of looping over fights in Python.
+    """
+
+    RESULTS = ('win', 'loss', 'draw', 'NC')
+
+    def __init__(self, rows):
         """
-        Collects and sets events dates in range of pro fights for Fighter instance.
-        :return: list of strings with events dates
+        Initializes a FightStore instance.
+        :param rows: iterable with tuples of strings, see read_fight_rows
         """
-        events_date = []
-        try:
-            finder = self.pro_range.find_all('span', class_='sub_line')
-            for index in range(0, len(finder), 2):
-                events_date.append(finder[index].get_text())
-        except AttributeError:
-            logging.info(f'Attribute Error while grabbing event dates for {self.name}, the data might be missing!')
-        else:
-            self.events_date = events_date
-            return events_date
+        if numpy is None:
+            raise ValueError('FightStore requires numpy package to be installed.')
+        names, events, methods, referees = {}, {}, {}, {}  # string -> integer code
+        results = {result: code for code, result in enumerate(self.RESULTS)}
+        dates, rounds, times = {}, {}, {}  # raw string -> parsed value, so each distinct value is parsed once
+        columns = collections.defaultdict(list)
+        for fighter, opponent, result, event, event_date, method, referee, fight_round, fight_time in rows:
+            columns['fighter'].append(names.setdefault(fighter, len(names)))
+            columns['opponent'].append(names.setdefault(opponent, len(names)))
+            columns['result'].append(results.setdefault(result, len(results)))
+            columns['event'].append(events.setdefault(event, len(events)))
+            if event_date not in dates:
+                parsed = parse_event_date(event_date)
+                dates[event_date] = parsed.isoformat() if parsed is not None else 'NaT'
+            columns['date'].append(dates[event_date])
+            columns['method'].append(methods.setdefault(method, len(methods)))
+            columns['referee'].append(referees.setdefault(referee, len(referees)))
+            if fight_round not in rounds:
+                rounds[fight_round] = parse_round(fight_round)
+            columns['round'].append(rounds[fight_round])
+            if fight_time not in times:
+                times[fight_time] = parse_fight_time(fight_time)
+            columns['time'].append(times[fight_time])
 
-    def grab_judges(self):
+        self.names = list(names)  # fighters and opponents share codes, so a fighter is the same in both columns
+        self.results = list(results)
+        self.events = list(events)
+        self.methods = list(methods)
+        self.referees = list(referees)
+        self._codes = {'fighter': names, 'opponent': names, 'event': events}
+        self.fighter = numpy.array(columns['fighter'], dtype=numpy.int32)
+        self.opponent = numpy.array(columns['opponent'], dtype=numpy.int32)
+        self.result = numpy.array(columns['result'], dtype=numpy.int8)
+        self.event = numpy.array(columns['event'], dtype=numpy.int32)
+        self.date = numpy.array(columns['date'], dtype='datetime64[D]')
+        self.method = numpy.array(columns['method'], dtype=numpy.int32)
+        self.referee = numpy.array(columns['referee'], dtype=numpy.int32)
+        self.round = numpy.array([-1 if value is None else value for value in columns['round']], dtype=numpy.int16)
+        self.time = numpy.array([-1 if value is None else value for value in columns['time']], dtype=numpy.int32)
+        self.indexes = {field: self._build_index(getattr(self, field)) for field in ('fighter', 'opponent', 'event')}
+        self.indexes['date'] = self._build_index(self.date)
+
+    @classmethod
+    def load(cls, filename, filetype='csv', delimiter=','):
         """
-        Collects and sets judges names in range of pro fights for Fighter instance.
-        :return: list of strings with judges names
+        :param filename: string with name of the file (without extension)
+        :param filetype: string with 'csv', 'jsonl' or 'json' as a type of the file
+        :param delimiter: string with csv delimiter
+        :return: FightStore instance with all fights of the file
         """
-        judges = []
-        try:
-            finder = self.pro_range.find_all('span', class_='sub_line')
-            for index in range(1, len(finder), 2):
-                judges.append(finder[index].get_text())
-        except AttributeError:
-            logging.info(f'Attribute Error while grabbing judges data for {self.name}, the data might be missing!')
-        else:
-            self.judges = judges
-            return judges
+        return cls(read_fight_rows(filename, filetype=filetype, delimiter=delimiter))
 
-    def grab_method(self):
+    @staticmethod
+    def _build_index(column):
         """
-        Collects and sets fight end methods in range of pro fights for Fighter instance.
-        :return: list of strings with fight end methods
+        :param column: numpy array
+        :return: dictionary value -> array with positions of rows holding the value, in file order
         """
-        methods = []
-        try:
-            finder = self.pro_range.find_all('td')
-            for index in range(9, len(finder), 6):
-                checker = 0  # small trick that will allow scraper to only get end methods and leave judge name.
-                for text in finder[index].stripped_strings:
-                    if checker % 2 == 0:
-                        methods.append(text)
-                        checker += 1
-                    else:
-                        checker += 1
-        except AttributeError:
-            logging.info(f'Attribute Error while grabbing methods data for {self.name}, the data might be missing!')
-        else:
-            self.method = methods
-            return methods
+        order = numpy.argsort(column, kind='stable')
+        ordered = column[order]
+        starts = numpy.flatnonzero(numpy.concatenate(([True], ordered[1:] != ordered[:-1]))) if len(column) else []
+        groups = numpy.split(order, starts[1:]) if len(column) else []
+        return {ordered[start].item(): group for start, group in zip(starts, groups)}
 
-    def grab_rounds(self):
+    def __len__(self):
+        return len(self.fighter)
+
+    def rows(self, fighter=None, opponent=None, event=None, date=None):
         """
-        Collects and sets information about round in which fight was finished in range of pro fights for
-        Fighter instance.
-        :return: list of strings with rounds
+        Looks rows up in hash indexes, all given conditions have to match.
+        :param fighter: optional - string with fighter's name
+        :param opponent: optional - string with opponent's name
+        :param event: optional - string with event name
+        :param date: optional - datetime.date, or string with date in ISO format
+        :return: array with positions of matching rows, in file order
         """
-        rounds = []
-        try:
-            finder = self.pro_range.find_all('td')
-            for index in range(10, len(finder), 6):
-                rounds.append(finder[index].get_text())
-        except AttributeError:
-            logging.info(f'Attribute Error while grabbing rounds data for {self.name}, the data might be missing!')
-        else:
-            self.rounds = rounds
-            return rounds
+        positions = None
+        for field, value in (('fighter', fighter), ('opponent', opponent), ('event', event), ('date', date)):
+            if value is None:
+                continue
+            if field == 'date':
+                key = numpy.datetime64(value, 'D').item()
+            else:
+                key = self._codes[field].get(value)
+            found = self.indexes[field].get(key, numpy.empty(0, dtype=numpy.int64))
+            positions = found if positions is None else numpy.intersect1d(positions, found)
+        return positions if positions is not None else numpy.arange(len(self))
 
-    def grab_time(self):
+    def fights(self, positions):
         """
-        Collects and sets fight time end in range of pro fights for Fighter instance.
-        :return: list of strings with time
+        :param positions: array with positions of rows, see rows
+        :return: list of tuples (fighter, FightRecord instance); dates, rounds and times are in their parsed form
         """
-        time = []
-        try:
-            finder = self.pro_range.find_all('td')
-            for index in range(11, len(finder), 6):
-                time.append(finder[index].get_text())
-        except AttributeError:
-            logging.info(f'Attribute Error while grabbing time data for {self.name}, the data might be missing!')
-        else:
-            self.time = time
-            return time
+        return [(self.names[self.fighter[position]],
+                 FightRecord(self.names[self.opponent[position]], self.results[self.result[position]],
+                             self.events[self.event[position]], self.date[position].item(),
+                             self.methods[self.method[position]], self.referees[self.referee[position]],
+                             self.round[position].item(), self.time[position].item()))
+                for position in positions]
 
-    def get_validation(self):
+    def _code(self, name):
         """
-        Making validation by comparing collected data, checking if length of all information matches number of fights
-        that was scraped for fighter instance.
-        :return: boolean value or TypeError in case any of lists was empty (self.validation is False by default)
+        :param name: string with fighter's name
+        :return: integer with fighter's code, ValueError if fighter is not in the store
         """
-        for_validation = [self.time, self.rounds, self.method, self.judges, self.events_date, self.events,
-                          self.result_data]
         try:
-            if all(len(x) == len(self.opponents) for x in for_validation):
-                self.validation = True
-                return True
-            else:
-                print(f'Warning: validation unsuccessful for {self.name}!')
-                return False
-        except TypeError:
-            return TypeError
+            return self._codes['fighter'][name]
+        except KeyError:
+            raise ValueError(f'There are no fights of {name} in the store.')
 
-    def is_valid(self):
+    def records(self):
         """
-        Supporting method for checking status of validation for fighter instance.
-        :return: boolean value
+        :return: dictionary result ('win', 'loss', 'draw', 'NC') -> array with number of such fights of each fighter,
+                 arrays are indexed by fighter's code (position in self.names)
         """
-        if self.validation is True:
-            return True
-        else:
-            return False
+        return {result: numpy.bincount(self.fighter[self.result == code], minlength=len(self.names))
+                for code, result in enumerate(self.RESULTS)}
 
-    def save_to_csv(self, filename):
+    def record(self, name):
         """
-        Writing all collected information regarding fighter instance to csv file.
-        :param filename: string with name of the file we want to save data to; file will be created with given name
-        :return: None
+        :param name: string with fighter's name
+        :return: dictionary result -> number of fighter's fights with such result
         """
-        with open(f'{filename}.csv', 'a', newline='', encoding="ISO-8859-1") as csvfile:
-            writer = csv.writer(csvfile, delimiter=';')
-            for index in range(len(self.result_data)):
-                try:
-                    opp = self.opponents[index]
-                except IndexError:
-                    opp = 'N/A'
-                try:
-                    result = self.result_data[index]
-                except IndexError:
-                    result = 'N/A'
-                try:
-                    event = self.events[index]
-                except IndexError:
-                    event = 'NA'
-                try:
-                    event_date = self.events_date[index]
-                except IndexError:
-                    event_date = 'NA'
-                try:
-                    method = self.method[index]
-                except IndexError:
-                    method = 'NA'
-                try:
-                    judges = self.judges[index]
-                except IndexError:
-                    judges = 'NA'
-                try:
-                    rounds = self.rounds[index]
-                except IndexError:
-                    rounds = 'NA'
-                try:
-                    time = self.time[index]
-                except IndexError:
-                    time = 'NA'
-                try:
-                    writer.writerow([self.name, opp, result, event, event_date, method, judges, rounds, time])
-                except UnicodeEncodeError:
-                    print(f'Coding error while attempting to save date for {self.name}, line was dropped!')
-            print(f'CSV file was successfully overwritten for {self.name}!')
+        results = self.result[self.indexes['fighter'].get(self._code(name), [])]
+        counts = numpy.bincount(results, minlength=len(self.results))
+        return {result: int(counts[code]) for code, result in enumerate(self.RESULTS)}
 
-    def save_to_json(self, filename):
+    def method_distribution(self, name=None, result='win'):
         """
-        Writing all collected information regarding fighter instance to json file.
-        :param filename: string with name of the file we want to save data to; file will be created with given name
-        :return: None
+        Counts fights by finish method, the part of method before details in brackets (e.g. 'KO' for 'KO (Punch)').
+        :param name: optional - string with fighter's name, or None for all fights
+        :param result: optional - string with result of counted fights, or None for all of them. Default is 'win', so
+                       each bout is counted once, from its winner's side
+        :return: dictionary method -> number of fights, most common first
         """
-        fighter_dictionary = {self.name: []}  # initializing dictionary that will be passed into json file.
-
-        for index in range(len(self.result_data)):
-            try:
-                opp = self.opponents[index]
-            except IndexError:
-                opp = 'N/A'
-            try:
-                result = self.result_data[index]
-            except IndexError:
-                result = 'N/A'
-            try:
-                event = self.events[index]
-            except IndexError:
-                event = 'NA'
-            try:
-                event_date = self.events_date[index]
-            except IndexError:
-                event_date = 'NA'
-            try:
-                method = self.method[index]
-            except IndexError:
-                method = 'NA'
-            try:
-                judges = self.judges[index]
-            except IndexError:
-                judges = 'NA'
-            try:
-                rounds = self.rounds[index]
-            except IndexError:
-                rounds = 'NA'
-            try:
-                time = self.time[index]
-            except IndexError:
-                time = 'NA'
-            line = {'opponent': opp, 'result': result, 'event': event, 'date': event_date, 'method': method,
-                    'judge': judges, 'round': rounds, 'time': time}
-            fighter_dictionary[self.name].append(line)
-
-        with open(f'{filename}.json') as fighter_json:
-            data = json.load(fighter_json)
-        data.update(fighter_dictionary)
-        with open(f'{filename}.json', 'w') as fighter_json:
-            json.dump(data, fighter_json, indent=4)
-        print(f'JSON file was successfully overwritten for {self.name}!')
+        categories = {}
+        method_category = numpy.array([categories.setdefault(method.split('(')[0].strip(), len(categories))
+                                       for method in self.methods], dtype=numpy.int32)
+        mask = numpy.ones(len(self), dtype=bool)
+        if name is not None:
+            mask[:] = False
+            mask[self.indexes['fighter'].get(self._code(name), [])] = True
+        if result is not None:
+            mask &= self.result == self.results.index(result)
+        if len(method_category) == 0:
+            return {}
+        counts = numpy.bincount(method_category[self.method[mask]], minlength=len(categories))
+        ranked = sorted(categories.items(), key=lambda category: -counts[category[1]])
+        return {category: int(counts[code]) for category, code in ranked if counts[code]}
 
-    def scrape_fighter(self, filetype, filename, fighter_index=None, fighter_page=None):
+    def fight_seconds(self):
         """
-        :param filetype: string with either 'csv' or 'json' as a type of file where results will be stored.
-        :param filename: string with name of the file we want to save data to; file will be created with given name
-        :param fighter_index: optional - integer with fighter's index, or None
-        :param fighter_page: optional - css selector match with fighter's page, or None
-        :return: True for valid fighter's page and False if page was empty
+        :return: array with length of each fight in seconds, (round - 1) * 5 minutes + time in round; -1 where round
+                 or time could not be read
         """
-        if fighter_index is not None:
-            self._set_url_from_index(fighter_index)
-        elif fighter_page is not None:
-            self._set_url_from_selector(fighter_page)
-        else:
-            print("Error, please pass fighter's index, or fighter's page in order to proceed.")
-        self._set_resource()
-        self._set_soup()
-        if self.set_name() != AttributeError:  # checking if there is existing name for a fighter instance.
-            self.set_pro_fights()
-            self.grab_result_data()
-            self.grab_opponents()
-            self.grab_events_date()
-            self.grab_events()
-            self.grab_judges()
-            self.grab_method()
-            self.grab_rounds()
-            self.grab_time()
-            if self.get_validation() != TypeError:  # if there was an empty list while validating data,
-                if filetype == 'csv':               # fighter instance will be dropped.
-                    self.save_to_csv(filename)
-                elif filetype == 'json':
-                    self.save_to_json(filename)
-            return True
-        else:
-            return False
-
-# END OF FIGHTER CLASS
-
+        seconds = (self.round.astype(numpy.int32) - 1) * FIGHT_MINUTES * 60 + self.time
+        return numpy.where((self.round > 0) & (self.time >= 0), seconds, -1)
 
-def scrape_all_fighters(filename, filetype='csv'):
-    """
-    Scrapes information about all fighters in Sherdog's database and saves them into csv or json file.
-    :param filename: string with name of the file we want to save data to; file will be created with given name
-    :param filetype: string with either 'csv' or 'json' as a type of file where results will be stored
-    :return: None
-    """
-    if filetype == 'csv':
-        headers = ['Fighter', 'Opponent', 'Result', 'Event', 'Event_date', 'Method', 'Referee', 'Round', 'Time']
-        with open(f'{filename}.csv', 'w', newline='') as csvfile:
-            init_writer = csv.writer(csvfile, delimiter=',')
-            init_writer.writerow(headers)
-
-    elif filetype == 'json':
-        json_init = {}
-        with open(f'{filename}.json', 'w') as fighter_json:
-            json.dump(json_init, fighter_json)
-
-    fighter_index = 0   # sets up and stores index of a fighter that scraper is collecting information about.
-    fail_counter = 0    # amount of 'empty' indexes in a row.
-
-    while fail_counter <= 10:  # scraper will be done after there were 10 non-existing sites (indexes) in a row.
-        F = Fighter()          # creating fighter's instance object.
-        scrapped_data = F.scrape_fighter(filetype, filename, fighter_index=fighter_index)
-        if scrapped_data is True:
-            fail_counter = 0  # resetting fail counter after finding valid page(index) for a fighter.
-        else:
-            fail_counter += 1  # incrementing fail counter if there was no data for certain index.
-        fighter_index += 1  # incrementing index.
-
-
-def scrape_ufc_roster(save='no', filetype=None):
-    """
-    Scrapes information about all fighters in UFC database and saves them into csv or json file.
-    :param save: string with 'yes' or 'no' depends on output data allocation. Default is 'no' and data will be stored
-                 only in variable
-    :param filetype: string with either 'csv' or 'json' as a type of file where results will be stored. Default is None
-    :return: dictionary with information about UFC roster, for each fighter there will be a tuple containing
-             (name, weight-division, nickname)
-    """
-    ufc_roster = {
-        'men': [],
-        'women': []
-    }
-
-    men_roster = []
-    women_roster = []
-
-    for gender_index in range(1, 3):
-        page = 0
-        while True:
-            resource = requests.get(f'https://www.ufc.com/athletes/all?filters%5B0%5D=status%3A23&'
-                                    f'gender={gender_index}&page={page}')
-            soup = BeautifulSoup(resource.text, features='html.parser')
-            fighter = soup.find_all('div', class_='c-listing-athlete__text')
-            if len(fighter) == 0:  # if page is empty = there are no fighters left, current gender index is done.
-                break
-            else:
-                for index in range(len(fighter)):
-                    name = fighter[index].find('span', class_='c-listing-athlete__name').get_text().strip()
-                    division = fighter[index].find_all('div', class_='field__item')
-                    try:
-                        div = division[1].get_text()
-                    except IndexError:
-                        try:
-                            div = division[0].get_text()
-                        except IndexError:
-                            div = 'NA'
-                    try:
-                        nickname = fighter[index].find('span', class_='c-listing-athlete__nickname').div.get_text()
-                        nickname = nickname.replace('\n', '')
-                    except AttributeError:
-                        nickname = 'NA'
-                    if gender_index == 2:
-                        women_roster.append((name, div, nickname))
-                    elif gender_index == 1:
-                        men_roster.append((name, div, nickname))
-                page += 1
-
-    ufc_roster['men'] = men_roster
-    ufc_roster['women'] = women_roster
-
-    if save == 'yes':
-        if filetype == 'csv':
-            headers = ['Name', 'Division', 'Nickname']
-            with open('ufc-roster.csv', 'w', newline='') as csvfile:
-                init_writer = csv.writer(csvfile, delimiter=';')
-                init_writer.writerow(headers)
-            with open('ufc-roster.csv', 'a', newline='', encoding="ISO-8859-1") as csvfile:
-                writer = csv.writer(csvfile, delimiter=',')
-                for index in range(len(ufc_roster['men'])):
-                    try:
-                        writer.writerow([ufc_roster['men'][index][0], ufc_roster['men'][index][1],
-                                         ufc_roster['men'][index][2]])
-                    except UnicodeEncodeError:
-                        print(f'Unfortunately record containing {ufc_roster["men"][index]} '
-                              f'dropped due to UnicodeEncodeError!')
-                for index in range(len(ufc_roster['women'])):
-                    try:
-                        writer.writerow([ufc_roster['women'][index][0], ufc_roster['women'][index][1],
-                                         ufc_roster['women'][index][2]])
-                    except UnicodeEncodeError:
-                        print(f'Unfortunately record containing {ufc_roster["women"][index]} '
-                              f'dropped due to UnicodeEncodeError!')
-        elif filetype == 'json':
-            with open('ufc-roster.json', 'w') as fighter_json:
-                json.dump(ufc_roster, fighter_json, indent=4)
-    return ufc_roster
-
-
-def scrape_list_of_fighters(fighters_list, filename, filetype='csv'):
-    """
-    Scrapes information about list of fighters in sherdog's database and saves them into csv or json file.
-    :param fighters_list: list with fighters to be scrapped from sherdog, fighter list should contain tuple with
-           (name, weight-division, nickname) for each fighter
-    :param filename: string with name of the file we want to save data to; file will be created with given name
-    :param filetype: string with either 'csv' or 'json' as a type of file where results will be stored. Default is 'csv'
-    :return: None
-    """
-    
-    def search_fighter(fighter_tuple):
+    def average_fight_time(self, name=None):
         """
-        Nested function that creates response objects for fighter based on the information included in fighter's tuple.
-        :param fighter_tuple: tuple that contains (name, weight-division, nickname) for certain fighter.
-        :return: list of four response objects [1, 2, 3, 4].
-                 1 - based only on fighter's name
-                 2 - based on fighter's name and weight class
-                 3 - based on fighter's name and nickname
-                 4 - based on fighter's name, nickname and weight class
+        :param name: optional - string with fighter's name, or None for all fights
+        :return: float with average fight length in seconds, or None if there are no fights with known length
         """
-        res_1 = requests.get(f'https://www.sherdog.com/stats/fightfinder?SearchTxt={fighter_tuple[0]}')
-        res_2 = requests.get(f'https://www.sherdog.com/stats/fightfinder?SearchTxt={fighter_tuple[0]}'
-                             f'&weight={weight_classes[fighter_tuple[1]]}')
-        res_3 = requests.get(f'https://www.sherdog.com/stats/fightfinder?SearchTxt={fighter_tuple[0]}'
-                             f'+{fighter_tuple[2]}')
-        res_4 = requests.get(f'https://www.sherdog.com/stats/fightfinder?SearchTxt={fighter_tuple[0]}'
-                             f'+{fighter_tuple[2]}&weight={weight_classes[fighter_tuple[1]]}')
-
-        return [res_1, res_2, res_3, res_4]
+        seconds = self.fight_seconds()
+        if name is not None:
+            seconds = seconds[self.indexes['fighter'].get(self._code(name), [])]
+        seconds = seconds[seconds >= 0]
+        return float(seconds.mean()) if len(seconds) else None
 
-    def soup_selector(request):
+    def win_streaks(self):
         """
-        Nested function that makes setting up soup object and css selector for fighter instance more convenient.
-        :param request: response object
-        :return: css selector
+        Finds win streaks of all fighters at once. Fights of each fighter are ordered by date (fights on the same or
+        an unknown date keep Sherdog's order, latest first in the file).
+        :return: dictionary with 'longest' and 'current' -> array with streak of each fighter, indexed by fighter's
+                 code (position in self.names)
         """
-        soup = BeautifulSoup(request.text, features='html.parser')
-        css_selector = soup.select('body > div.container > div:nth-child(3) > div.col_left > section:nth-child(2) > '
-                                   'div > div.content.table > table')
-        return css_selector
+        longest = numpy.zeros(len(self.names), dtype=numpy.int32)
+        current = numpy.zeros(len(self.names), dtype=numpy.int32)
+        if not len(self):
+            return {'longest': longest, 'current': current}
+        order = numpy.lexsort((-numpy.arange(len(self)), self.date, self.fighter))
+        fighter = self.fighter[order]
+        won = self.result[order] == 0
+        position = numpy.arange(len(order))
+        first = numpy.concatenate(([True], fighter[1:] != fighter[:-1]))  # first fight of each fighter.
+        # position of the last fight that broke a streak: a lost (or drawn) fight itself, the position before first
+        # fight of a fighter otherwise; wins in a row up to each fight are the distance to it.
+        breaks = numpy.where(~won, position, numpy.where(first, position - 1, -1))
+        streak = position - numpy.maximum.accumulate(breaks)
+        starts = numpy.flatnonzero(first)
+        ends = numpy.concatenate((starts[1:], [len(order)])) - 1
+        longest[fighter[starts]] = numpy.maximum.reduceat(streak, starts)
+        current[fighter[starts]] = streak[ends]
+        return {'longest': longest, 'current': current}
 
-    def check_result(css_selector):
+    def win_streak(self, name):
         """
-        Nested function that makes checking for searching results based on css selector more convenient.
-        :param css_selector: css selector
-        :return: css selector's match, or IndexError if there is none
+        :param name: string with fighter's name
+        :return: tuple (longest win streak, current win streak) of the fighter
         """
-        try:
-            result = css_selector[0].find_all('a')
-            return result
-        except IndexError:
-            return IndexError
-
-    def create_fighter_instance(matching):
-        """
-        Nested function that makes creating and scraping fighter's instance object more convenient.
-        :param matching: css selector results
-        :return: None
-        """
-        fighter_page = matching[0]['href']
-        F = Fighter()
-        F.scrape_fighter(filetype, filename, fighter_page=fighter_page)
-
-    weight_classes = {
-        "Heavyweight": 2,
-        "Light Heavyweight": 3,
-        "Middleweight": 4,
-        "Welterweight": 5,
-        "Lightweight": 6,
-        "Featherweight": 7,
-        "Bantamweight": 9,
-        "Flyweight": 10,
-        "Women's Strawweight": 13,
-        "Women's Flyweight": 10,
-        "Women's Bantamweight": 9,
-        "Women's Featherweight": 7,
-    }
-
-    if filetype == 'csv':
-        headers = ['Fighter', 'Opponent', 'Result', 'Event', 'Event_date', 'Method', 'Referee', 'Round', 'Time']
-        with open(f'{filename}.csv', 'w', newline='') as csvfile:
-            init_writer = csv.writer(csvfile, delimiter=';')
-            init_writer.writerow(headers)
-
-    elif filetype == 'json':
-        json_init = {}
-        with open(f'{filename}.json', 'w') as fighter_json:
-            json.dump(json_init, fighter_json)
-
-    for fighter in fighters_list:
-        search_results = search_fighter(fighter)   # variable that stores different searching results.
-        find_fighter = search_results[0]           # assigning first result to variable.
-        selector = soup_selector(find_fighter)     # creating selector based on search result.
-        results = check_result(selector)           # checking if there is a valid outcome.
-        if results == IndexError:
-            logging.info(f'Error occurred with {fighter}, please check carefully '
-                         f'if there is no mistake in fighter name!')
-        else:
-            if len(results) == 1:
-                create_fighter_instance(results)         # creating Fighter's instance and saving it.
-            else:
-                find_fighter = search_results[1]         # assigning second result to variable.
-                selector = soup_selector(find_fighter)   # creating selector based on search result.
-                results = check_result(selector)         # checking if there is a valid outcome.
-                if results == IndexError:
-                    try:
-                        find_fighter = search_results[2]         # assigning third result to variable.
-                    except KeyError:
-                        print('Search engine tried to narrow down findings by using weight-class filter, apparently '
-                              'you have not specified weight-class data!')
-                    else:
-                        selector = soup_selector(find_fighter)   # creating selector based on search result.
-                        results = check_result(selector)         # checking if there is a valid outcome.
-                        if results == IndexError:
-                            logging.info(f'Error occured with {fighter}, please check carefully if there is no mistake '
-                                         f'in nickname!')
-                        else:
-                            if len(results) == 1:
-                                create_fighter_instance(results)  # creating Fighter's instance and saving it.
-                else:
-                    selector = soup_selector(find_fighter)        # creating selector based on search result.
-                    results = check_result(selector)              # checking if there is a valid outcome.
-                    if results == IndexError:
-                        logging.info(f'Error occured with {fighter}, please check carefully if there is no mistake '
-                                         f'in nickname!')
-                    else:
-                        if len(results) == 1:
-                            create_fighter_instance(results)      # creating Fighter's instance and saving it.
-                        else:
-                            try:
-                                find_fighter = search_results[2]  # assigning third result to variable.
-                            except KeyError:
-                                print(f'Search engine tried to narrow down findings by name & nickname, apparently this'
-                                      f'was not enough to find {fighter[0]}!')
-                            else:
-                                selector = soup_selector(find_fighter)  # creating selector based on search result.
-                                results = check_result(selector)        # checking if there is a valid outcome.
-                                if results == IndexError:
-                                    logging.info(f'Error occurred with {fighter}, please check carefully '
-                                                 f'- searching with name & nickname data was unsuccessful!')
-                                else:
-                                    if len(results) == 1:
-                                        create_fighter_instance(results)  # creating Fighter's instance and saving it.
-                                    else:
-                                        try:
-                                            find_fighter = search_results[3]  # assigning fourth result to variable.
-                                        except KeyError:
-                                            print(f'Search engine tried to narrow down findings by using all filters, '
-                                                  f'apparently this was not enough to find {fighter[0]}!')
-                                        else:
-                                            # creating selector based on search result.
-                                            selector = soup_selector(find_fighter)
-                                            # checking if there is a valid outcome.
-                                            results = check_result(selector)
-                                            if results == IndexError:
-                                                logging.info(f'Error occurred with {fighter}, please check carefully '
-                                                             f'- searching with all provided data was unsuccessful!')
-                                            else:
-                                                # creating Fighter's instance and saving it.
-                                                create_fighter_instance(results)
+        code = self._code(name)
+        streaks = self.win_streaks()
+        return int(streaks['longest'][code]), int(streaks['current'][code])
 
 
 def helper_read_fighters_from_csv(filename, delimiter=','):
@@ -675,7 +3901,7 @@ def helper_read_fighters_from_csv(filename, delimiter=','):
     :return: list of fighters, where each fighter is a tuple(name, weight-division, nickname)
     """
     fighters_list = []
-    with open(f'{filename}.csv', 'r') as csvFile:
+    with open(f'{filename}.csv', 'r', encoding='utf-8') as csvFile:
         reader = csv.reader(csvFile)
         next(reader, None)
         for row in reader:
@@ -685,12 +3911,63 @@ def helper_read_fighters_from_csv(filename, delimiter=','):
     return fighters_list
 
 
-if __name__ == '__main__':
-    scrape_all_fighters('sherdog')
-
-
-
-
+def main(arguments=None):
+    """
+    Command line entry point. With no arguments scrapes all fighters to sherdog.csv, subcommands run other crawls:
+        python sherdog-parser.py shard sherdog --shard 0 --shards 4   - one shard, e.g. on one of the hosts
+        python sherdog-parser.py merge sherdog --shards 4             - merges parts of finished shards
+        python sherdog-parser.py sharded sherdog --workers 4          - all shards as local processes, then merge
+        python sherdog-parser.py graph sherdog /fighter/Jose-Aldo-11506 - follows links between fighters from seeds
+        python sherdog-parser.py events sherdog /events/UFC-179-Aldo-vs-Mendes-2-39325 - whole cards of events
+    :param arguments: optional - list of strings with command line arguments, or None for sys.argv
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description='Sherdog & UFC scraper.')
+    commands = parser.add_subparsers(dest='command')
+    shard_command = commands.add_parser('shard', help='scrape a single shard of fighters indexes')
+    shard_command.add_argument('--shard', type=int, required=True)
+    shard_command.add_argument('--shards', type=int, required=True)
+    merge_command = commands.add_parser('merge', help='merge output parts of all shards')
+    merge_command.add_argument('--shards', type=int, required=True)
+    sharded_command = commands.add_parser('sharded', help='scrape all shards with local processes and merge them')
+    sharded_command.add_argument('--workers', type=int, default=4)
+    graph_command = commands.add_parser('graph', help='scrape fighters linked to seed fighters by their fights')
+    events_command = commands.add_parser('events', help='scrape whole cards from event pages')
+    for command in (shard_command, merge_command, sharded_command, graph_command, events_command):
+        command.add_argument('filename')
+    events_command.add_argument('event_pages', nargs='*', help='event or organization pages, none to discover events')
+    events_command.add_argument('--follow-links', action='store_true')
+    events_command.add_argument('--max-events', type=int, default=None)
+    graph_command.add_argument('seeds', nargs='+')
+    graph_command.add_argument('--max-fighters', type=int, default=None)
+    for command in (shard_command, sharded_command, graph_command, events_command):
+        command.add_argument('--concurrency', type=int, default=1)
+    for command in (shard_command, sharded_command):
+        command.add_argument('--by', choices=SHARD_MODES, default='modulus')
+        command.add_argument('--end', type=int, default=None)
+        command.add_argument('--resume', action='store_true')
+    for command in (merge_command, sharded_command, graph_command, events_command):
+        command.add_argument('--filetype', default='csv')
+    options = parser.parse_args(arguments)
 
+    if options.command == 'shard':
+        scrape_shard(options.filename, options.shard, options.shards, shard_by=options.by, end=options.end,
+                     concurrency=options.concurrency, resume=options.resume)
+    elif options.command == 'merge':
+        merge_shards(options.filename, options.shards, filetype=options.filetype)
+    elif options.command == 'sharded':
+        scrape_sharded(options.filename, workers=options.workers, filetype=options.filetype, shard_by=options.by,
+                       end=options.end, concurrency=options.concurrency, resume=options.resume)
+    elif options.command == 'graph':
+        crawl_fighter_graph(options.seeds, options.filename, filetype=options.filetype,
+                            concurrency=options.concurrency, max_fighters=options.max_fighters)
+    elif options.command == 'events':
+        scrape_events(options.event_pages or None, options.filename, filetype=options.filetype,
+                      concurrency=options.concurrency, follow_links=options.follow_links or None,
+                      max_events=options.max_events)
+    else:
+        scrape_all_fighters('sherdog')
 
 
+if __name__ == '__main__':
+    main()
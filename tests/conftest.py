@@ -0,0 +1,37 @@
+# Python 3.7
+# Shared fixtures of the test suite - scraper module and a local stub server serving pages from fixtures directory,
+# so tests need no network access.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def parser(tmp_path_factory):
+    """
+    :return: sherdog-parser.py imported as a module; its log file is kept out of the working directory
+    """
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('log'))
+    try:
+        return benchmark.load_parser()
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture(scope='session')
+def stub(parser):
+    """
+    :return: StubServer instance the scraper is pointed at, running for the whole session
+    """
+    server = benchmark.StubServer(fighters=40, latency=0)
+    parser.SHERDOG_URL = server.start()
+    yield server
+    server.stop()
+
@@ -0,0 +1,50 @@
+from benchmark import quiet
+
+
+def fight(parser, opponent, result, event='UFC 214', date='Jul / 29 / 2017'):
+    return parser.FightRecord(opponent, result, event, date, 'KO (Head Kick)', 'John McCarthy', '3', '3:01')
+
+
+def test_same_bout_from_both_profiles_is_kept_once(parser):
+    index = parser.BoutIndex()
+    assert index.add('Jon Jones', fight(parser, 'Daniel Cormier', 'win')) is not None
+    assert index.add('daniel  cormier', fight(parser, 'Jon Jones', 'loss', event='ufc 214')) is None
+    assert len(index) == 1
+
+
+def test_rematches_are_separate_bouts(parser):
+    index = parser.BoutIndex()
+    index.add('Jon Jones', fight(parser, 'Daniel Cormier', 'win'))
+    index.add('Jon Jones', fight(parser, 'Daniel Cormier', 'win', event='UFC 182', date='Jan / 03 / 2015'))
+    assert len(index) == 2
+
+
+def test_bout_is_stored_in_name_order_with_flipped_result(parser):
+    index = parser.BoutIndex()
+    bout = index.add('Jon Jones', fight(parser, 'Daniel Cormier', 'win'))
+    assert bout.fighters == ('Daniel Cormier', 'Jon Jones')
+    assert bout.result == 'loss'
+    assert bout.as_row()[:3] == ['Daniel Cormier', 'Jon Jones', 'loss']
+
+
+def test_fighter_view_flips_result_to_fighters_side(parser):
+    index = parser.BoutIndex()
+    index.add('Jon Jones', fight(parser, 'Daniel Cormier', 'win'))
+    index.add('Jon Jones', fight(parser, 'Alexander Gustafsson', 'draw', event='UFC 165'))
+    cormier = index.fighter_view('daniel cormier')
+    assert [(record.opponent, record.result) for record in cormier] == [('Jon Jones', 'loss')]
+    jones = index.fighter_view('Jon Jones')
+    assert [(record.opponent, record.result) for record in jones] == [('Daniel Cormier', 'win'),
+                                                                      ('Alexander Gustafsson', 'draw')]
+    assert index.fighter_view('Nobody') == []
+
+
+def test_bouts_file_has_every_bout_once(parser, stub, tmp_path):
+    filename = str(tmp_path / 'fighters')
+    with quiet():
+        parser.scrape_all_fighters(filename, filetype='bouts')
+        with parser.open_sink(filename, 'bouts', mode='a') as sink:
+            known = len(sink.index)
+    with open(filename + '.bouts.csv', encoding='utf-8') as bouts:
+        rows = bouts.read().splitlines()[1:]
+    assert known == len(rows) == len(set(rows))
@@ -0,0 +1,56 @@
+import os
+
+
+def page(parser, fighter_index):
+    return f'{parser.SHERDOG_URL}/fighter/index?id={fighter_index}.'
+
+
+def test_stale_page_is_revalidated(parser, stub, tmp_path):
+    cache = parser.ResponseCache(str(tmp_path / 'cache'), ttl=0)
+    transport = parser.Transport(cache=cache)
+    downloaded = transport.get(page(parser, 1))
+    not_modified = stub.not_modified
+    revalidated = transport.get(page(parser, 1))
+    assert stub.not_modified == not_modified + 1
+    assert revalidated.from_cache and revalidated.content == downloaded.content
+    assert cache.stats()['misses'] == 1 and cache.stats()['revalidated'] == 1
+
+
+def test_fresh_page_is_served_without_request(parser, stub, tmp_path):
+    cache = parser.ResponseCache(str(tmp_path / 'cache'))
+    transport = parser.Transport(cache=cache)
+    transport.get(page(parser, 1))
+    assert transport.get(page(parser, 1)).from_cache
+    assert transport.requests == 1 and cache.stats()['hits'] == 1
+
+
+def test_least_recently_used_pages_are_evicted(parser, stub, tmp_path):
+    cache = parser.ResponseCache(str(tmp_path / 'cache'), max_bytes=5000)
+    transport = parser.Transport(cache=cache)
+    for fighter_index in range(5):
+        transport.get(page(parser, fighter_index))
+    stats = cache.stats()
+    assert stats['evictions'] > 0 and stats['bytes'] <= 5000
+    assert transport.get(page(parser, 4)).from_cache  # latest page is still stored.
+    assert len(os.listdir(tmp_path / 'cache' / 'entries')) == stats['entries']
+
+
+def test_missing_body_is_downloaded_again(parser, stub, tmp_path):
+    cache = parser.ResponseCache(str(tmp_path / 'cache'))
+    transport = parser.Transport(cache=cache)
+    downloaded = transport.get(page(parser, 1))
+    for body in os.listdir(tmp_path / 'cache' / 'bodies'):  # evicted by another thread after lookup.
+        os.remove(tmp_path / 'cache' / 'bodies' / body)
+    again = transport.get(page(parser, 1))
+    assert not getattr(again, 'from_cache', False) and again.content == downloaded.content
+    assert cache.stats()['misses'] == 2 and cache.stats()['hits'] == 0
+
+
+def test_refresh_does_not_store_evicted_entry(parser, stub, tmp_path):
+    cache = parser.ResponseCache(str(tmp_path / 'cache'), max_bytes=1)
+    transport = parser.Transport(cache=cache)
+    transport.get(page(parser, 1))
+    entry = cache.lookup(page(parser, 1))
+    transport.get(page(parser, 2))  # evicts the first page.
+    assert not cache.refresh(entry)
+    assert not os.path.exists(cache._entry_path(entry['key']))
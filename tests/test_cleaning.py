@@ -0,0 +1,67 @@
+import csv
+import random
+import re
+
+import pytest
+
+import regex
+from benchmark import quiet
+from csv_cleaner import clean_field, clean_row
+
+
+def regex_clean_field(field):
+    """
+    Field cleaning of regex.py before it was streamed, kept as the reference.
+    """
+    subbed = re.sub(r'(?!(([^"]*"){2})*[^"]*$),', '', field)
+    return subbed.replace('"', '').replace('-', '')
+
+
+def regex_clean_row(row):
+    if len(row) == 1:
+        return regex_clean_field(row[0]).split(',')
+    return [regex_clean_field(word) for word in row]
+
+
+@pytest.mark.parametrize('field', [
+    '', 'plain', 'Jul / 29 / 2017', 'KO (Punch)', 'UFC 214 - Cormier vs. Jones 2', '"UFC 1, The Beginning"',
+    'a,"b,c",d', '"a, ""b"", c-d"', '"unclosed, quote', '","', '""', 'x"y,z"w,v"', 'a,b,c',
+])
+def test_clean_field_matches_regex(field):
+    assert clean_field(field) == regex_clean_field(field)
+
+
+def test_clean_field_matches_regex_on_random_fields():
+    generator = random.Random(1)
+    for _ in range(5000):
+        field = ''.join(generator.choice('ab,"- ') for _ in range(generator.randint(0, 14)))
+        assert clean_field(field) == regex_clean_field(field), field
+
+
+def test_clean_row_splits_single_field_rows():
+    for row in (['"UFC 1, The Beginning",x,y'], ['a', '"b,c"', 'd-e']):
+        assert clean_row(row) == regex_clean_row(row)
+
+
+def test_clean_csv_matches_regex(parser, stub, tmp_path):
+    filename = str(tmp_path / 'sherdog')
+    with quiet():
+        parser.scrape_all_fighters(filename)
+    with open(filename + '.csv', 'a', encoding='utf-8') as output:
+        output.write('"a, ""b"", c-d"\n"x","y,z"\n')
+    with open(filename + '.csv', newline='', encoding='utf-8') as source:
+        expected = [regex_clean_row(row) for row in csv.reader(source)]
+    rows = regex.clean_csv(filename + '.csv', str(tmp_path / 'subbed.csv'))
+    with open(tmp_path / 'subbed.csv', newline='', encoding='utf-8') as target:
+        assert list(csv.reader(target, delimiter=';')) == expected
+    assert rows == len(expected)
+
+
+def test_sanitized_crawl_matches_clean_csv(parser, stub, tmp_path):
+    raw, sanitized = str(tmp_path / 'raw'), str(tmp_path / 'sanitized')
+    with quiet():
+        parser.scrape_all_fighters(raw)
+        parser.scrape_all_fighters(sanitized, sanitize=True)
+    regex.clean_csv(raw + '.csv', str(tmp_path / 'subbed.csv'))
+    with open(sanitized + '.csv', 'rb') as crawled, open(tmp_path / 'subbed.csv', 'rb') as cleaned:
+        assert crawled.read() == cleaned.read()
@@ -0,0 +1,50 @@
+import csv
+import datetime
+
+import pytest
+
+from benchmark import quiet
+
+pyarrow = pytest.importorskip('pyarrow')
+import pyarrow.ipc  # noqa: E402
+import pyarrow.parquet  # noqa: E402
+
+
+def read_table(path, filetype):
+    """
+    :return: pyarrow Table with all batches of columnar output
+    """
+    if filetype == 'parquet':
+        return pyarrow.parquet.read_table(path)
+    with pyarrow.ipc.open_stream(path) as reader:
+        return reader.read_all()
+
+
+def typed(row):
+    """
+    :return: dictionary with csv row converted to types of columnar output
+    """
+    minutes, seconds = row['Time'].split(':')
+    return dict(row, Event_date=datetime.datetime.strptime(row['Event_date'], '%b / %d / %Y').date(),
+                Round=int(row['Round']), Time=int(minutes) * 60 + int(seconds))
+
+
+@pytest.mark.parametrize('filetype', ['parquet', 'arrow'])
+def test_columnar_output_has_typed_columns_of_csv_rows(parser, stub, tmp_path, filetype):
+    filename = str(tmp_path / 'fighters')
+    with quiet():
+        parser.scrape_all_fighters(filename)
+        parser.scrape_all_fighters(filename, filetype=filetype, checkpoint_every=7)
+    table = read_table(f'{filename}.{parser.COLUMNAR_FILETYPES[filetype]}', filetype)
+    types = {field.name: field.type for field in table.schema}
+    assert types['Event_date'] == pyarrow.date32()
+    assert types['Round'] == pyarrow.int8() and types['Time'] == pyarrow.int16()
+    for column in ('Result', 'Event', 'Method', 'Referee'):
+        assert pyarrow.types.is_dictionary(types[column])
+    with open(filename + '.csv', newline='', encoding='utf-8') as source:
+        assert table.to_pylist() == [typed(row) for row in csv.DictReader(source)]
+
+
+def test_columnar_output_can_not_be_resumed(parser, tmp_path):
+    with pytest.raises(ValueError):
+        parser.ColumnarWriter(str(tmp_path / 'fighters'), mode='a')
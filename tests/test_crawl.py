@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from benchmark import quiet
+
+CRASH_AT = 23  # fighter save that fails in a crashed crawl
+
+
+def read(path):
+    with open(path, 'rb') as output:
+        return output.read()
+
+
+def output_path(parser, filename, filetype):
+    """
+    :return: path of the file a finished crawl leaves behind (json sink writes to a .part file until it is closed)
+    """
+    return f'{filename}.json' if filetype == 'json' else f'{filename}.{parser.SINKS[filetype].extension}'
+
+
+def crash_on_save(parser, monkeypatch):
+    """
+    Makes the crawl fail in the middle of saving a fighter, after a partial record already reached the file.
+    """
+    save = parser.Fighter.save
+    calls = []
+
+    def failing_save(fighter, sink):
+        calls.append(fighter.index)
+        if len(calls) == CRASH_AT:
+            sink.flush()
+            with open(sink.path, 'a', encoding='utf-8') as output:  # json sink: its .part file.
+                output.write('partial record')
+            raise RuntimeError('crash')
+        return save(fighter, sink)
+
+    monkeypatch.setattr(parser.Fighter, 'save', failing_save)
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+@pytest.mark.parametrize('filetype', ['csv', 'jsonl', 'json', 'bouts', 'names'])
+def test_resume_after_crash_is_byte_identical(parser, stub, tmp_path, monkeypatch, filetype, concurrency):
+    full, crashed = str(tmp_path / 'full'), str(tmp_path / 'crashed')
+    with quiet():
+        parser.scrape_all_fighters(full, filetype=filetype)
+    with monkeypatch.context() as patch:
+        crash_on_save(parser, patch)
+        with pytest.raises(RuntimeError), quiet():
+            parser.scrape_all_fighters(crashed, filetype=filetype, concurrency=concurrency, checkpoint_every=5)
+    assert not parser.read_checkpoint(crashed)['finished']
+    with quiet():
+        parser.scrape_all_fighters(crashed, filetype=filetype, concurrency=concurrency, resume=True,
+                                   checkpoint_every=5)
+    assert read(output_path(parser, crashed, filetype)) == read(output_path(parser, full, filetype))
+    assert parser.read_checkpoint(crashed)['finished']
+
+
+def test_resume_of_finished_crawl_keeps_output(parser, stub, tmp_path):
+    filename = str(tmp_path / 'fighters')
+    with quiet():
+        parser.scrape_all_fighters(filename)
+    before = read(filename + '.csv')
+    with quiet():
+        parser.scrape_all_fighters(filename, resume=True)
+    assert read(filename + '.csv') == before
+
+
+@pytest.mark.parametrize('shard_by', ['modulus', 'range'])
+def test_merged_shards_match_single_crawl(parser, stub, tmp_path, shard_by):
+    full, sharded = str(tmp_path / 'full'), str(tmp_path / 'sharded')
+    with quiet():
+        parser.scrape_all_fighters(full)
+        for shard in range(3):
+            parser.scrape_shard(sharded, shard, 3, shard_by=shard_by, end=stub.fighters)
+        parser.merge_shards(sharded, 3)
+    assert read(sharded + '.csv') == read(full + '.csv')
+
+
+def test_merge_orders_by_index_and_drops_duplicates(parser, stub, tmp_path):
+    full, merged = str(tmp_path / 'full'), str(tmp_path / 'merged')
+    with quiet():
+        parser.scrape_shard(full, 0, 1)
+    records = list(parser.read_shard(f'{parser.shard_filename(full, 0, 1)}.{parser.ShardSink.extension}'))
+    assert [record['index'] for record in records] == sorted(record['index'] for record in records)
+    parts = (records[1::2], records[::2], records[::3])  # every record is in one part at least, some in two.
+    for shard, part in enumerate(parts):
+        path = f'{parser.shard_filename(merged, shard, len(parts))}.{parser.ShardSink.extension}'
+        with open(path, 'w', encoding='utf-8') as output:
+            output.writelines(json.dumps(record) + '\n' for record in sorted(part, key=lambda r: r['index']))
+    with quiet():
+        saved = parser.merge_shards(merged, len(parts), filetype='jsonl')
+    with open(merged + '.jsonl', encoding='utf-8') as output:
+        names = [name for line in output for name in json.loads(line)]
+    assert saved == len(records)
+    assert names == [record['name'] for record in records]
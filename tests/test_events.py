@@ -0,0 +1,51 @@
+import csv
+
+from benchmark import quiet
+
+
+def saved_events(path):
+    """
+    :return: dictionary with event name -> number of fight rows saved for it
+    """
+    events = {}
+    with open(path, encoding='utf-8', newline='') as output:
+        for row in csv.DictReader(output):
+            events[row['Event']] = events.get(row['Event'], 0) + 1
+    return events
+
+
+def test_events_are_discovered_without_event_pages(parser, stub, tmp_path):
+    filename = str(tmp_path / 'events')
+    with quiet():
+        bouts = parser.scrape_events(filename=filename, concurrency=2)
+    events = saved_events(filename + '.csv')
+    assert sorted(events) == sorted(f'UFC {number} - Swanson vs. Aldo' for number in range(1, stub.events + 1))
+    assert len(set(events.values())) == 1  # every event is saved once.
+    assert bouts * 2 == sum(events.values())
+
+
+def test_previous_and_next_events_are_followed_from_a_single_event(parser, stub, tmp_path):
+    filename = str(tmp_path / 'events')
+    requests = stub.requests
+    with quiet():
+        parser.scrape_events(['/events/UFC-3-Swanson-vs-Aldo-3'], filename, follow_links=True,
+                             fill_from_profiles=False)
+    events = saved_events(filename + '.csv')
+    assert len(events) == stub.events and len(set(events.values())) == 1
+    # every event once, both edge links (404), and both listing pages.
+    assert stub.requests - requests == stub.events + 2 + 2
+
+
+def test_event_pages_are_not_followed_by_default(parser, stub, tmp_path):
+    filename = str(tmp_path / 'events')
+    pages = ['/events/UFC-3-Swanson-vs-Aldo-3', '/events/UFC-2-Swanson-vs-Aldo-2', '/events/UFC-3-Swanson-vs-Aldo-3']
+    with quiet():
+        parser.scrape_events(pages, filename)
+    assert sorted(saved_events(filename + '.csv')) == ['UFC 2 - Swanson vs. Aldo', 'UFC 3 - Swanson vs. Aldo']
+
+
+def test_max_events_limits_discovery(parser, stub, tmp_path):
+    filename = str(tmp_path / 'events')
+    with quiet():
+        parser.scrape_events(filename=filename, max_events=3)
+    assert sorted(saved_events(filename + '.csv')) == [f'UFC {number} - Swanson vs. Aldo' for number in (4, 5, 6)]
@@ -0,0 +1,22 @@
+import pytest
+
+import benchmark
+
+
+@pytest.fixture(params=['html.parser', 'lxml', 'stream'])
+def backend(parser, request):
+    """
+    :return: string with parser backend used for a single test
+    """
+    previous = parser.PARSER_BACKEND
+    parser.set_parser_backend(request.param)
+    yield request.param
+    parser.set_parser_backend(previous)
+
+
+def test_unlinked_opponent_keeps_cell_text(parser, backend):
+    page = benchmark.read_fixture('fighter_short.html').decode('utf-8')
+    page = page.replace('<a href="/fighter/Tony-Lopez-1021">Tony Lopez</a>', 'Tony Lopez')
+    _, fights, _, _ = parser.extract_page(page)[0]
+    opponents = [fight[parser.FightRecord.__slots__.index('opponent')] for fight in fights]
+    assert opponents[:2] == ['Tony Lopez', 'Joey Villasenor']
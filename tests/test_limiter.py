@@ -0,0 +1,63 @@
+import pytest
+
+import benchmark
+from benchmark import quiet
+
+
+def answer(limiter, status_code, latency=0.01):
+    limiter.acquire()
+    limiter.release(status_code, latency)
+
+
+def test_throttled_response_cuts_concurrency_and_rate_once_per_round_trip(parser):
+    limiter = parser.HostLimiter(rate=100.0, burst=100, initial_concurrency=8)
+    answer(limiter, 429, latency=1.0)
+    assert limiter.limit == 4 and limiter.bucket.rate == 50
+    answer(limiter, 429, latency=1.0)  # sent together with the first one, so it is not counted again.
+    assert limiter.limit == 4 and limiter.bucket.rate == 50
+    assert limiter.overloads == 2
+
+
+def test_server_errors_cut_concurrency_but_not_rate(parser):
+    limiter = parser.HostLimiter(rate=100.0, burst=100, initial_concurrency=8)
+    answer(limiter, 503)
+    assert limiter.limit == 4 and limiter.bucket.rate == 100
+
+
+def test_healthy_responses_ramp_up_to_limits(parser):
+    limiter = parser.HostLimiter(rate=100.0, burst=1000, initial_concurrency=1, max_concurrency=4)
+    answer(limiter, 429)
+    for _ in range(200):
+        answer(limiter, 200)
+    assert limiter.limit == 4 and 50 < limiter.bucket.rate < 100  # rate grows back by about one request per second.
+
+
+def test_limiter_is_kept_per_host(parser):
+    limiter = parser.RateLimiter(rate=10.0)
+    assert limiter.host('http://a.test/fighter/1') is limiter.host('http://a.test/events')
+    assert limiter.host('http://a.test/') is not limiter.host('http://b.test/')
+
+
+@pytest.fixture
+def throttling(parser, monkeypatch):
+    """
+    :return: StubServer instance answering 429 over 10 requests per second, with the crawl sent through a limiter
+    """
+    server = benchmark.StubServer(fighters=10, latency=0, rate_limit=10)
+    monkeypatch.setattr(parser, 'SHERDOG_URL', server.start())
+    parser.configure_transport(backoff=0.1)
+    yield server
+    parser.configure_transport()
+    server.stop()
+
+
+def test_crawl_backs_off_throttling_host(parser, throttling, tmp_path):
+    with quiet():
+        parser.scrape_all_fighters(str(tmp_path / 'unlimited'), concurrency=8)
+    limiter = parser.configure_rate_limit(rate=40.0, burst=10, initial_concurrency=8)
+    with quiet():
+        parser.scrape_all_fighters(str(tmp_path / 'limited'), concurrency=8)
+    (host,) = limiter.stats().values()  # stub server is the only host.
+    assert host['overloads'] > 0 and host['rate'] < 40.0
+    with open(tmp_path / 'unlimited.csv', 'rb') as unlimited, open(tmp_path / 'limited.csv', 'rb') as limited:
+        assert limited.read() == unlimited.read()
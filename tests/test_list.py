@@ -0,0 +1,34 @@
+from benchmark import quiet
+
+FIGHTERS = [(f'Tony Galindo {number}', 'Welterweight', 'NA') for number in range(12)] + \
+    [('Multi Fighter', 'Lightweight', 'NA'), ('Unknown Fighter', 'Lightweight', 'NA')]
+
+
+def test_concurrent_list_keeps_order(parser, stub, tmp_path):
+    sequential, concurrent = str(tmp_path / 'sequential'), str(tmp_path / 'concurrent')
+    with quiet():
+        parser.scrape_list_of_fighters(FIGHTERS, sequential)
+        parser.scrape_list_of_fighters(FIGHTERS, concurrent, concurrency=4)
+    with open(sequential + '.csv', 'rb') as expected, open(concurrent + '.csv', 'rb') as output:
+        rows = expected.read()
+        assert output.read() == rows
+    assert rows.count(b'\n') > len(FIGHTERS)
+
+
+def test_search_cache_is_bounded(parser, stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(parser, 'SEARCH_CACHE_SIZE', 3)
+    parser._search_cache.clear()
+    with quiet():
+        parser.scrape_list_of_fighters(FIGHTERS, str(tmp_path / 'fighters'), concurrency=2)
+    assert len(parser._search_cache) == 3
+
+
+def test_only_successful_searches_are_cached(parser, stub):
+    parser._search_cache.clear()
+    found = f'{parser.SHERDOG_URL}/stats/fightfinder?SearchTxt=Tony+Galindo'
+    not_found = f'{parser.SHERDOG_URL}/stats/fightfinder?SearchTxt=Unknown+Fighter'
+    failed = f'{parser.SHERDOG_URL}/stats/missing?SearchTxt=Tony+Galindo'  # answered with 404.
+    assert parser.search_fightfinder(found)
+    assert parser.search_fightfinder(not_found) is IndexError
+    assert parser.search_fightfinder(failed) is IndexError
+    assert list(parser._search_cache) == [found]
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from benchmark import quiet
+
+
+@pytest.fixture
+def crawl(parser, stub, tmp_path):
+    """
+    :return: function crawling stub server with metrics exported to a file, returning number of csv rows written
+    """
+    def crawl(export_path, export_format):
+        parser.configure_metrics(export_path=str(export_path), export_format=export_format, interval=3600)
+        try:
+            with quiet():
+                parser.scrape_all_fighters(str(tmp_path / 'fighters'))
+        finally:
+            parser.configure_metrics(enabled=False)  # stops exporter after its final export.
+        with open(tmp_path / 'fighters.csv', encoding='utf-8') as output:
+            return len(output.read().splitlines()) - 1
+    return crawl
+
+
+def test_json_export_has_counters_and_stage_histograms(crawl, tmp_path):
+    rows = crawl(tmp_path / 'metrics.json', 'json')
+    with open(tmp_path / 'metrics.json', encoding='utf-8') as export:
+        snapshot = json.load(export)
+    counters = snapshot['counters']
+    assert {'labels': {'filetype': 'csv'}, 'value': rows} in counters['rows_written']
+    assert counters['bytes_fetched'][0]['value'] > 0
+    assert {sample['labels']['status'] for sample in snapshot['counters']['http_responses']} == {'200'}
+    for stage in ('fetch', 'parse', 'extract', 'validate', 'save'):
+        histogram = snapshot['histograms'][stage]
+        assert histogram['count'] > 0 and histogram['buckets']['+Inf'] == histogram['count']
+
+
+def test_prometheus_export_is_text_exposition_format(crawl, tmp_path):
+    rows = crawl(tmp_path / 'metrics.prom', 'prometheus')
+    with open(tmp_path / 'metrics.prom', encoding='utf-8') as export:
+        lines = export.read().splitlines()
+    assert '# TYPE sherdog_rows_written_total counter' in lines
+    assert f'sherdog_rows_written_total{{filetype="csv"}} {rows}' in lines
+    assert '# TYPE sherdog_stage_seconds histogram' in lines
+    assert any(line.startswith('sherdog_stage_seconds_count{stage="save"} ') for line in lines)
+    assert not (tmp_path / 'metrics.prom.tmp').exists()
+
+
+def test_disabled_metrics_record_nothing(parser, stub, tmp_path):
+    metrics = parser.get_metrics()
+    assert not metrics.enabled
+    with quiet():
+        parser.scrape_all_fighters(str(tmp_path / 'fighters'))
+    snapshot = metrics.snapshot()
+    assert snapshot['counters'] == {} and snapshot['histograms'] == {}
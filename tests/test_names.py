@@ -0,0 +1,70 @@
+import pytest
+
+from benchmark import quiet
+
+
+@pytest.fixture
+def index(parser):
+    names = parser.NameIndex()
+    names.add('/fighter/Jon-Jones-27944', 'Jon Jones', 'Bones', 'Light Heavyweight')
+    names.add('/fighter/Jon-Jones-2', 'Jon Jones', 'Other', 'Welterweight')
+    names.add('/fighter/Jon-Jones-3', 'Jon Jones', 'Third', 'Welterweight')
+    names.add('/fighter/Alex-Perez-75178', 'Alex Perez', 'NA', 'Flyweight')
+    names.add('/fighter/Jose-Aldo-11506', 'José Aldo', 'Scarface', 'Bantamweight')
+    names.add('/fighter/Joanna-Jedrzejczyk-101411', 'Joanna Jedrzejczyk', 'JJ', 'Strawweight')
+    names.add('/fighter/Unknown-Weight-1', 'Unknown Weight', 'NA', None)
+    return names
+
+
+def test_exact_name_is_resolved(index):
+    assert index.resolve('Jose Aldo') == '/fighter/Jose-Aldo-11506'
+    assert index.resolve('jose  aldo', 'Bantamweight') == '/fighter/Jose-Aldo-11506'
+    assert index.resolve('Joanna Jedrzejczyk', "Women's Strawweight") == '/fighter/Joanna-Jedrzejczyk-101411'
+
+
+def test_near_miss_name_is_not_resolved(index):
+    assert index.resolve('Jan Jones', 'Light Heavyweight') is None
+    assert index.resolve('Joana Jedrzejczyk') is None
+    assert index.resolve('Alex Pereira') is None
+    assert '/fighter/Alex-Perez-75178' in index.similar('Alex Pereira')
+
+
+def test_division_conflict_is_not_resolved(index):
+    assert index.resolve('Alex Perez', 'Light Heavyweight') is None
+    assert index.resolve('Alex Perez', 'Flyweight') == '/fighter/Alex-Perez-75178'
+    assert index.resolve('Unknown Weight', 'Heavyweight') == '/fighter/Unknown-Weight-1'
+
+
+def test_namesakes_are_narrowed_by_division_and_nickname(index):
+    assert index.resolve('Jon Jones') is None
+    assert index.resolve('Jon Jones', 'Light Heavyweight') == '/fighter/Jon-Jones-27944'
+    assert index.resolve('Jon Jones', 'Welterweight') is None
+    assert index.resolve('Jon Jones', 'Welterweight', '"Third"') == '/fighter/Jon-Jones-3'
+
+
+@pytest.mark.parametrize('filetype', ['names', 'csv', 'sqlite'])
+def test_names_file_is_loaded(parser, stub, tmp_path, filetype):
+    filename = str(tmp_path / 'fighters')
+    with quiet():
+        parser.scrape_all_fighters(filename, filetype=filetype)
+    with open(f'{filename}.names.jsonl', 'a', encoding='utf-8') as names_file:
+        names_file.write('{"url": "/fighter/Cut-')  # last line of a crashed crawl.
+    index = parser.NameIndex.load(filename)
+    assert len(index) > 0
+    assert index.resolve('Tony Galindo 1') is not None
+    assert index.resolve('Tony Galindoo 1') is None
+
+
+@pytest.mark.parametrize('fighter, requests', [
+    (('Jon Jones', 'Light Heavyweight', 'Bones'), 1),  # resolved offline, only the profile is fetched.
+    (('Jan Jones', 'Light Heavyweight', 'NA'), 2),  # near miss, fightfinder is searched.
+    (('Alex Perez', 'Light Heavyweight', 'NA'), 2),  # division conflict, fightfinder is searched.
+])
+def test_unresolved_fighters_fall_back_to_fightfinder(parser, stub, tmp_path, index, fighter, requests):
+    parser._search_cache.clear()
+    stub.requests = 0
+    with quiet():
+        parser.scrape_list_of_fighters([fighter], str(tmp_path / 'fighters'), name_index=index)
+    assert stub.requests == requests
+    with open(tmp_path / 'fighters.csv', encoding='utf-8') as output:
+        assert len(output.read().splitlines()) > 1
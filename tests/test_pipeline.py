@@ -0,0 +1,30 @@
+import pytest
+
+from benchmark import quiet
+
+
+@pytest.fixture
+def metrics(parser):
+    """
+    :return: shared Metrics instance recording for a single test
+    """
+    yield parser.configure_metrics()
+    parser.configure_metrics(enabled=False)
+
+
+@pytest.mark.parametrize('filetype', ['csv', 'json'])
+def test_pipeline_output_matches_sequential_crawl(parser, stub, tmp_path, filetype):
+    sequential, pipeline = str(tmp_path / 'sequential'), str(tmp_path / 'pipeline')
+    with quiet():
+        parser.scrape_all_fighters(sequential, filetype=filetype)
+        parser.scrape_all_fighters(pipeline, filetype=filetype, concurrency=4, parse_workers=2)
+    with open(f'{sequential}.{filetype}', 'rb') as expected, open(f'{pipeline}.{filetype}', 'rb') as crawled:
+        assert crawled.read() == expected.read()
+
+
+def test_pipeline_records_worker_timings(parser, stub, tmp_path, metrics):
+    with quiet():
+        parser.scrape_all_fighters(str(tmp_path / 'pipeline'), concurrency=4, parse_workers=2)
+    histograms = metrics.snapshot()['histograms']
+    assert histograms['parse']['count'] == histograms['extract']['count'] >= stub.fighters
+    assert histograms['parse']['sum'] > 0
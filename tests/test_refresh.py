@@ -0,0 +1,66 @@
+import re
+
+import pytest
+
+import benchmark
+from benchmark import quiet
+
+
+@pytest.fixture
+def server(parser, monkeypatch):
+    """
+    :return: StubServer instance of a single test, so its pages can be changed between refreshes
+    """
+    server = benchmark.StubServer(fighters=20, latency=0)
+    monkeypatch.setattr(parser, 'SHERDOG_URL', server.start())
+    yield server
+    server.stop()
+
+
+def refresh(parser, tmp_path, name, **kwargs):
+    """
+    :return: tuple (refresh result, list of csv rows of fights it saved)
+    """
+    with quiet():
+        result = parser.refresh_fighters(str(tmp_path / name), fingerprints=str(tmp_path / 'fingerprints'), **kwargs)
+    with open(tmp_path / f'{name}.csv', encoding='utf-8') as output:
+        return result, output.read().splitlines()[1:]
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_unchanged_fighters_are_revalidated_with_conditional_requests(parser, server, tmp_path, concurrency):
+    first, rows = refresh(parser, tmp_path, 'first', concurrency=concurrency)
+    assert first['changed'] > 0 and first['unchanged'] == 0
+    assert rows
+    second, rows = refresh(parser, tmp_path, 'second', concurrency=concurrency)
+    assert second == {'unchanged': first['changed'], 'changed': 0}
+    assert server.not_modified == first['changed']
+    assert rows == []
+
+
+def test_only_new_fights_are_saved(parser, server, tmp_path):
+    full_page = server.fighter_page_at(1)
+    older_page = re.sub(rb'<tr class="even">.*?</tr>', b'', full_page, count=1, flags=re.S)  # before latest fight.
+    fighter_page_at = server.fighter_page_at
+    server.fighter_page_at = lambda fighter_index: older_page if fighter_index == 1 else fighter_page_at(fighter_index)
+    refresh(parser, tmp_path, 'first')
+    del server.fighter_page_at
+    second, rows = refresh(parser, tmp_path, 'second')
+    assert second['changed'] == 1
+    assert len(rows) == 1 and rows[0].startswith('Tony Galindo 1,')
+
+
+def test_deleted_known_fighters_do_not_end_probing_for_new_ones(parser, server, tmp_path):
+    refresh(parser, tmp_path, 'first')
+    route = server.route
+
+    def deleting_route(path, query):
+        if path == '/fighter/index' and 5 <= int(query['id'][0].rstrip('.')) < 20:
+            return 200, server.empty_page  # more known fighters in a row than MAX_FAILS are gone.
+        return route(path, query)
+
+    server.route = deleting_route
+    server.fighters = 25
+    second, rows = refresh(parser, tmp_path, 'second')
+    assert second['changed'] == 4
+    assert sorted({row.split(',')[0] for row in rows}) == [f'Tony Galindo {index}' for index in range(21, 25)]
@@ -0,0 +1,50 @@
+import pytest
+
+from benchmark import quiet
+
+
+@pytest.fixture
+def scrapes(parser, stub, monkeypatch):
+    """
+    :return: list collecting one item for every roster scraped from stub server
+    """
+    scrapes = []
+    scrape_ufc_roster = parser.scrape_ufc_roster
+
+    def counting_scrape(*args, **kwargs):
+        scrapes.append(args)
+        with quiet():
+            return scrape_ufc_roster(*args, **kwargs)
+
+    monkeypatch.setattr(parser, 'UFC_URL', parser.SHERDOG_URL)
+    monkeypatch.setattr(parser, 'scrape_ufc_roster', counting_scrape)
+    monkeypatch.setattr(parser, '_roster_snapshots', {})
+    return scrapes
+
+
+def test_snapshot_is_reused_within_ttl(parser, scrapes, tmp_path, monkeypatch):
+    filename = str(tmp_path / 'roster')
+    first = parser.get_ufc_roster(filename=filename)
+    assert parser.get_ufc_roster(filename=filename) is first
+    monkeypatch.setattr(parser, '_roster_snapshots', {})  # e.g. another process, snapshot is read from file.
+    loaded = parser.get_ufc_roster(filename=filename)
+    assert loaded is not first and loaded.roster == first.roster
+    assert len(scrapes) == 1
+
+
+def test_expired_snapshot_is_scraped_again(parser, scrapes, tmp_path):
+    filename = str(tmp_path / 'roster')
+    first = parser.get_ufc_roster(filename=filename)
+    first.fetched -= 3600
+    assert parser.get_ufc_roster(ttl=1800, filename=filename) is not first
+    assert parser.RosterSnapshot.load(filename).age() < 1800
+    parser.get_ufc_roster(ttl=0, filename=filename)
+    assert len(scrapes) == 3
+
+
+def test_snapshot_indexes_division_and_name(parser, scrapes, tmp_path):
+    snapshot = parser.get_ufc_roster(filename=str(tmp_path / 'roster'))
+    gender, fighter = 'women', snapshot['women'][0]
+    assert snapshot.find(f'  {fighter[0].upper()} ') == (gender, fighter)
+    assert fighter in snapshot.division(fighter[1])
+    assert snapshot.find('Nobody Atall') is None and snapshot.division('Openweight') == []
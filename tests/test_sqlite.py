@@ -0,0 +1,61 @@
+import pytest
+
+import benchmark
+from benchmark import quiet
+
+
+@pytest.fixture
+def redirecting_stub(parser, monkeypatch):
+    """
+    :return: StubServer instance whose fighter indexes redirect to profile pages, like the real site
+    """
+    server = benchmark.StubServer(fighters=20, latency=0, redirects=True)
+    monkeypatch.setattr(parser, 'SHERDOG_URL', server.start())
+    yield server
+    server.stop()
+
+
+def test_fighter_scraped_by_index_and_by_link_is_stored_once(parser, redirecting_stub, tmp_path):
+    filename = str(tmp_path / 'fighters')
+    with quiet():
+        parser.scrape_all_fighters(filename, filetype='sqlite')
+    with parser.FightDatabase(filename) as database:
+        fighters = database._connection.execute('SELECT COUNT(*) FROM fighters').fetchone()[0]
+        history = [fight.as_dict() for fight in database.fighter_history('Tony Galindo 1')]
+        profile = database._connection.execute("SELECT profile, sherdog_index FROM fighters "
+                                               "WHERE name = 'Tony Galindo 1'").fetchone()
+    assert history
+    assert profile == ('/fighter/Tony-Galindo-1', 1)
+    with quiet():
+        parser.crawl_fighter_graph(['/fighter/Tony-Galindo-1', '/fighter/Jose-Aldo-5'], filename, filetype='sqlite',
+                                   max_fighters=2)
+    with parser.FightDatabase(filename) as database:
+        assert database._connection.execute('SELECT COUNT(*) FROM fighters').fetchone()[0] == fighters
+        assert [fight.as_dict() for fight in database.fighter_history('Tony Galindo 1')] == history
+        assert database._connection.execute("SELECT sherdog_index FROM fighters "
+                                            "WHERE profile = '/fighter/Jose-Aldo-5'").fetchone() == (5,)
+
+
+def test_history_is_latest_first(parser, stub, tmp_path):
+    filename = str(tmp_path / 'fighters')
+    with quiet():
+        parser.scrape_all_fighters(filename, filetype='sqlite')
+    with parser.FightDatabase(filename) as database:
+        dates = [parser.parse_event_date(fight.date) for fight in database.fighter_history('Jose Aldo 5')]
+    assert len(dates) > 1
+    known = [event_date for event_date in dates if event_date is not None]
+    assert known == sorted(known, reverse=True)
+    assert dates[:len(known)] == known
+
+
+
+def test_roster_is_stored_in_fighters_database(parser, stub, tmp_path, monkeypatch):
+    filename = str(tmp_path / 'fighters')
+    monkeypatch.setattr(parser, 'UFC_URL', parser.SHERDOG_URL)
+    with quiet():
+        parser.scrape_all_fighters(filename, filetype='sqlite')
+        roster = parser.scrape_ufc_roster(save='yes', filetype='sqlite', database=filename)
+    with parser.FightDatabase(filename) as database:
+        stored = {(name, gender) for name, gender, _, _ in database.roster()}
+        assert stored == {(fighter[0], gender) for gender in ('men', 'women') for fighter in roster[gender]}
+        assert database.fighter_history('Jose Aldo 5')
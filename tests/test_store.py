@@ -0,0 +1,61 @@
+import pytest
+
+from benchmark import quiet
+
+
+def row(fighter, result, date, opponent='Opponent', event='Event'):
+    return fighter, opponent, result, event, date, 'Decision (Unanimous)', 'Referee', '3', '5:00'
+
+
+@pytest.fixture
+def store(parser):
+    # rows are in Sherdog's order, latest fight first
+    return parser.FightStore([
+        row('Ann', 'win', 'Mar / 01 / 2020'),
+        row('Ann', 'win', 'Feb / 01 / 2020'),
+        row('Ann', 'loss', 'Jan / 01 / 2020'),
+        row('Ann', 'win', 'Dec / 01 / 2019'),
+        row('Ann', 'win', 'Nov / 01 / 2019'),
+        row('Ann', 'win', 'Oct / 01 / 2019'),
+        row('Bea', 'loss', 'Mar / 01 / 2020'),
+        row('Bea', 'win', 'Feb / 01 / 2020'),
+        row('Cid', 'draw', 'N/A'),
+        row('Dee', 'win', 'Jan / 01 / 2020'),
+        row('Dee', 'NC', 'Jan / 01 / 2020'),
+    ])
+
+
+def test_win_streaks(store):
+    assert store.win_streak('Ann') == (3, 2)
+    assert store.win_streak('Bea') == (1, 0)
+    assert store.win_streak('Cid') == (0, 0)
+    assert store.win_streak('Opponent') == (0, 0)
+
+
+def test_same_day_fights_keep_sherdog_order(store):
+    # the no contest is listed below the win, so it happened first and the win is the current streak
+    assert store.win_streak('Dee') == (1, 1)
+
+
+def test_win_streaks_of_all_fighters(store):
+    streaks = store.win_streaks()
+    assert {name: (int(streaks['longest'][code]), int(streaks['current'][code]))
+            for code, name in enumerate(store.names)} == {'Ann': (3, 2), 'Opponent': (0, 0), 'Bea': (1, 0),
+                                                           'Cid': (0, 0), 'Dee': (1, 1)}
+
+
+def test_empty_store(parser):
+    streaks = parser.FightStore([]).win_streaks()
+    assert len(streaks['longest']) == len(streaks['current']) == 0
+
+
+def test_records_of_scraped_file(parser, stub, tmp_path):
+    filename = str(tmp_path / 'fighters')
+    with quiet():
+        parser.scrape_all_fighters(filename)
+    rows = list(parser.read_fight_rows(filename))
+    store = parser.FightStore(rows)
+    assert len(store) == len(rows)
+    results = [fight[2] for fight in rows if fight[0] == 'Jose Aldo 5']
+    assert results
+    assert store.record('Jose Aldo 5') == {result: results.count(result) for result in store.RESULTS}